@@ -1,22 +1,27 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.infrastructure.database.sqlite.session import get_db
 from app.infrastructure.database.sqlite.repositories.wishlist_repository import WishlistRepositorySQLite
 from app.domains.notifications.notifier import ConsoleWishlistNotifier
-from app.infrastructure.notifications.email_notifier import EmailWishlistNotifier
+from app.infrastructure.notifications.digest_notifier import DigestWishlistNotifier, flush_due_digests
 from app.domains.order.schemas import (
     OrderCreate,
     OrderResponse,
     OrderStatusUpdate,
     OrderRefundRequest,
     OrderRefundApproval,
+    OrderEventResponse,
+    OrderArchivalReportResponse,
 )
 from app.domains.order import use_cases
+from app.domains.order.entity import REFUND_WINDOW_DAYS
 from app.api.endpoints.auth import get_current_user, require_roles
 from app.domains.identity.repository import User
-from app.infrastructure.notifications.invoice_email import send_order_invoice_email, send_refund_notification_email, send_refund_decision_email
+from app.infrastructure.notifications.invoice_email import order_invoice_outbox_email, refund_decision_outbox_email
+from app.domains.notifications.outbox import OutboxEmail
 from app.core.config import get_settings
 from app.infrastructure.database.sqlite.models.user import UserModel
 
@@ -25,11 +30,31 @@ settings = get_settings()
 
 
 def _get_notifier(db: Session):
-    if settings.SMTP_HOST and settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
-        return EmailWishlistNotifier(db)
+    # Digest entries are written in the request transaction and mailed after it commits
+    if settings.smtp_configured:
+        return DigestWishlistNotifier(db)
     return ConsoleWishlistNotifier()
 
 
+def _schedule_wishlist_flush(background_tasks: BackgroundTasks) -> None:
+    # Without a digest window, send the committed entries right after the response
+    if settings.smtp_configured and settings.WISHLIST_DIGEST_WINDOW_SECONDS == 0:
+        background_tasks.add_task(flush_due_digests)
+
+
+def _outbox_emails(*emails: OutboxEmail) -> List[OutboxEmail]:
+    # The outbox worker only runs when SMTP is configured
+    return list(emails) if settings.SMTP_HOST else []
+
+
+def _order_customer(db: Session, order_id: int) -> Optional[UserModel]:
+    """Customer who placed an order, or None if it cannot be resolved."""
+    order = use_cases.get_order_by_id(db, order_id)
+    if not order:
+        return None
+    return db.query(UserModel).filter(UserModel.id == order.customer_id).first()
+
+
 @router.post("", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 def create_order(
     order_data: OrderCreate,
@@ -57,6 +82,7 @@ def create_order(
 
     wishlist_repo = WishlistRepositorySQLite(db)
     notifier = _get_notifier(db)
+    customer_name = f"{current_user.first_name} {current_user.last_name}".strip()
 
     order = use_cases.create_order(
         db=db,
@@ -65,6 +91,7 @@ def create_order(
         items=items,
         wishlist_repo=wishlist_repo,
         notifier=notifier,
+        emails=_outbox_emails(order_invoice_outbox_email(current_user.email, customer_name)),
     )
 
     if not order:
@@ -72,21 +99,23 @@ def create_order(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Failed to create order. Check product availability and stock.",
         )
-    
-    customer_name = f"{current_user.first_name} {current_user.last_name}".strip()
-    background_tasks.add_task(send_order_invoice_email, order, current_user.email, customer_name)
 
+    _schedule_wishlist_flush(background_tasks)
     return order
 
 
 @router.get("/all", response_model=List[OrderResponse])
 def get_all_orders(
+    include_archived: bool = Query(False, description="Also return archived orders"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles("product_manager", "sales_manager")),
 ):
     """
     Retrieve all orders from all customers (managers only).
 
+    Args:
+        include_archived: Also return orders moved to the archive
+
     Returns:
         List of all orders in the system
 
@@ -94,10 +123,71 @@ def get_all_orders(
         HTTPException: 401 if not authenticated
         HTTPException: 403 if not a product manager or sales manager
     """
-    orders = use_cases.get_all_orders(db, customer_id=None)
+    orders = use_cases.get_all_orders(db, customer_id=None, include_archived=include_archived)
     return orders
 
 
+@router.get("/events")
+def stream_order_events(
+    after: int = Query(0, ge=0, description="Only return events with an id greater than this cursor"),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles("product_manager", "sales_manager")),
+):
+    """
+    Stream order lifecycle events newer than a cursor as NDJSON (managers only).
+
+    Downstream consumers keep the id of the last event they processed and pass
+    it back as ``after`` to sync incrementally instead of re-polling ``/all``.
+
+    Args:
+        after: Event id cursor
+        limit: Maximum number of events in this response
+
+    Returns:
+        Newline-delimited JSON, one OrderEventResponse per line
+
+    Raises:
+        HTTPException: 401 if not authenticated
+        HTTPException: 403 if not a product manager or sales manager
+    """
+    def _lines():
+        for event in use_cases.iter_order_events(db, after=after, limit=limit):
+            yield OrderEventResponse.model_validate(event).model_dump_json() + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
+@router.post("/archive", response_model=OrderArchivalReportResponse)
+def archive_orders(
+    retention_days: int = Query(
+        settings.ORDER_ARCHIVE_RETENTION_DAYS,
+        ge=REFUND_WINDOW_DAYS + 1,
+        description="Days after delivery before an order is archived; orders still refundable are kept",
+    ),
+    batch_size: int = Query(settings.ORDER_ARCHIVE_BATCH_SIZE, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles("sales_manager")),
+):
+    """
+    Move delivered orders past the refund window into the archive tables (sales managers only).
+
+    Archived orders remain readable through the regular order endpoints.
+
+    Args:
+        retention_days: Days after delivery before an order is archived
+        batch_size: Orders moved per transaction
+
+    Returns:
+        Archival report with throughput and lock-hold times
+
+    Raises:
+        HTTPException: 401 if not authenticated
+        HTTPException: 403 if not a sales manager
+    """
+    return use_cases.archive_delivered_orders(db, retention_days=retention_days, batch_size=batch_size)
+
+
 @router.get("", response_model=List[OrderResponse])
 def get_my_orders(
     db: Session = Depends(get_db),
@@ -113,7 +203,7 @@ def get_my_orders(
         HTTPException: 401 if not authenticated
         HTTPException: 403 if not a customer
     """
-    orders = use_cases.get_all_orders(db, customer_id=current_user.id)
+    orders = use_cases.get_all_orders(db, customer_id=current_user.id, include_archived=True)
     return orders
 
 
@@ -155,6 +245,43 @@ def get_order(
     return order
 
 
+@router.get("/{order_id}/timeline", response_model=List[OrderEventResponse])
+def get_order_timeline(
+    order_id: int,
+    db: Session = Depends(get_db),
+    user_with_role=Depends(get_current_user),
+):
+    """
+    Retrieve the lifecycle timeline of an order (authenticated users only).
+    - Customers can only see their own orders
+    - Managers can see any order
+
+    Args:
+        order_id: The ID of the order
+
+    Returns:
+        List of order events, oldest first
+
+    Raises:
+        HTTPException: 403 if customer tries to access another's order
+        HTTPException: 404 if order not found
+    """
+    current_user, role = user_with_role
+
+    order = use_cases.get_order_by_id(db, order_id)
+    if not order:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Order with id {order_id} not found"
+        )
+
+    if role == "customer" and order.customer_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="You can only view your own orders"
+        )
+
+    return use_cases.get_order_timeline(db, order_id)
+
+
 @router.patch("/{order_id}/status", response_model=OrderResponse)
 def update_order_status(
     order_id: int,
@@ -188,6 +315,7 @@ def update_order_status(
 @router.post("/{order_id}/cancel", response_model=OrderResponse)
 def cancel_order(
     order_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles("customer")),
 ):
@@ -227,6 +355,7 @@ def cancel_order(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Order must be in 'processing' status to cancel",
         )
+    _schedule_wishlist_flush(background_tasks)
     return order
 
 
@@ -295,6 +424,15 @@ def approve_refund(
     wishlist_repo = WishlistRepositorySQLite(db)
     notifier = _get_notifier(db)
 
+    # Decision email is queued in the same transaction as the refund change
+    customer = _order_customer(db, order_id)
+    emails = []
+    if customer:
+        customer_name = f"{customer.first_name} {customer.last_name}".strip()
+        emails = _outbox_emails(
+            refund_decision_outbox_email(customer.email, approval_data.approved, approval_data.notes, customer_name)
+        )
+
     if approval_data.approved:
         order = use_cases.approve_refund(
             db,
@@ -302,6 +440,7 @@ def approve_refund(
             refund_amount=approval_data.refund_amount,
             wishlist_repo=wishlist_repo,
             notifier=notifier,
+            emails=emails,
         )
         if not order:
             raise HTTPException(
@@ -309,40 +448,15 @@ def approve_refund(
                 detail=f"Order with id {order_id} refund cannot be approved. "
                 "It must be in 'refund_requested' status.",
             )
-        # Notify customer about approval
-        customer = db.query(UserModel).filter(UserModel.id == order.customer_id).first()
-        if customer:
-            customer_name = f"{customer.first_name} {customer.last_name}".strip()
-            background_tasks.add_task(
-                send_refund_decision_email,
-                order,
-                customer.email,
-                True,
-                order.refund_amount or approval_data.refund_amount or 0.0,
-                approval_data.notes,
-                customer_name,
-            )
+        _schedule_wishlist_flush(background_tasks)
     else:
-        order = use_cases.reject_refund(db, order_id)
+        order = use_cases.reject_refund(db, order_id, emails=emails)
         if not order:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Order with id {order_id} refund cannot be rejected. "
                 "It must be in 'refund_requested' status.",
             )
-        # Notify customer about rejection
-        customer = db.query(UserModel).filter(UserModel.id == order.customer_id).first()
-        if customer:
-            customer_name = f"{customer.first_name} {customer.last_name}".strip()
-            background_tasks.add_task(
-                send_refund_decision_email,
-                order,
-                customer.email,
-                False,
-                None,
-                approval_data.notes,
-                customer_name,
-            )
     return order
 
 
@@ -1,5 +1,5 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.infrastructure.database.sqlite.session import get_db
@@ -7,17 +7,24 @@ from app.domains.catalog.schemas import ProductResponse, ProductCreate, ProductU
 from app.domains.catalog import use_cases
 from app.infrastructure.database.sqlite.repositories.wishlist_repository import WishlistRepositorySQLite
 from app.domains.notifications.notifier import ConsoleWishlistNotifier
-from app.infrastructure.notifications.email_notifier import EmailWishlistNotifier
+from app.infrastructure.notifications.digest_notifier import DigestWishlistNotifier, flush_due_digests
 from app.core.config import get_settings
 
 settings = get_settings()
 
 
 def _get_notifier(db: Session):
-    if settings.SMTP_HOST and settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
-        return EmailWishlistNotifier(db)
+    # Digest entries are written in the request transaction and mailed after it commits
+    if settings.smtp_configured:
+        return DigestWishlistNotifier(db)
     return ConsoleWishlistNotifier()
 
+
+def _schedule_wishlist_flush(background_tasks: BackgroundTasks) -> None:
+    # Without a digest window, send the committed entries right after the response
+    if settings.smtp_configured and settings.WISHLIST_DIGEST_WINDOW_SECONDS == 0:
+        background_tasks.add_task(flush_due_digests)
+
 router = APIRouter(prefix="/api/v1/products", tags=["products"])
 
 
@@ -107,6 +114,7 @@ def delete_product(product_id: int, db: Session = Depends(get_db)):
 def update_product(
     product_id: int,
     product_update: ProductUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -146,11 +154,16 @@ def update_product(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product with id {product_id} not found"
         )
+    _schedule_wishlist_flush(background_tasks)
     return updated_product
 
 
 @router.patch("/discount", response_model=List[ProductResponse])
-def apply_discount(discount_request: ProductDiscountRequest, db: Session = Depends(get_db)):
+def apply_discount(
+    discount_request: ProductDiscountRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
     """
     Apply a percentage discount to multiple products and return the updated products.
     """
@@ -177,11 +190,16 @@ def apply_discount(discount_request: ProductDiscountRequest, db: Session = Depen
             detail="No products found for the provided IDs",
         )
 
+    _schedule_wishlist_flush(background_tasks)
     return updated_products
 
 
 @router.patch("/discount/clear", response_model=List[ProductResponse])
-def clear_discount(discount_request: ProductDiscountClearRequest, db: Session = Depends(get_db)):
+def clear_discount(
+    discount_request: ProductDiscountClearRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
     wishlist_repo = WishlistRepositorySQLite(db)
     notifier = _get_notifier(db)
 
@@ -196,4 +214,5 @@ def clear_discount(discount_request: ProductDiscountClearRequest, db: Session =
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No products found for the provided IDs",
         )
+    _schedule_wishlist_flush(background_tasks)
     return cleared_products
@@ -1,12 +1,20 @@
 """
 Review API Endpoints
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.infrastructure.database.sqlite.session import get_db
-from app.domains.review.schemas import ReviewCreate, ReviewResponse
+from app.domains.review.schemas import (
+    ReviewCreate,
+    ReviewResponse,
+    ReviewPageResponse,
+    ReviewModerationQueueResponse,
+    ReviewBulkModerationRequest,
+    ReviewBulkModerationResponse,
+)
+from app.domains.review.entity import ReviewSort
 from app.domains.review import use_cases
 from app.domains.identity.repository import User
 from app.api.endpoints.auth import require_roles
@@ -69,7 +77,7 @@ def create_product_review(
     return review
 
 
-@router.get("/products/{product_id}/reviews", response_model=List[ReviewResponse])
+@router.get("/products/{product_id}/reviews", response_model=List[ReviewResponse], deprecated=True)
 def get_product_reviews(
     product_id: int,
     db: Session = Depends(get_db),
@@ -77,6 +85,9 @@ def get_product_reviews(
     """
     Get all reviews for a product (public endpoint).
 
+    Deprecated: unbounded; new clients should page approved reviews with
+    ``/products/{product_id}/reviews/page``.
+
     Returns all reviews with their is_approved status.
     Frontend should:
     - Display all ratings (both approved and unapproved)
@@ -96,6 +107,37 @@ def get_product_reviews(
     return reviews
 
 
+@router.get("/products/{product_id}/reviews/page", response_model=ReviewPageResponse)
+def get_product_review_page(
+    product_id: int,
+    sort: ReviewSort = Query(ReviewSort.NEWEST),
+    cursor: Optional[str] = Query(None, description="Cursor returned by the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """
+    Get a page of approved reviews for a product (public endpoint).
+
+    Args:
+        product_id: ID of the product
+        sort: newest, highest or lowest
+        cursor: Opaque cursor from the previous page
+        limit: Page size (max 100)
+
+    Returns:
+        Reviews, the next cursor (null on the last page) and the rating histogram
+
+    Raises:
+        400: If the cursor is malformed
+    """
+    logger.info(f"GET /api/v1/products/{product_id}/reviews/page - sort={sort.value}, limit={limit}")
+
+    try:
+        return use_cases.get_product_review_page(db, product_id, sort=sort, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.get("/reviews/pending", response_model=List[ReviewResponse])
 def get_pending_reviews(
     db: Session = Depends(get_db),
@@ -122,6 +164,69 @@ def get_pending_reviews(
     return reviews
 
 
+@router.get("/reviews/moderation-queue", response_model=ReviewModerationQueueResponse)
+def get_moderation_queue(
+    cursor: Optional[str] = Query(None, description="Cursor returned by the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles("product_manager")),
+):
+    """
+    Get a page of reviews pending approval, oldest first (product managers only).
+
+    Args:
+        cursor: Opaque cursor from the previous page
+        limit: Page size (max 500)
+
+    Returns:
+        Pending reviews, the next cursor and the total pending count
+
+    Raises:
+        400: If the cursor is malformed
+        401: If not authenticated
+        403: If not a product manager
+    """
+    logger.info(f"GET /api/v1/reviews/moderation-queue - Product manager {current_user.id} fetching queue page")
+
+    try:
+        reviews, next_cursor, total_pending = use_cases.get_moderation_queue(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return ReviewModerationQueueResponse(reviews=reviews, next_cursor=next_cursor, total_pending=total_pending)
+
+
+@router.post("/reviews/moderate", response_model=ReviewBulkModerationResponse)
+def moderate_reviews(
+    payload: ReviewBulkModerationRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles("product_manager")),
+):
+    """
+    Approve or reject a list of reviews in one update (product managers only).
+
+    Args:
+        payload: Review IDs and the decision
+        current_user: Authenticated product manager
+
+    Returns:
+        Number of reviews updated and IDs that were not found
+
+    Raises:
+        401: If not authenticated
+        403: If not a product manager
+    """
+    logger.info(
+        f"POST /api/v1/reviews/moderate - Manager {current_user.id} "
+        f"{'approving' if payload.approved else 'rejecting'} {len(payload.review_ids)} reviews"
+    )
+
+    result = use_cases.moderate_reviews(db, payload.review_ids, payload.approved, current_user.id)
+
+    logger.info(f"Bulk moderation updated {result.updated} reviews ({len(result.not_found)} not found)")
+    return result
+
+
 @router.get("/reviews/my-reviews", response_model=List[ReviewResponse])
 def get_my_reviews(
     db: Session = Depends(get_db),
@@ -1,10 +1,16 @@
-from typing import Dict, Optional, Set
+import asyncio
+import time
+from functools import partial
+from typing import Dict, List, Optional, Set, Tuple
+
+import anyio
 
 from fastapi import (
     APIRouter,
     Depends,
     File,
     HTTPException,
+    Query,
     Request,
     UploadFile,
     WebSocket,
@@ -18,7 +24,7 @@ from app.core.config import get_settings
 from app.core.logging import logger
 from app.domains.identity.use_cases import get_user, verify_token
 from app.domains.support import use_cases
-from app.domains.support.entity import ConversationStatus, SenderRole
+from app.domains.support.entity import ConversationStatus, SenderRole, SupportConversationHeader
 from app.domains.support.schemas import (
     SupportAttachmentResponse,
     SupportCloseRequest,
@@ -27,14 +33,21 @@ from app.domains.support.schemas import (
     SupportConversationSummary,
     SupportContextSnapshotResponse,
     SupportMessageResponse,
+    SupportPriorityUpdate,
     SupportQueueResponse,
+    SupportSocketMetricsResponse,
 )
-from app.infrastructure.database.sqlite.session import SessionLocal, get_db
+from app.infrastructure.database.sqlite.session import SessionLocal, get_db, pool_status
+from app.infrastructure.realtime.broadcast import BroadcastBackend, InMemoryBroadcast, get_broadcast_backend
+from app.infrastructure.realtime.sender import QueuedSocketSender
 from app.infrastructure.storageutils.local import save_support_attachment
 
 router = APIRouter(prefix="/api/v1/support", tags=["support"])
 settings = get_settings()
 
+# Websocket DB calls get their own threads instead of sharing the sync endpoints' pool
+_ws_db_limiter = anyio.CapacityLimiter(settings.SUPPORT_WS_DB_THREADS)
+
 
 def _optional_user(request: Request):
     """
@@ -80,6 +93,7 @@ def _map_message(message) -> SupportMessageResponse:
         status=message.status,
         created_at=message.created_at,
         attachment=attachment,
+        client_message_id=message.client_message_id,
     )
 
 
@@ -109,6 +123,8 @@ def _map_conversation(conversation, messages=None) -> SupportConversationRespons
         updated_at=conversation.updated_at,
         closed_at=conversation.closed_at,
         resolution_notes=conversation.resolution_notes,
+        priority=conversation.priority,
+        sla_due_at=conversation.sla_due_at,
         context_snapshot=context,
         messages=mapped_messages,
     )
@@ -124,6 +140,8 @@ def _map_summary(conversation) -> SupportConversationSummary:
         guest_email=conversation.guest_email,
         last_message_at=conversation.last_message_at,
         created_at=conversation.created_at,
+        priority=conversation.priority,
+        sla_due_at=conversation.sla_due_at,
     )
 
 
@@ -131,6 +149,24 @@ def _is_agent(role: Optional[str]) -> bool:
     return role in ("support_agent", "support_admin")
 
 
+def _claimed_event(conversation) -> dict:
+    return {
+        "type": "conversation_claimed",
+        "conversation_id": conversation.id,
+        "agent_id": conversation.assigned_agent_id,
+    }
+
+
+def _queue_delta(op: str, conversation) -> dict:
+    """Queue feed event; ``op`` is new, claimed, updated or closed and carries the full summary."""
+    return {"type": "queue_delta", "op": op, "conversation": _map_summary(conversation).model_dump(mode="json")}
+
+
+def _publish_claim(conversation):
+    manager.broadcast_sync(conversation.id, _claimed_event(conversation))
+    manager.broadcast_sync(QUEUE_CHANNEL, _queue_delta("claimed", conversation))
+
+
 def _ensure_conversation_access(conversation, user_id: Optional[str], role: Optional[str], conversation_token: Optional[str]):
     if conversation is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
@@ -167,6 +203,7 @@ def start_conversation(
 
     # Ensure token is reflected back for guests
     conversation.conversation_token = token or conversation.conversation_token
+    manager.broadcast_sync(QUEUE_CHANNEL, _queue_delta("new", conversation))
     messages = use_cases.recent_messages(db, conversation.id, limit=settings.SUPPORT_HISTORY_LIMIT)
     return _map_conversation(conversation, messages=messages)
 
@@ -209,10 +246,40 @@ def claim_conversation(conversation_id: str, user=Depends(get_current_user), db=
     conversation = use_cases.claim_conversation(db, conversation_id, agent.id)
     if not conversation:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Conversation already claimed or missing")
+    _publish_claim(conversation)
+    messages = use_cases.recent_messages(db, conversation.id, limit=settings.SUPPORT_HISTORY_LIMIT)
+    return _map_conversation(conversation, messages=messages)
+
+
+@router.post(
+    "/conversations/claim-next",
+    response_model=SupportConversationResponse,
+    dependencies=[Depends(require_roles("support_agent", "support_admin"))],
+)
+def claim_next_conversation(user=Depends(get_current_user), db=Depends(get_db)):
+    """Assign the waiting conversation with the best priority and nearest SLA deadline to the caller."""
+    agent, _role = user
+    conversation = use_cases.claim_next_conversation(db, agent.id)
+    if not conversation:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No conversations waiting")
+    _publish_claim(conversation)
     messages = use_cases.recent_messages(db, conversation.id, limit=settings.SUPPORT_HISTORY_LIMIT)
     return _map_conversation(conversation, messages=messages)
 
 
+@router.put(
+    "/conversations/{conversation_id}/priority",
+    response_model=SupportConversationSummary,
+    dependencies=[Depends(require_roles("support_agent", "support_admin"))],
+)
+def set_conversation_priority(conversation_id: str, payload: SupportPriorityUpdate, db=Depends(get_db)):
+    conversation = use_cases.set_conversation_priority(db, conversation_id, payload.priority)
+    if not conversation:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+    manager.broadcast_sync(QUEUE_CHANNEL, _queue_delta("updated", conversation))
+    return _map_summary(conversation)
+
+
 @router.post("/conversations/{conversation_id}/close", response_model=SupportConversationResponse)
 def close_conversation(
     conversation_id: str,
@@ -225,7 +292,7 @@ def close_conversation(
     user_id = user_with_role[0].id if user_with_role else None
     role = user_with_role[1] if user_with_role else None
 
-    conversation = use_cases.get_conversation(db, conversation_id)
+    conversation = use_cases.get_conversation_header(db, conversation_id)
     _ensure_conversation_access(conversation, user_id, role, conversation_token)
 
     closed = use_cases.close_conversation(db, conversation_id, payload.resolution_notes)
@@ -242,6 +309,7 @@ def close_conversation(
             "closed_at": closed.closed_at.isoformat() if closed.closed_at else None,
         }
     )
+    manager.broadcast_sync(QUEUE_CHANNEL, _queue_delta("closed", closed))
 
     messages = use_cases.recent_messages(db, conversation_id, limit=settings.SUPPORT_HISTORY_LIMIT)
     return _map_conversation(closed, messages=messages)
@@ -252,16 +320,22 @@ def get_messages(
     conversation_id: str,
     request: Request,
     conversation_token: Optional[str] = None,
+    before: Optional[str] = Query(None, description="Message id; return the messages just older than it"),
+    after: Optional[str] = Query(None, description="Message id; return the messages just newer than it"),
+    limit: int = Query(settings.SUPPORT_HISTORY_LIMIT, ge=1, le=settings.SUPPORT_HISTORY_MAX_LIMIT),
     db=Depends(get_db),
 ):
     user_with_role = _optional_user(request)
     user_id = user_with_role[0].id if user_with_role else None
     role = user_with_role[1] if user_with_role else None
 
-    conversation = use_cases.get_conversation(db, conversation_id)
+    conversation = use_cases.get_conversation_header(db, conversation_id)
     _ensure_conversation_access(conversation, user_id, role, conversation_token)
 
-    messages = use_cases.recent_messages(db, conversation_id, limit=settings.SUPPORT_HISTORY_LIMIT)
+    try:
+        messages, _has_more = use_cases.message_page(db, conversation_id, limit=limit, before=before, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return [_map_message(m) for m in messages]
 
 
@@ -277,7 +351,7 @@ def upload_attachment(
     user_id = user_with_role[0].id if user_with_role else None
     role = user_with_role[1] if user_with_role else None
 
-    conversation = use_cases.get_conversation(db, conversation_id)
+    conversation = use_cases.get_conversation_header(db, conversation_id)
     _ensure_conversation_access(conversation, user_id, role, conversation_token)
 
     if conversation.status == ConversationStatus.CLOSED:
@@ -285,7 +359,6 @@ def upload_attachment(
 
     max_bytes = settings.SUPPORT_ATTACHMENT_MAX_MB * 1024 * 1024
     storage_path, size, checksum = save_support_attachment(
-        conversation_id=conversation_id,
         upload=file,
         base_dir=settings.SUPPORT_ATTACHMENT_DIR,
         max_bytes=max_bytes,
@@ -340,7 +413,7 @@ def download_attachment(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Attachment not found")
 
     # Verify access to the conversation
-    conversation = use_cases.get_conversation(db, attachment.conversation_id)
+    conversation = use_cases.get_conversation_header(db, attachment.conversation_id)
     _ensure_conversation_access(conversation, user_id, role, conversation_token)
 
     # Build full file path
@@ -356,44 +429,320 @@ def download_attachment(
     )
 
 
-class SupportConnectionManager:
-    """Tracks active websocket connections per conversation."""
+@router.delete(
+    "/attachments/{attachment_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(require_roles("support_agent", "support_admin"))],
+)
+def delete_attachment(attachment_id: str, db=Depends(get_db)):
+    """Delete an attachment; its message stays and the file is removed by the attachment GC job."""
+    if not use_cases.delete_attachment(db, attachment_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Attachment not found")
+    return None
 
-    def __init__(self):
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
 
-    async def connect(self, conversation_id: str, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.setdefault(conversation_id, set()).add(websocket)
+# Broadcast channel for the agent queue feed; conversation channels are their ids
+QUEUE_CHANNEL = "support:queue"
+
+# Events that change a conversation's status or assignee
+_HEADER_EVENTS = ("conversation_closed", "conversation_claimed")
+
 
-    def disconnect(self, conversation_id: str, websocket: WebSocket):
+class SupportConnectionManager:
+    """
+    Tracks active websocket connections per conversation.
+
+    Broadcasts go through a pluggable backend so that participants connected
+    to different worker processes still see each other's messages; the backend
+    calls back into ``deliver`` in every process holding sockets for the
+    conversation.
+
+    A socket is registered once and subscribed to one or more channels: chat
+    sockets to their conversation, multiplexed agent sockets to every
+    conversation the agent has open. Frames sent to a multiplexed socket are
+    tagged with the conversation they belong to.
+
+    Each socket also caches its conversation headers so sending a message does
+    not re-read the conversation; close and claim events drop the cached
+    headers for their conversation.
+
+    Each socket has its own bounded send queue and writer task, so delivery
+    never waits on a slow client. A socket whose queue overflows, or whose
+    current send has been blocked longer than ``send_timeout``, is evicted
+    and closed.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[BroadcastBackend] = None,
+        max_queue: int = 100,
+        send_timeout: float = 10,
+        idle_timeout: float = 0,
+    ):
+        self.active_connections: Dict[str, Dict[WebSocket, QueuedSocketSender]] = {}
+        self.backend = backend or InMemoryBroadcast()
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.idle_timeout = idle_timeout
+        self.evicted = 0
+        self.reaped = 0
+        self._senders: Dict[WebSocket, QueuedSocketSender] = {}
+        self._subscriptions: Dict[WebSocket, Set[str]] = {}
+        self._multiplexed: Set[WebSocket] = set()
+        self._last_seen: Dict[WebSocket, float] = {}
+        self._headers: Dict[Tuple[WebSocket, str], SupportConversationHeader] = {}
+        self._held: Dict[Tuple[WebSocket, str], List[dict]] = {}
+        self._header_versions: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reaper: Optional[asyncio.Task] = None
+        self._closing: Set[asyncio.Task] = set()
+
+    async def start(self):
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        await self.backend.start(self.deliver)
+        if self.idle_timeout > 0:
+            self._reaper = asyncio.create_task(self._reap_forever())
+
+    async def stop(self):
+        await self.backend.stop()
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        self._loop = None
+
+    async def connect(
+        self,
+        conversation_id: Optional[str],
+        websocket: WebSocket,
+        hold: bool = False,
+        idle_reapable: bool = True,
+        multiplexed: bool = False,
+    ):
+        """
+        Accept and register a socket, subscribed to ``conversation_id`` if given.
+
+        With ``hold``, messages for ``conversation_id`` are buffered until
+        ``release`` so a snapshot read after registering can be sent ahead of
+        them.
+        Sockets that are not ``idle_reapable`` are never closed by the idle
+        reaper. ``multiplexed`` sockets get a ``conversation_id`` on every
+        frame and subscribe to conversations with ``subscribe``.
+        """
+        # Started at app startup; also here for apps run without lifespan events
+        await self.start()
+        await websocket.accept()
+        self._senders[websocket] = QueuedSocketSender(
+            websocket,
+            max_queue=self.max_queue,
+            send_timeout=self.send_timeout,
+            on_failed=self._evict,
+        )
+        self._subscriptions[websocket] = set()
+        if multiplexed:
+            self._multiplexed.add(websocket)
+        if idle_reapable:
+            self._last_seen[websocket] = time.monotonic()
+        if conversation_id is not None:
+            self.subscribe(conversation_id, websocket, hold=hold)
+
+    def subscribe(self, conversation_id: str, websocket: WebSocket, hold: bool = False) -> bool:
+        """
+        Add a registered socket to a conversation's channel. Returns False if it is gone.
+
+        With ``hold``, that conversation's messages are buffered until
+        ``release``; other conversations on the socket are not affected.
+        """
+        sender = self._senders.get(websocket)
+        if sender is None:
+            return False
+        self.active_connections.setdefault(conversation_id, {})[websocket] = sender
+        self._subscriptions[websocket].add(conversation_id)
+        if hold:
+            self._held[(websocket, conversation_id)] = []
+        return True
+
+    def unsubscribe(self, conversation_id: str, websocket: WebSocket):
+        """Remove a socket from one conversation's channel, leaving the socket open."""
         conns = self.active_connections.get(conversation_id)
-        if conns and websocket in conns:
-            conns.remove(websocket)
-        if conns and len(conns) == 0:
-            self.active_connections.pop(conversation_id, None)
+        if conns is not None:
+            conns.pop(websocket, None)
+            if not conns:
+                self.active_connections.pop(conversation_id, None)
+                self._header_versions.pop(conversation_id, None)
+        self._subscriptions.get(websocket, set()).discard(conversation_id)
+        self._headers.pop((websocket, conversation_id), None)
+        self._held.pop((websocket, conversation_id), None)
+
+    def subscriptions(self, websocket: WebSocket) -> Set[str]:
+        return self._subscriptions.get(websocket, set())
+
+    def release(self, conversation_id: str, websocket: WebSocket, first: dict):
+        """Send ``first``, then every message held for the conversation since the socket subscribed."""
+        held = self._held.pop((websocket, conversation_id), None) or []
+        for message in [first, *held]:
+            if not self.send(conversation_id, websocket, message):
+                break
+
+    def touch(self, websocket: WebSocket):
+        """Record client activity so the idle reaper leaves the socket alone."""
+        if websocket in self._last_seen:
+            self._last_seen[websocket] = time.monotonic()
+
+    def cached_header(self, conversation_id: str, websocket: WebSocket) -> Optional[SupportConversationHeader]:
+        return self._headers.get((websocket, conversation_id))
+
+    def header_version(self, conversation_id: str) -> int:
+        return self._header_versions.get(conversation_id, 0)
+
+    def cache_header(self, conversation_id: str, websocket: WebSocket, header, version: int):
+        """Cache a header read at ``version``; dropped if the conversation changed while it was read."""
+        if header is None or version != self.header_version(conversation_id):
+            return
+        if websocket in self.active_connections.get(conversation_id, {}):
+            self._headers[(websocket, conversation_id)] = header
+
+    def invalidate_headers(self, conversation_id: str):
+        self._header_versions[conversation_id] = self.header_version(conversation_id) + 1
+        for websocket in self.active_connections.get(conversation_id, {}):
+            self._headers.pop((websocket, conversation_id), None)
+
+    def disconnect(self, conversation_id: Optional[str], websocket: WebSocket):
+        """Forget a socket entirely: every subscription, its sender and its cached state."""
+        for channel in list(self.subscriptions(websocket)):
+            self.unsubscribe(channel, websocket)
+        self._subscriptions.pop(websocket, None)
+        sender = self._senders.pop(websocket, None)
+        if sender is not None:
+            sender.close()
+        self._multiplexed.discard(websocket)
+        self._last_seen.pop(websocket, None)
+
+    def send(self, conversation_id: str, websocket: WebSocket, message: dict) -> bool:
+        """Queue a message for one socket. Returns False if the socket was evicted instead."""
+        sender = self._senders.get(websocket)
+        if sender is None:
+            return False
+        if websocket in self._multiplexed and "conversation_id" not in message:
+            message = {**message, "conversation_id": conversation_id}
+        held = self._held.get((websocket, conversation_id))
+        if held is not None:
+            if len(held) >= self.max_queue:
+                self._evict(sender, "send queue full")
+                return False
+            held.append(message)
+            return True
+        if sender.stalled:
+            self._evict(sender, f"send blocked for over {self.send_timeout}s")
+            return False
+        if not sender.offer(message):
+            self._evict(sender, "send queue full")
+            return False
+        return True
 
     async def broadcast(self, conversation_id: str, message: dict):
-        conns = list(self.active_connections.get(conversation_id, []))
-        for connection in conns:
+        await self.backend.publish(conversation_id, message)
+
+    async def deliver(self, conversation_id: str, message: dict):
+        """Queue a message for every socket this process holds for the conversation."""
+        if message.get("type") in _HEADER_EVENTS:
+            self.invalidate_headers(conversation_id)
+        for websocket in list(self.active_connections.get(conversation_id, {})):
+            self.send(conversation_id, websocket, message)
+        # Let the writers run: a client sending a burst must not outpace them unchecked
+        await asyncio.sleep(0)
+
+    def _evict(self, sender: QueuedSocketSender, reason: str):
+        if self._senders.get(sender.websocket) is not sender:
+            return
+        channels = ", ".join(sorted(self.subscriptions(sender.websocket))) or "no conversation"
+        logger.warning(f"Evicting slow support websocket on {channels}: {reason}")
+        self.evicted += 1
+        self.disconnect(None, sender.websocket)
+        self._close_socket(sender.websocket, status.WS_1013_TRY_AGAIN_LATER, "Client too slow")
+
+    def reap_idle(self, now: Optional[float] = None) -> int:
+        """Close sockets with no client activity for ``idle_timeout`` seconds. Returns sockets closed."""
+        if self.idle_timeout <= 0:
+            return 0
+        cutoff = (now if now is not None else time.monotonic()) - self.idle_timeout
+        reaped = 0
+        for websocket in list(self._senders):
+            if self._last_seen.get(websocket, cutoff) < cutoff:
+                self.disconnect(None, websocket)
+                self._close_socket(websocket, status.WS_1000_NORMAL_CLOSURE, "Idle timeout")
+                reaped += 1
+        self.reaped += reaped
+        return reaped
+
+    async def _reap_forever(self):
+        interval = max(1.0, min(60.0, self.idle_timeout / 2))
+        while True:
+            await asyncio.sleep(interval)
+            reaped = self.reap_idle()
+            if reaped:
+                logger.info(f"Closed {reaped} idle support websockets")
+
+    def _close_socket(self, websocket: WebSocket, code: int, reason: str):
+        async def close():
             try:
-                await connection.send_json(message)
-            except Exception as exc:  # noqa: BLE001
-                logger.warning(f"Failed to broadcast to websocket: {exc}")
-                self.disconnect(conversation_id, connection)
+                await asyncio.wait_for(websocket.close(code=code, reason=reason), self.send_timeout)
+            except Exception:  # noqa: BLE001
+                pass
+
+        task = asyncio.create_task(close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def metrics(self) -> dict:
+        senders = list(self._senders.values())
+        depths = [sender.depth for sender in senders]
+        return {
+            "connections": len(senders),
+            "conversations": len(self.active_connections),
+            "queued_messages": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "queue_capacity": self.max_queue,
+            "evicted_total": self.evicted,
+            "idle_reaped_total": self.reaped,
+        }
 
     def broadcast_sync(self, conversation_id: str, message: dict):
-        """Best-effort sync broadcast for HTTP endpoints."""
-        import asyncio
-
+        """Best-effort broadcast for sync HTTP endpoints running in the threadpool."""
         try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(self.broadcast(conversation_id, message))
+            asyncio.get_running_loop().create_task(self.broadcast(conversation_id, message))
+            return
         except RuntimeError:
+            pass
+        if self._loop is not None and self._loop.is_running():
+            # Sockets belong to the application's loop, not this worker thread
+            asyncio.run_coroutine_threadsafe(self.broadcast(conversation_id, message), self._loop)
+        else:
             asyncio.run(self.broadcast(conversation_id, message))
 
 
-manager = SupportConnectionManager()
+manager = SupportConnectionManager(
+    get_broadcast_backend(),
+    max_queue=settings.SUPPORT_WS_SEND_QUEUE_SIZE,
+    send_timeout=settings.SUPPORT_WS_SEND_TIMEOUT_SECONDS,
+    idle_timeout=settings.SUPPORT_WS_IDLE_TIMEOUT_SECONDS,
+)
+
+
+@router.get(
+    "/metrics",
+    response_model=SupportSocketMetricsResponse,
+    dependencies=[Depends(require_roles("support_admin"))],
+)
+def get_socket_metrics():
+    """Live websocket connections, send queues and DB usage for this worker process."""
+    return SupportSocketMetricsResponse(
+        **manager.metrics(),
+        db_threads_busy=int(_ws_db_limiter.borrowed_tokens),
+        db_threads=int(_ws_db_limiter.total_tokens),
+        **pool_status(),
+    )
 
 
 def _extract_ws_token(websocket: WebSocket) -> Optional[str]:
@@ -406,9 +755,198 @@ def _extract_ws_token(websocket: WebSocket) -> Optional[str]:
     return None
 
 
+async def _authenticate_socket(websocket: WebSocket):
+    """
+    Resolve the user behind a socket's bearer token or auth cookie.
+
+    Returns (ok, user, role); user and role are None for anonymous sockets.
+    On an invalid token the socket is closed and ok is False.
+    """
+    token = _extract_ws_token(websocket)
+    if not token:
+        return True, None, None
+    payload = verify_token(token)
+    if not payload or payload.get("type") != "access":
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid token")
+        return False, None, None
+    user = await _run_db(get_user, payload.get("sub"))
+    if not user:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="User not found")
+        return False, None, None
+    return True, user, payload.get("role")
+
+
+async def _run_db(func, *args, **kwargs):
+    """Run blocking DB work for a socket on the dedicated websocket threads."""
+    return await anyio.to_thread.run_sync(partial(func, *args, **kwargs), limiter=_ws_db_limiter)
+
+
+async def _run_socket_db(func, *args):
+    """
+    Run ``func(db, *args)`` on the websocket threads with a session of its own.
+
+    Sockets hold no session between actions, so idle chat sockets pin neither
+    a pooled connection nor loaded objects.
+    """
+
+    def call():
+        with SessionLocal() as db:
+            return func(db, *args)
+
+    return await anyio.to_thread.run_sync(call, limiter=_ws_db_limiter)
+
+
+def _socket_history(db, conversation, last_seen_message_id: Optional[str] = None) -> dict:
+    if last_seen_message_id:
+        # Reconnecting client: send only what it missed
+        try:
+            missed, has_more = use_cases.message_page(
+                db, conversation.id, limit=settings.SUPPORT_HISTORY_LIMIT, after=last_seen_message_id
+            )
+        except ValueError:
+            pass  # Unknown cursor; fall back to the full window
+        else:
+            # Its own frame type: clients append it instead of replacing what they show
+            return {
+                "type": "history_delta",
+                "messages": [_map_message(m).model_dump(mode="json") for m in missed],
+                "has_more": has_more,
+                "after": last_seen_message_id,
+            }
+
+    history, has_more = use_cases.message_page(db, conversation.id, limit=settings.SUPPORT_HISTORY_LIMIT)
+
+    # Map context snapshot if available
+    context_data = None
+    if conversation.context_snapshot:
+        snapshot = conversation.context_snapshot
+        context_data = {
+            "cart_items": snapshot.cart_items,
+            "orders_summary": snapshot.orders_summary,
+            "wish_list_items": snapshot.wish_list_items,
+            "captured_at": snapshot.captured_at.isoformat() if snapshot.captured_at else None,
+        }
+
+    return {
+        "type": "history",
+        "messages": [_map_message(m).model_dump(mode="json") for m in history],
+        "has_more": has_more,
+        "context_snapshot": context_data,
+    }
+
+
+def _socket_history_page(db, conversation_id: str, data: dict) -> dict:
+    """``history_page`` frame for a client ``history`` action paging with ``before``/``after`` message ids."""
+    try:
+        limit = int(data.get("limit") or settings.SUPPORT_HISTORY_LIMIT)
+        limit = min(max(limit, 1), settings.SUPPORT_HISTORY_MAX_LIMIT)
+        messages, has_more = use_cases.message_page(
+            db, conversation_id, limit=limit, before=data.get("before"), after=data.get("after")
+        )
+    except (TypeError, ValueError) as exc:
+        return {"type": "error", "detail": str(exc)}
+    return {
+        "type": "history_page",
+        "messages": [_map_message(m).model_dump(mode="json") for m in messages],
+        "has_more": has_more,
+        "before": data.get("before"),
+        "after": data.get("after"),
+    }
+
+
+def _store_socket_message(
+    db,
+    conversation_id: str,
+    header: Optional[SupportConversationHeader],
+    sender_role: SenderRole,
+    sender_id: Optional[str],
+    body,
+    client_message_id=None,
+) -> Tuple[Optional[SupportConversationHeader], Optional[dict]]:
+    """
+    Validate and save a chat message.
+
+    ``header`` is the socket's cached conversation header; it is read only
+    when the cache is empty. A repeated ``client_message_id`` returns the
+    stored message, with its original id, as a ``duplicate`` event for the
+    sender alone; clients skip messages whose id they already show. Returns the
+    header used and the event to send back or broadcast.
+    """
+    if header is None:
+        header = use_cases.get_conversation_header(db, conversation_id)
+    if not header:
+        return None, {"type": "error", "detail": "Conversation not found"}
+    if header.status == ConversationStatus.CLOSED:
+        return header, {"type": "error", "detail": "Conversation is closed"}
+    if not body:
+        return header, {"type": "error", "detail": "Message body is required"}
+    if client_message_id is not None and (not isinstance(client_message_id, str) or len(client_message_id) > 64):
+        return header, {"type": "error", "detail": "client_message_id must be a string of at most 64 characters"}
+    message, created = use_cases.add_client_message(
+        db,
+        conversation_id=conversation_id,
+        sender_role=sender_role,
+        sender_id=sender_id,
+        body=body,
+        client_message_id=client_message_id or None,
+    )
+    if not message:
+        return header, None
+    event = {"type": "message", "payload": _map_message(message).model_dump(mode="json")}
+    if not created:
+        event["duplicate"] = True
+    return header, event
+
+
+async def _auto_claim(conversation, user, role):
+    """Claim an unassigned conversation for the agent opening it; returns the current conversation."""
+    if not (_is_agent(role) and user and conversation.assigned_agent_id is None):
+        return conversation
+    claimed = await _run_socket_db(use_cases.claim_conversation, conversation.id, user.id)
+    if not claimed:
+        return conversation
+    await manager.broadcast(claimed.id, _claimed_event(claimed))
+    await manager.broadcast(QUEUE_CHANNEL, _queue_delta("claimed", claimed))
+    return claimed
+
+
+async def _handle_chat_action(
+    websocket: WebSocket, conversation_id: str, data: dict, sender_role: SenderRole, sender_id: Optional[str]
+):
+    """Handle a send_message, history or typing action from a socket subscribed to the conversation."""
+    action = data.get("action")
+    if action == "send_message":
+        version = manager.header_version(conversation_id)
+        header, event = await _run_socket_db(
+            _store_socket_message,
+            conversation_id,
+            manager.cached_header(conversation_id, websocket),
+            sender_role,
+            sender_id,
+            data.get("body"),
+            data.get("client_message_id"),
+        )
+        manager.cache_header(conversation_id, websocket, header, version)
+        if event is None:
+            return
+        if event["type"] == "error" or event.get("duplicate"):
+            manager.send(conversation_id, websocket, event)
+        else:
+            await manager.broadcast(conversation_id, event)
+    elif action == "history":
+        page = await _run_socket_db(_socket_history_page, conversation_id, data)
+        manager.send(conversation_id, websocket, page)
+    elif action == "typing":
+        await manager.broadcast(
+            conversation_id,
+            {"type": "typing", "from": sender_role, "conversation_id": conversation_id},
+        )
+    else:
+        manager.send(conversation_id, websocket, {"type": "error", "detail": "Unknown action"})
+
+
 @router.websocket("/ws")
 async def websocket_support(websocket: WebSocket):
-    db = SessionLocal()
     params = websocket.query_params
     conversation_id = params.get("conversation_id")
     conversation_token = params.get("conversation_token")
@@ -418,99 +956,127 @@ async def websocket_support(websocket: WebSocket):
         return
 
     # Authenticate if possible
-    token = _extract_ws_token(websocket)
-    user = None
-    role = None
-    if token:
-        payload = verify_token(token)
-        if not payload or payload.get("type") != "access":
-            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid token")
-            db.close()
-            return
-        user = get_user(payload.get("sub"))
-        role = payload.get("role")
-        if not user:
-            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="User not found")
-            db.close()
-            return
+    authenticated, user, role = await _authenticate_socket(websocket)
+    if not authenticated:
+        return
 
-    conversation = use_cases.get_conversation(db, conversation_id)
+    conversation = await _run_socket_db(use_cases.get_conversation, conversation_id)
     try:
         _ensure_conversation_access(conversation, user.id if user else None, role, conversation_token)
     except HTTPException as exc:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=exc.detail)
-        db.close()
         return
 
-    # Auto-claim for agents if unassigned
-    if _is_agent(role) and conversation.assigned_agent_id is None and user:
-        claimed = use_cases.claim_conversation(db, conversation_id, user.id)
-        if claimed:
-            conversation = claimed
+    conversation = await _auto_claim(conversation, user, role)
+    # Messages arriving while history is read are held and sent after it
+    await manager.connect(conversation_id, websocket, hold=True)
 
-    await manager.connect(conversation_id, websocket)
+    sender_role = SenderRole.AGENT if _is_agent(role) else SenderRole.CUSTOMER
+    sender_id = user.id if user else None
 
-    # Send history and context once connected
-    history = use_cases.recent_messages(db, conversation_id, limit=settings.SUPPORT_HISTORY_LIMIT)
+    try:
+        history = await _run_socket_db(_socket_history, conversation, params.get("last_seen_message_id"))
+        manager.release(conversation_id, websocket, history)
+        while True:
+            data = await websocket.receive_json()
+            manager.touch(websocket)
+            await _handle_chat_action(websocket, conversation_id, data, sender_role, sender_id)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        manager.disconnect(conversation_id, websocket)
 
-    # Map context snapshot if available
-    context_data = None
-    if conversation.context_snapshot:
-        snapshot = conversation.context_snapshot
-        context_data = {
-            "cart_items": snapshot.cart_items,
-            "orders_summary": snapshot.orders_summary,
-            "wish_list_items": snapshot.wish_list_items,
-            "captured_at": snapshot.captured_at.isoformat() if snapshot.captured_at else None,
-        }
 
-    await websocket.send_json(
-        {
-            "type": "history",
-            "messages": [ _map_message(m).model_dump(mode="json") for m in history],
-            "context_snapshot": context_data,
-        }
-    )
+def _queue_snapshot(db) -> dict:
+    items = use_cases.list_queue(db, limit=settings.SUPPORT_QUEUE_LIMIT)
+    return {"type": "queue_snapshot", "conversations": [_map_summary(item).model_dump(mode="json") for item in items]}
 
-    sender_role = SenderRole.AGENT if _is_agent(role) else SenderRole.CUSTOMER
-    sender_id = user.id if user else None
 
+@router.websocket("/queue/ws")
+async def websocket_agent_queue(websocket: WebSocket):
+    """
+    Live agent queue: one ``queue_snapshot`` frame, then a ``queue_delta`` frame
+    whenever a conversation is opened, claimed, reprioritized or closed.
+
+    Deltas carry the full conversation summary, so clients upsert by id and
+    drop the conversation on ``closed``. Deltas raised while the snapshot is
+    read are held and sent after it.
+    """
+    authenticated, user, role = await _authenticate_socket(websocket)
+    if not authenticated:
+        return
+    if not user or not _is_agent(role):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Support agents only")
+        return
+
+    # Agents may watch the queue for hours without sending anything
+    await manager.connect(QUEUE_CHANNEL, websocket, hold=True, idle_reapable=False)
+    try:
+        manager.release(QUEUE_CHANNEL, websocket, await _run_socket_db(_queue_snapshot))
+        while True:
+            data = await websocket.receive_json()
+            if data.get("action") == "ping":
+                manager.send(QUEUE_CHANNEL, websocket, {"type": "pong"})
+            else:
+                manager.send(QUEUE_CHANNEL, websocket, {"type": "error", "detail": "Unknown action"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        manager.disconnect(QUEUE_CHANNEL, websocket)
+
+
+@router.websocket("/agent/ws")
+async def websocket_agent(websocket: WebSocket):
+    """
+    One socket for every conversation an agent has open.
+
+    Clients send ``subscribe`` / ``unsubscribe`` with a ``conversation_id``;
+    a subscription answers with that conversation's ``history`` frame (or
+    ``history_delta`` when resuming from ``last_seen_message_id``) and
+    auto-claims it like ``/ws`` does. Chat actions (send_message, history,
+    typing) take the same fields as on ``/ws`` plus ``conversation_id``, and
+    every frame sent back carries the ``conversation_id`` it belongs to.
+    """
+    authenticated, user, role = await _authenticate_socket(websocket)
+    if not authenticated:
+        return
+    if not user or not _is_agent(role):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Support agents only")
+        return
+
+    await manager.connect(None, websocket, idle_reapable=False, multiplexed=True)
     try:
         while True:
             data = await websocket.receive_json()
             action = data.get("action")
+            conversation_id = data.get("conversation_id")
+            subscribed = manager.subscriptions(websocket)
 
-            if action == "send_message":
-                body = data.get("body")
-                conversation = use_cases.get_conversation(db, conversation_id)
-                if not conversation:
-                    await websocket.send_json({"type": "error", "detail": "Conversation not found"})
+            if not conversation_id:
+                manager.send(None, websocket, {"type": "error", "detail": "conversation_id is required"})
+            elif action == "subscribe":
+                if conversation_id in subscribed:
                     continue
-                if conversation.status == ConversationStatus.CLOSED:
-                    await websocket.send_json({"type": "error", "detail": "Conversation is closed"})
+                if len(subscribed) >= settings.SUPPORT_AGENT_WS_MAX_SUBSCRIPTIONS:
+                    manager.send(conversation_id, websocket, {"type": "error", "detail": "Too many subscriptions"})
                     continue
-                if not body:
-                    await websocket.send_json({"type": "error", "detail": "Message body is required"})
+                conversation = await _run_socket_db(use_cases.get_conversation, conversation_id)
+                if conversation is None:
+                    manager.send(conversation_id, websocket, {"type": "error", "detail": "Conversation not found"})
                     continue
-                message = use_cases.add_message(
-                    db,
-                    conversation_id=conversation_id,
-                    sender_role=sender_role,
-                    sender_id=sender_id,
-                    body=body,
-                )
-                if message:
-                    payload = _map_message(message).model_dump(mode="json")
-                    await manager.broadcast(conversation_id, {"type": "message", "payload": payload})
-            elif action == "typing":
-                await manager.broadcast(
-                    conversation_id,
-                    {"type": "typing", "from": sender_role, "conversation_id": conversation_id},
-                )
+                conversation = await _auto_claim(conversation, user, role)
+                # Hold this conversation's messages until its history frame is sent
+                if manager.subscribe(conversation_id, websocket, hold=True):
+                    history = await _run_socket_db(_socket_history, conversation, data.get("last_seen_message_id"))
+                    manager.release(conversation_id, websocket, history)
+            elif action == "unsubscribe":
+                manager.unsubscribe(conversation_id, websocket)
+                manager.send(conversation_id, websocket, {"type": "unsubscribed"})
+            elif conversation_id not in subscribed:
+                manager.send(conversation_id, websocket, {"type": "error", "detail": "Not subscribed"})
             else:
-                await websocket.send_json({"type": "error", "detail": "Unknown action"})
+                await _handle_chat_action(websocket, conversation_id, data, SenderRole.AGENT, user.id)
     except WebSocketDisconnect:
-        manager.disconnect(conversation_id, websocket)
+        pass
     finally:
-        if db:
-            db.close()
+        manager.disconnect(None, websocket)
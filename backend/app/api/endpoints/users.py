@@ -1,10 +1,21 @@
 from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.orm import Session
 from app.domains.identity.schemas import UserUpdate, UserRead
 from app.domains.identity.use_cases import update_user_profile
+from app.domains.order import use_cases as order_use_cases
+from app.domains.order.schemas import CustomerOrderSummaryResponse
 from app.api.endpoints.auth import get_current_user
+from app.infrastructure.database.sqlite.session import get_db
 
 router = APIRouter(prefix="/api/v1/users", tags=["users"])
 
+
+@router.get("/me/summary", response_model=CustomerOrderSummaryResponse)
+def get_my_summary(user_with_role = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Order count, lifetime spend and recent order headers for the current user."""
+    current_user, _role = user_with_role
+    return order_use_cases.get_customer_summary(db, current_user.id)
+
 @router.put("/{user_id}", response_model=UserRead)
 def update_user(user_id: str, payload: UserUpdate, user_with_role = Depends(get_current_user)):
     current_user, role = user_with_role
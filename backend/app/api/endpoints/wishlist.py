@@ -1,5 +1,5 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
@@ -18,12 +18,14 @@ class WishlistAddRequest(BaseModel):
 
 @router.get("", response_model=List[ProductResponse])
 def list_wishlist(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
     user_with_role=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     user, _role = user_with_role
     wishlist_repo = WishlistRepositorySQLite(db)
-    products = wishlist_use_cases.list_wishlist(db, user.id, wishlist_repo)
+    products = wishlist_use_cases.list_wishlist(db, user.id, wishlist_repo, limit=limit, offset=offset)
     return products
 
 
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -27,12 +27,60 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str | None = None
     SMTP_STARTTLS: bool = True
     EMAIL_FROM: str = "no-reply@example.com"
+    SMTP_POOL_SIZE: int = 2
+    SMTP_KEEPALIVE_SECONDS: int = 60
+    # Messages in flight at once on the event-loop email transport
+    EMAIL_ASYNC_CONCURRENCY: int = 4
+
+    EMAIL_OUTBOX_POLL_SECONDS: int = 5
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 6
+    EMAIL_OUTBOX_BACKOFF_SECONDS: int = 30
+
+    # Wishlist emails are buffered per user and sent as one digest; 0 sends right after the change commits
+    WISHLIST_DIGEST_WINDOW_SECONDS: int = 300
+    WISHLIST_DIGEST_FLUSH_INTERVAL_SECONDS: int = 60
+    # Failed digests are retried with exponential backoff, then dropped after this many attempts
+    WISHLIST_DIGEST_MAX_ATTEMPTS: int = 5
+    WISHLIST_DIGEST_BACKOFF_SECONDS: int = 60
+
+    # Must exceed the 30-day refund window, which stays open until 31 full days after delivery
+    ORDER_ARCHIVE_RETENTION_DAYS: int = 31
+    ORDER_ARCHIVE_BATCH_SIZE: int = 500
 
     SUPPORT_ATTACHMENT_DIR: str = "./storage/support_attachments"
     SUPPORT_ATTACHMENT_MAX_MB: int = 15
     SUPPORT_ALLOWED_MIME_PREFIXES: List[str] = ["image/", "video/", "application/pdf"]
+    # Attachment blobs no attachment refers to are deleted after this grace period; the GC job runs every interval, 0 disables it
+    SUPPORT_BLOB_GC_GRACE_SECONDS: int = 3600
+    SUPPORT_BLOB_GC_INTERVAL_SECONDS: int = 3600
     SUPPORT_HISTORY_LIMIT: int = 50
+    # Wishlist items captured in a new conversation's customer context
+    SUPPORT_CONTEXT_WISHLIST_LIMIT: int = 20
+    # Minutes until a new conversation breaches its SLA, per priority
+    SUPPORT_SLA_MINUTES: Dict[str, int] = {"urgent": 15, "high": 60, "normal": 240, "low": 1440}
+    # Largest history page a client may request with before/after cursors
+    SUPPORT_HISTORY_MAX_LIMIT: int = 200
     SUPPORT_QUEUE_LIMIT: int = 50
+    # "memory" for a single worker; "sqlite" relays socket events between workers sharing the database
+    SUPPORT_BROADCAST_BACKEND: str = "memory"
+    SUPPORT_BROADCAST_POLL_SECONDS: float = 0.1
+    SUPPORT_BROADCAST_RETENTION_SECONDS: int = 60
+    # Worker threads for blocking DB calls made from support websockets
+    SUPPORT_WS_DB_THREADS: int = 8
+    # Outbound messages buffered per socket before a slow client is disconnected
+    SUPPORT_WS_SEND_QUEUE_SIZE: int = 100
+    SUPPORT_WS_SEND_TIMEOUT_SECONDS: float = 10
+    # Support sockets with no client activity for this long are closed; 0 (the default) keeps them open.
+    # The frontend neither pings nor reconnects, so only enable this for clients that send keepalives
+    SUPPORT_WS_IDLE_TIMEOUT_SECONDS: int = 0
+    # Conversations one multiplexed agent socket may follow at once
+    SUPPORT_AGENT_WS_MAX_SUBSCRIPTIONS: int = 50
+
+    @property
+    def smtp_configured(self) -> bool:
+        """True when every setting needed to log in and send email is present."""
+        return bool(self.SMTP_HOST and self.SMTP_USERNAME and self.SMTP_PASSWORD)
 
     class Config:
         env_file = ".env"
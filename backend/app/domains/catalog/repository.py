@@ -16,12 +16,12 @@ class ProductRepository:
         self.db.add(product)
         self.db.commit()
         self.db.refresh(product)
-        return self._to_entity(product)
+        return self.to_entity(product)
 
     def get_all(self) -> List[Product]:
         """Retrieve all products from the database."""
         products = self.db.query(ProductModel).all()
-        return [self._to_entity(p) for p in products]
+        return [self.to_entity(p) for p in products]
 
     def get_by_id(self, product_id: int, lock_for_update: bool = False) -> Optional[Product]:
         """Retrieve a single product by ID.
@@ -34,7 +34,14 @@ class ProductRepository:
         if lock_for_update:
             query = query.with_for_update()
         product = query.first()
-        return self._to_entity(product) if product else None
+        return self.to_entity(product) if product else None
+
+    def get_by_ids(self, product_ids: List[int]) -> List[Product]:
+        """Retrieve several products in one query; missing ids are skipped."""
+        if not product_ids:
+            return []
+        products = self.db.query(ProductModel).filter(ProductModel.id.in_(product_ids)).all()
+        return [self.to_entity(p) for p in products]
 
     def delete(self, product_id: int) -> bool:
         """Delete a product by ID. Returns True if deleted, False if not found."""
@@ -45,8 +52,12 @@ class ProductRepository:
             return True
         return False
 
-    def update(self, product_id: int, updates: dict) -> Optional[Product]:
-        """Update a product with the provided fields. Returns updated product or None if not found."""
+    def update(self, product_id: int, updates: dict, commit: bool = True) -> Optional[Product]:
+        """
+        Update a product with the provided fields. Returns updated product or None if not found.
+
+        With ``commit=False`` the change is only flushed and the caller commits.
+        """
         product = self.db.query(ProductModel).filter(ProductModel.id == product_id).first()
         if not product:
             return None
@@ -56,12 +67,15 @@ class ProductRepository:
             if hasattr(product, key) and value is not None:
                 setattr(product, key, value)
 
-        self.db.commit()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
         self.db.refresh(product)
-        return self._to_entity(product)
+        return self.to_entity(product)
     
-    def apply_discount(self, product_ids: List[int], discount_rate: float) -> List[Product]:
-        """Set discount metadata without overwriting base price."""
+    def apply_discount(self, product_ids: List[int], discount_rate: float, commit: bool = True) -> List[Product]:
+        """Set discount metadata without overwriting base price. ``commit=False`` leaves the commit to the caller."""
         if discount_rate <= 0 or discount_rate > 100:
             raise ValueError("discount_rate must be between 0 and 100")
 
@@ -73,13 +87,15 @@ class ProductRepository:
             product.discount_rate = discount_rate
             product.discount_active = True
 
-        self.db.commit()
-        for product in products:
-            self.db.refresh(product)
+        if commit:
+            self.db.commit()
+        # Reload the expired rows in one query rather than refreshing each
+        products = self.db.query(ProductModel).filter(ProductModel.id.in_(product_ids)).all()
 
-        return [self._to_entity(p) for p in products]
+        return [self.to_entity(p) for p in products]
 
-    def clear_discount(self, product_ids: List[int]) -> List[Product]:
+    def clear_discount(self, product_ids: List[int], commit: bool = True) -> List[Product]:
+        """Reset discount metadata. ``commit=False`` leaves the commit to the caller."""
         products = self.db.query(ProductModel).filter(ProductModel.id.in_(product_ids)).all()
         if not products:
             return []
@@ -88,14 +104,17 @@ class ProductRepository:
             product.discount_rate = 0.0
             product.discount_active = False
 
-        self.db.commit()
-        for product in products:
-            self.db.refresh(product)
+        if commit:
+            self.db.commit()
+        # Reload the expired rows in one query rather than refreshing each
+        products = self.db.query(ProductModel).filter(ProductModel.id.in_(product_ids)).all()
 
-        return [self._to_entity(p) for p in products]
+        return [self.to_entity(p) for p in products]
    
 
-    def _to_entity(self, model: ProductModel) -> Product:
+    @staticmethod
+    def to_entity(model: ProductModel) -> Product:
+        """Map a product row (with its category loaded) to the domain entity."""
         final_price = (
             round(model.price * (1 - model.discount_rate / 100), 2)
             if model.discount_active and model.discount_rate > 0
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from app.domains.catalog.repository import ProductRepository
 from app.domains.catalog.entity import Product
+from app.domains.notifications.fanout import WishlistFanout, detect_wishlist_events
 from app.domains.notifications.notifier import WishlistNotifier
 from app.domains.wishlist.repository import WishlistRepository
 
@@ -87,16 +88,21 @@ def update_product(
         db: Database session
         product_id: ID of the product to update
         updates: Dictionary of fields to update
+        wishlist_repo: Repository used to find the subscribers of changed products
+        notifier: Wishlist notifier; its rows are written before the update commits
 
     Returns:
         Updated Product entity if found, None otherwise
     """
     repository = ProductRepository(db)
     previous = repository.get_by_id(product_id)
-    updated = repository.update(product_id, updates)
+    updated = repository.update(product_id, updates, commit=False)
 
-    if previous and updated and wishlist_repo and notifier:
-        _notify_wishlist_on_changes(wishlist_repo, notifier, previous, updated)
+    if previous and updated:
+        fanout = WishlistFanout(wishlist_repo, notifier)
+        fanout.extend(detect_wishlist_events(previous, updated))
+        fanout.flush()
+    db.commit()
 
     return updated
 
@@ -110,16 +116,20 @@ def apply_discount(
 ) -> List[Product]:
     """
     Apply a percentage discount to multiple products.
+
+    Wishlist notifications are written in the same transaction as the discount.
     """
     repository = ProductRepository(db)
-    previous_map = {pid: repository.get_by_id(pid) for pid in product_ids}
-    updated_products = repository.apply_discount(product_ids, discount_rate)
+    previous_map = {p.id: p for p in repository.get_by_ids(product_ids)}
+    updated_products = repository.apply_discount(product_ids, discount_rate, commit=False)
 
-    if wishlist_repo and notifier:
-        for product in updated_products:
-            previous = previous_map.get(product.id)
-            if previous:
-                _notify_wishlist_on_changes(wishlist_repo, notifier, previous, product)
+    fanout = WishlistFanout(wishlist_repo, notifier)
+    for product in updated_products:
+        previous = previous_map.get(product.id)
+        if previous:
+            fanout.extend(detect_wishlist_events(previous, product))
+    fanout.flush()
+    db.commit()
 
     return updated_products
 
@@ -131,70 +141,15 @@ def clear_discount(
     notifier: Optional[WishlistNotifier] = None,
 ) -> List[Product]:
     repository = ProductRepository(db)
-    previous_map = {pid: repository.get_by_id(pid) for pid in product_ids}
-    updated_products = repository.clear_discount(product_ids)
+    previous_map = {p.id: p for p in repository.get_by_ids(product_ids)}
+    updated_products = repository.clear_discount(product_ids, commit=False)
 
-    if wishlist_repo and notifier:
-        for product in updated_products:
-            previous = previous_map.get(product.id)
-            if previous:
-                _notify_wishlist_on_changes(wishlist_repo, notifier, previous, product)
+    fanout = WishlistFanout(wishlist_repo, notifier)
+    for product in updated_products:
+        previous = previous_map.get(product.id)
+        if previous:
+            fanout.extend(detect_wishlist_events(previous, product))
+    fanout.flush()
+    db.commit()
 
     return updated_products
-
-
-def _notify_wishlist_on_changes(
-    wishlist_repo: WishlistRepository,
-    notifier: WishlistNotifier,
-    previous: Product,
-    current: Product,
-) -> None:
-    user_ids = wishlist_repo.get_user_ids_by_product(int(current.id))
-    if not user_ids:
-        return
-
-    # Stock back in (0 -> >0)
-    if previous.stock == 0 and current.stock > 0:
-        notifier.send_stock_email(
-            user_ids,
-            {
-                "id": current.id,
-                "name": current.name,
-                "price": current.price,
-                "final_price": current.final_price or current.price,
-                "stock": current.stock,
-                "image": getattr(current, "image", None),
-            },
-        )
-
-    # Stock depleted (>0 -> 0)
-    if previous.stock > 0 and current.stock == 0:
-        notifier.send_out_of_stock_email(
-            user_ids,
-            {
-                "id": current.id,
-                "name": current.name,
-                "price": current.price,
-                "final_price": current.final_price or current.price,
-                "stock": current.stock,
-                "image": getattr(current, "image", None),
-            },
-        )
-
-    # Discount state changed
-    if (
-        previous.discount_active != current.discount_active
-        or (previous.discount_rate or 0) != (current.discount_rate or 0)
-    ):
-        notifier.send_discount_email(
-            user_ids,
-            {
-                "id": current.id,
-                "name": current.name,
-                "price": current.price,
-                "final_price": current.final_price or current.price,
-                "image": getattr(current, "image", None),
-            },
-            current.discount_active,
-            current.discount_rate or 0,
-        )
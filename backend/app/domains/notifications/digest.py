@@ -0,0 +1,47 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.domains.notifications.notifier import WishlistEventType
+
+
+@dataclass
+class WishlistDigestItem:
+    """One buffered wishlist event for a single recipient."""
+
+    id: int
+    event_type: WishlistEventType
+    product: Dict[str, Any]
+    discount_active: bool = False
+    discount_rate: float = 0.0
+    created_at: Optional[datetime] = None
+
+
+@dataclass
+class WishlistDigest:
+    """All pending wishlist events for one user, sent as a single email."""
+
+    user_id: str
+    email: str
+    items: List[WishlistDigestItem] = field(default_factory=list)
+    # Buffered entries covered by this digest, including ones coalesced away
+    entry_ids: List[int] = field(default_factory=list)
+    # Send attempts so far, counting the current one
+    attempts: int = 0
+
+
+def coalesce_digest_items(items: List[WishlistDigestItem]) -> List[WishlistDigestItem]:
+    """
+    Collapse a user's buffered events to what is still true at send time.
+
+    Stock events for the same product supersede each other (a restock followed by
+    a sell-out only reports the sell-out), as do discount events. Items are
+    expected in the order they were recorded; the result keeps that order.
+    """
+    latest: Dict[tuple, WishlistDigestItem] = {}
+    for item in items:
+        kind = "discount" if item.event_type == WishlistEventType.DISCOUNT_CHANGED else "stock"
+        key = (item.product.get("id"), kind)
+        latest.pop(key, None)
+        latest[key] = item
+    return list(latest.values())
@@ -0,0 +1,116 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.logging import logger
+from app.domains.notifications.notifier import WishlistEvent, WishlistEventType, WishlistNotifier
+from app.domains.wishlist.repository import WishlistRecipient, WishlistRepository
+
+
+def product_payload(product) -> Dict[str, Any]:
+    """Product fields included in wishlist notifications."""
+    return {
+        "id": product.id,
+        "name": product.name,
+        "price": product.price,
+        "final_price": product.final_price or product.price,
+        "stock": product.stock,
+        "image": getattr(product, "image", None),
+    }
+
+
+def detect_wishlist_events(previous, current) -> List[WishlistEvent]:
+    """Compare two product snapshots and return the wishlist events they imply."""
+    events: List[WishlistEvent] = []
+
+    # Stock back in (0 -> >0)
+    if previous.stock == 0 and current.stock > 0:
+        events.append(WishlistEvent(WishlistEventType.BACK_IN_STOCK, product_payload(current)))
+
+    # Stock depleted (>0 -> 0)
+    if previous.stock > 0 and current.stock == 0:
+        events.append(WishlistEvent(WishlistEventType.OUT_OF_STOCK, product_payload(current)))
+
+    # Discount state changed
+    if (
+        previous.discount_active != current.discount_active
+        or (previous.discount_rate or 0) != (current.discount_rate or 0)
+    ):
+        events.append(
+            WishlistEvent(
+                WishlistEventType.DISCOUNT_CHANGED,
+                product_payload(current),
+                discount_active=current.discount_active,
+                # An ended discount carries the rate that just ended
+                discount_rate=(
+                    current.discount_rate if current.discount_active
+                    else previous.discount_rate if previous.discount_active
+                    else 0
+                ) or 0,
+            )
+        )
+
+    return events
+
+
+class WishlistFanout:
+    """
+    Collects wishlist events during a request and fans them out in one batch.
+
+    All affected products are resolved to recipients with a single repository
+    call on flush. Delivery runs inline, so flush before committing the
+    product change: a transactional notifier then writes its rows in the same
+    transaction and nothing is queued for a change that is rolled back.
+    """
+
+    def __init__(
+        self,
+        wishlist_repo: Optional[WishlistRepository],
+        notifier: Optional[WishlistNotifier],
+    ):
+        self.wishlist_repo = wishlist_repo
+        self.notifier = notifier
+        self.events: List[WishlistEvent] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.wishlist_repo is not None and self.notifier is not None
+
+    def extend(self, events: List[WishlistEvent]) -> None:
+        if self.enabled:
+            self.events.extend(events)
+
+    def flush(self) -> int:
+        """Resolve recipients and deliver the collected events. Returns number of deliveries."""
+        if not self.enabled or not self.events:
+            return 0
+
+        events, self.events = self.events, []
+        recipients = self.wishlist_repo.get_recipients_by_products(e.product["id"] for e in events)
+
+        deliveries: List[Tuple[WishlistEvent, List[WishlistRecipient]]] = [
+            (event, recipients[event.product["id"]])
+            for event in events
+            if recipients.get(event.product["id"])
+        ]
+        if not deliveries:
+            return 0
+
+        logger.info(
+            f"Wishlist fan-out: {len(deliveries)} deliveries to "
+            f"{sum(len(r) for _, r in deliveries)} recipients across {len(recipients)} products"
+        )
+        self._deliver(deliveries)
+        return len(deliveries)
+
+    def _deliver(self, deliveries: List[Tuple[WishlistEvent, List[WishlistRecipient]]]) -> None:
+        for event, recipients in deliveries:
+            try:
+                if event.event_type == WishlistEventType.BACK_IN_STOCK:
+                    self.notifier.send_stock_email(recipients, event.product)
+                elif event.event_type == WishlistEventType.OUT_OF_STOCK:
+                    self.notifier.send_out_of_stock_email(recipients, event.product)
+                elif event.event_type == WishlistEventType.DISCOUNT_CHANGED:
+                    self.notifier.send_discount_email(
+                        recipients, event.product, event.discount_active, event.discount_rate
+                    )
+            except Exception as exc:  # noqa: BLE001
+                logger.error(f"Wishlist delivery failed for product {event.product.get('id')}: {exc}")
@@ -1,16 +1,40 @@
-from typing import Protocol, List, Dict, Any
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING, Protocol, List, Dict, Any
+
+from app.domains.wishlist.repository import WishlistRecipient
+
+if TYPE_CHECKING:
+    from app.domains.notifications.digest import WishlistDigest
+
+
+class WishlistEventType(str, Enum):
+    BACK_IN_STOCK = "back_in_stock"
+    OUT_OF_STOCK = "out_of_stock"
+    DISCOUNT_CHANGED = "discount_changed"
+
+
+@dataclass
+class WishlistEvent:
+    """A product change that wishlisters should hear about."""
+
+    event_type: WishlistEventType
+    product: Dict[str, Any]
+    discount_active: bool = False
+    # Rate now in effect; when a discount ends, the rate that just ended
+    discount_rate: float = 0.0
 
 
 class WishlistNotifier(Protocol):
-    def send_stock_email(self, user_ids: List[str], product: Dict[str, Any]) -> None:
+    def send_stock_email(self, recipients: List[WishlistRecipient], product: Dict[str, Any]) -> None:
         ...
 
-    def send_out_of_stock_email(self, user_ids: List[str], product: Dict[str, Any]) -> None:
+    def send_out_of_stock_email(self, recipients: List[WishlistRecipient], product: Dict[str, Any]) -> None:
         ...
 
     def send_discount_email(
         self,
-        user_ids: List[str],
+        recipients: List[WishlistRecipient],
         product: Dict[str, Any],
         discount_active: bool,
         discount_rate: float,
@@ -18,25 +42,35 @@ class WishlistNotifier(Protocol):
         ...
 
 
+class WishlistDigestSender(Protocol):
+    def send_digest_email(self, digest: "WishlistDigest") -> bool:
+        """Send one combined message; return True once it has been handed to the mail server."""
+        ...
+
+
 class ConsoleWishlistNotifier(WishlistNotifier):
     """Simple notifier that logs to stdout; replace with real email service."""
 
-    def send_stock_email(self, user_ids: List[str], product: Dict[str, Any]) -> None:
-        print("[NOTIFY] back-in-stock", user_ids, product)
+    def send_stock_email(self, recipients: List[WishlistRecipient], product: Dict[str, Any]) -> None:
+        print("[NOTIFY] back-in-stock", [r.user_id for r in recipients], product)
 
-    def send_out_of_stock_email(self, user_ids: List[str], product: Dict[str, Any]) -> None:
-        print("[NOTIFY] out-of-stock", user_ids, product)
+    def send_out_of_stock_email(self, recipients: List[WishlistRecipient], product: Dict[str, Any]) -> None:
+        print("[NOTIFY] out-of-stock", [r.user_id for r in recipients], product)
 
     def send_discount_email(
         self,
-        user_ids: List[str],
+        recipients: List[WishlistRecipient],
         product: Dict[str, Any],
         discount_active: bool,
         discount_rate: float,
     ) -> None:
         print(
             "[NOTIFY] discount-changed",
-            user_ids,
+            [r.user_id for r in recipients],
             product,
             {"discount_active": discount_active, "discount_rate": discount_rate},
         )
+
+    def send_digest_email(self, digest: "WishlistDigest") -> bool:
+        print("[NOTIFY] digest", digest.user_id, [(i.event_type.value, i.product.get("id")) for i in digest.items])
+        return True
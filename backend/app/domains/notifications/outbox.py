@@ -0,0 +1,45 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+
+
+class EmailOutboxStatus(str, Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    DEAD = "dead"
+
+
+@dataclass
+class OutboxEmail:
+    """
+    An email queued for delivery by the outbox worker.
+
+    ``template`` names the renderer used at send time and ``context`` holds its
+    arguments; ``order_id`` links emails about an order and is filled in by the
+    order repository when the email is queued with the order change.
+    """
+
+    template: str
+    to_address: str
+    context: Dict[str, Any] = field(default_factory=dict)
+    order_id: Optional[int] = None
+    id: Optional[int] = None
+    status: EmailOutboxStatus = EmailOutboxStatus.PENDING
+    attempts: int = 0
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+@dataclass
+class OutboxDrainReport:
+    claimed: int = 0
+    sent: int = 0
+    retried: int = 0
+    dead: int = 0
+
+
+def backoff_seconds(attempts: int, base_seconds: float, cap_seconds: float = 3600) -> float:
+    """Exponential backoff before retry number ``attempts`` (1-based)."""
+    return min(cap_seconds, base_seconds * (2 ** max(0, attempts - 1)))
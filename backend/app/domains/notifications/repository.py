@@ -0,0 +1,214 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.domains.notifications.digest import WishlistDigest, WishlistDigestItem
+from app.domains.notifications.notifier import WishlistEvent, WishlistEventType
+from app.domains.notifications.outbox import EmailOutboxStatus, OutboxEmail
+from app.domains.wishlist.repository import WishlistRecipient
+from app.infrastructure.database.sqlite.models.email_outbox import EmailOutboxModel
+from app.infrastructure.database.sqlite.models.wishlist import WishlistDigestEntryModel
+
+
+class WishlistDigestRepository:
+    """Repository for buffered wishlist digest entries."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, event: WishlistEvent, recipients: List[WishlistRecipient]) -> int:
+        """
+        Buffer one event for every recipient with a single INSERT. Returns rows added.
+
+        Nothing is committed; the entries are saved with the caller's transaction.
+        """
+        rows = [
+            {
+                "user_id": r.user_id,
+                "email": r.email,
+                "event_type": event.event_type.value,
+                "product_id": event.product["id"],
+                "payload": {
+                    "product": event.product,
+                    "discount_active": event.discount_active,
+                    "discount_rate": event.discount_rate,
+                },
+            }
+            for r in recipients
+            if r.email
+        ]
+        if not rows:
+            return 0
+        self.db.execute(insert(WishlistDigestEntryModel), rows)
+        return len(rows)
+
+    def claim_due(self, cutoff: datetime, now: datetime, limit: int, lease_seconds: int = 300) -> List[WishlistDigest]:
+        """
+        Atomically claim the buffered entries of up to ``limit`` due users.
+
+        A user is due once their oldest entry was recorded at or before
+        ``cutoff`` and none of their entries is leased or waiting for a retry.
+        Claimed entries get ``next_attempt_at`` pushed out by the lease, so no
+        other worker sends the same digest and a crashed worker's entries
+        become due again.
+        """
+        latest_attempt = func.max(WishlistDigestEntryModel.next_attempt_at)
+        due_users = (
+            select(WishlistDigestEntryModel.user_id)
+            .group_by(WishlistDigestEntryModel.user_id)
+            .having(
+                func.min(WishlistDigestEntryModel.created_at) <= cutoff,
+                or_(latest_attempt.is_(None), latest_attempt <= now),
+            )
+            .limit(limit)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(WishlistDigestEntryModel)
+            .where(WishlistDigestEntryModel.user_id.in_(due_users))
+            .values(
+                attempts=WishlistDigestEntryModel.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=lease_seconds),
+            )
+            .returning(WishlistDigestEntryModel)
+            .execution_options(synchronize_session=False)
+        )
+        rows = sorted(self.db.scalars(stmt), key=lambda row: (row.user_id, row.id))
+        self.db.commit()
+        return self._group_digests(rows)
+
+    def retry_entries(self, entry_ids: List[int], retry_at: datetime) -> None:
+        """Release claimed entries for another attempt at ``retry_at``."""
+        if not entry_ids:
+            return
+        self.db.execute(
+            update(WishlistDigestEntryModel)
+            .where(WishlistDigestEntryModel.id.in_(entry_ids))
+            .values(next_attempt_at=retry_at)
+        )
+        self.db.commit()
+
+    @staticmethod
+    def _group_digests(rows: List[WishlistDigestEntryModel]) -> List[WishlistDigest]:
+        """Group entry rows, ordered by user, into one digest per user."""
+        digests: Dict[str, WishlistDigest] = {}
+        for row in rows:
+            digest = digests.setdefault(row.user_id, WishlistDigest(user_id=row.user_id, email=row.email))
+            # Latest address wins if the user changed email while entries were buffered
+            digest.email = row.email
+            digest.attempts = max(digest.attempts, row.attempts)
+            payload = row.payload or {}
+            digest.items.append(
+                WishlistDigestItem(
+                    id=row.id,
+                    event_type=WishlistEventType(row.event_type),
+                    product=payload.get("product", {"id": row.product_id}),
+                    discount_active=payload.get("discount_active", False),
+                    discount_rate=payload.get("discount_rate", 0.0),
+                    created_at=row.created_at,
+                )
+            )
+        return list(digests.values())
+
+    def delete_entries(self, entry_ids: List[int]) -> int:
+        """Remove sent entries. Returns the number of rows deleted."""
+        if not entry_ids:
+            return 0
+        result = self.db.execute(
+            delete(WishlistDigestEntryModel).where(WishlistDigestEntryModel.id.in_(entry_ids))
+        )
+        self.db.commit()
+        return result.rowcount or 0
+
+
+class EmailOutboxRepository:
+    """Repository for the transactional email outbox."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add(self, email: OutboxEmail, order_id: Optional[int] = None) -> None:
+        """Queue an email without committing; it is saved with the caller's transaction."""
+        self.db.add(
+            EmailOutboxModel(
+                template=email.template,
+                to_address=email.to_address,
+                context=email.context or None,
+                order_id=order_id if order_id is not None else email.order_id,
+                status=EmailOutboxStatus.PENDING,
+                attempts=0,
+                next_attempt_at=datetime.utcnow(),
+            )
+        )
+
+    def claim_due(self, now: datetime, limit: int, lease_seconds: int = 300) -> List[OutboxEmail]:
+        """
+        Atomically claim up to ``limit`` due emails for sending.
+
+        Claimed rows move to SENDING with ``next_attempt_at`` pushed out by the
+        lease, so rows left behind by a crashed worker become due again.
+        """
+        due_ids = (
+            select(EmailOutboxModel.id)
+            .where(
+                EmailOutboxModel.status.in_([EmailOutboxStatus.PENDING, EmailOutboxStatus.SENDING]),
+                EmailOutboxModel.next_attempt_at <= now,
+            )
+            .order_by(EmailOutboxModel.next_attempt_at, EmailOutboxModel.id)
+            .limit(limit)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(EmailOutboxModel)
+            .where(EmailOutboxModel.id.in_(due_ids))
+            .values(
+                status=EmailOutboxStatus.SENDING,
+                attempts=EmailOutboxModel.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=lease_seconds),
+            )
+            .returning(EmailOutboxModel)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = [self._to_entity(row) for row in self.db.scalars(stmt)]
+        self.db.commit()
+        return sorted(claimed, key=lambda e: e.id)
+
+    def mark_sent(self, email_id: int) -> None:
+        self.db.execute(
+            update(EmailOutboxModel)
+            .where(EmailOutboxModel.id == email_id)
+            .values(status=EmailOutboxStatus.SENT, sent_at=datetime.utcnow(), last_error=None)
+        )
+        self.db.commit()
+
+    def mark_failed(self, email_id: int, error: str, retry_at: Optional[datetime]) -> None:
+        """Schedule a retry at ``retry_at``, or dead-letter the email when it is None."""
+        values = {"last_error": error[:2000]}
+        if retry_at is None:
+            values["status"] = EmailOutboxStatus.DEAD
+        else:
+            values["status"] = EmailOutboxStatus.PENDING
+            values["next_attempt_at"] = retry_at
+        self.db.execute(update(EmailOutboxModel).where(EmailOutboxModel.id == email_id).values(**values))
+        self.db.commit()
+
+    def count_by_status(self) -> Dict[str, int]:
+        rows = self.db.execute(
+            select(EmailOutboxModel.status, func.count()).group_by(EmailOutboxModel.status)
+        ).all()
+        return {status.value: count for status, count in rows}
+
+    def _to_entity(self, model: EmailOutboxModel) -> OutboxEmail:
+        return OutboxEmail(
+            id=model.id,
+            template=model.template,
+            to_address=model.to_address,
+            context=model.context or {},
+            order_id=model.order_id,
+            status=model.status,
+            attempts=model.attempts,
+            last_error=model.last_error,
+            created_at=model.created_at,
+        )
@@ -0,0 +1,201 @@
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.logging import logger
+from app.domains.notifications.digest import WishlistDigest, coalesce_digest_items
+from app.domains.notifications.notifier import WishlistDigestSender
+from app.domains.notifications.outbox import OutboxDrainReport, OutboxEmail, backoff_seconds
+from app.domains.notifications.repository import EmailOutboxRepository, WishlistDigestRepository
+
+
+def collect_due_digests(
+    db: Session,
+    window_seconds: int = 300,
+    max_users: int = 500,
+    now: Optional[datetime] = None,
+) -> List[WishlistDigest]:
+    """
+    Claim the coalesced digests of users whose buffer window has elapsed.
+
+    A user's window starts with their oldest buffered event, so a burst of
+    changes (e.g. a sale discounting many products) lands in a single message.
+    Claims are leased, so concurrent workers never send the same digest.
+
+    Args:
+        db: Database session
+        window_seconds: How long to buffer events before sending
+        max_users: Maximum digests returned
+        now: Reference time (defaults to current UTC time)
+
+    Returns:
+        Digests ready to send; pass each to complete_digest once delivered,
+        or to fail_digest if sending failed
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(seconds=window_seconds)
+    digests = WishlistDigestRepository(db).claim_due(cutoff, now, max_users)
+    for digest in digests:
+        digest.entry_ids = [item.id for item in digest.items]
+        digest.items = coalesce_digest_items(digest.items)
+    return digests
+
+
+def complete_digest(db: Session, digest: WishlistDigest) -> None:
+    """Remove the buffered entries of a digest that has been sent."""
+    WishlistDigestRepository(db).delete_entries(digest.entry_ids)
+
+
+def fail_digest(
+    db: Session,
+    digest: WishlistDigest,
+    max_attempts: int = 5,
+    backoff_base_seconds: float = 60,
+    now: Optional[datetime] = None,
+) -> None:
+    """
+    Schedule a failed digest for a retry with exponential backoff.
+
+    After ``max_attempts`` attempts its entries are dropped: the events are
+    informational and a newer change to the product will be reported anyway.
+    """
+    repository = WishlistDigestRepository(db)
+    if digest.attempts >= max_attempts:
+        repository.delete_entries(digest.entry_ids)
+        logger.error(f"Wishlist digest for user {digest.user_id} dropped after {digest.attempts} attempts")
+        return
+    retry_at = (now or datetime.utcnow()) + timedelta(seconds=backoff_seconds(digest.attempts, backoff_base_seconds))
+    repository.retry_entries(digest.entry_ids, retry_at)
+
+
+def flush_wishlist_digests(
+    db: Session,
+    sender: WishlistDigestSender,
+    window_seconds: int = 300,
+    max_users: int = 500,
+    now: Optional[datetime] = None,
+    max_attempts: int = 5,
+    backoff_base_seconds: float = 60,
+) -> int:
+    """
+    Send one combined wishlist email to each user whose buffer window has elapsed.
+
+    Entries are removed only after their digest was sent; failed sends are
+    retried with exponential backoff and dropped after ``max_attempts``.
+
+    Args:
+        db: Database session
+        sender: Delivers the combined message
+        window_seconds: How long to buffer events before sending
+        max_users: Maximum digests sent in this call
+        now: Reference time (defaults to current UTC time)
+        max_attempts: Attempts before a digest is dropped
+        backoff_base_seconds: Delay before the first retry, doubled per attempt
+
+    Returns:
+        Number of digests sent
+    """
+    digests = collect_due_digests(db, window_seconds, max_users, now)
+    if not digests:
+        return 0
+
+    sent = 0
+    for digest in digests:
+        if not sender.send_digest_email(digest):
+            fail_digest(db, digest, max_attempts, backoff_base_seconds, now)
+            continue
+        complete_digest(db, digest)
+        sent += 1
+
+    logger.info(
+        f"Wishlist digests: sent {sent}/{len(digests)} covering "
+        f"{sum(len(d.entry_ids) for d in digests)} buffered events"
+    )
+    return sent
+
+
+def drain_email_outbox(
+    db: Session,
+    deliver: Callable[[OutboxEmail], None],
+    batch_size: int = 50,
+    max_attempts: int = 6,
+    backoff_base_seconds: float = 30,
+    now: Optional[datetime] = None,
+) -> OutboxDrainReport:
+    """
+    Send one batch of due outbox emails.
+
+    Failed sends are retried with exponential backoff; after ``max_attempts``
+    the email is moved to the dead-letter state and left for inspection.
+
+    Args:
+        db: Database session
+        deliver: Sends one email; raises on failure
+        batch_size: Maximum emails claimed in this call
+        max_attempts: Attempts before an email is dead-lettered
+        backoff_base_seconds: Delay before the first retry, doubled per attempt
+        now: Reference time (defaults to current UTC time)
+
+    Returns:
+        OutboxDrainReport with counts for this batch
+    """
+    now = now or datetime.utcnow()
+    report = OutboxDrainReport()
+
+    for email in claim_outbox_batch(db, batch_size, now):
+        try:
+            deliver(email)
+        except Exception as exc:  # noqa: BLE001
+            record_outbox_result(db, email, report, exc, max_attempts, backoff_base_seconds, now)
+            continue
+        record_outbox_result(db, email, report, None, max_attempts, backoff_base_seconds, now)
+
+    log_outbox_report(report)
+    return report
+
+
+def claim_outbox_batch(db: Session, batch_size: int = 50, now: Optional[datetime] = None) -> List[OutboxEmail]:
+    """Claim up to ``batch_size`` due outbox emails for this worker."""
+    return EmailOutboxRepository(db).claim_due(now or datetime.utcnow(), batch_size)
+
+
+def record_outbox_result(
+    db: Session,
+    email: OutboxEmail,
+    report: OutboxDrainReport,
+    error: Optional[Exception] = None,
+    max_attempts: int = 6,
+    backoff_base_seconds: float = 30,
+    now: Optional[datetime] = None,
+) -> None:
+    """
+    Store the outcome of one delivery attempt and add it to ``report``.
+
+    Failures are rescheduled with exponential backoff, or dead-lettered once
+    the email has used ``max_attempts`` attempts.
+    """
+    repository = EmailOutboxRepository(db)
+    report.claimed += 1
+    if error is None:
+        repository.mark_sent(email.id)
+        report.sent += 1
+        return
+
+    if email.attempts >= max_attempts:
+        repository.mark_failed(email.id, str(error), retry_at=None)
+        report.dead += 1
+        logger.error(f"Email {email.id} ({email.template}) dead-lettered after {email.attempts} attempts: {error}")
+        return
+
+    retry_at = (now or datetime.utcnow()) + timedelta(seconds=backoff_seconds(email.attempts, backoff_base_seconds))
+    repository.mark_failed(email.id, str(error), retry_at=retry_at)
+    report.retried += 1
+    logger.warning(f"Email {email.id} ({email.template}) failed, retry at {retry_at}: {error}")
+
+
+def log_outbox_report(report: OutboxDrainReport) -> None:
+    if report.claimed:
+        logger.info(
+            f"Email outbox: {report.sent} sent, {report.retried} retrying, {report.dead} dead-lettered"
+        )
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from typing import Optional, List, Dict
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 
 
@@ -14,6 +14,31 @@ class OrderStatus(str, Enum):
     REFUNDED = "refunded"
 
 
+class OrderEventType(str, Enum):
+    """Order lifecycle event enumeration."""
+    CREATED = "created"
+    STATUS_CHANGED = "status_changed"
+    CANCELLED = "cancelled"
+    REFUND_REQUESTED = "refund_requested"
+    REFUND_APPROVED = "refund_approved"
+    REFUND_REJECTED = "refund_rejected"
+
+
+# A refund can be requested until this many whole days have passed since delivery
+REFUND_WINDOW_DAYS = 30
+
+
+def refund_window_open(delivered_at: datetime, now: Optional[datetime] = None) -> bool:
+    """True while a refund can still be requested for an order delivered at ``delivered_at``."""
+    return ((now or datetime.utcnow()) - delivered_at).days <= REFUND_WINDOW_DAYS
+
+
+def refund_window_closed_before(now: Optional[datetime] = None) -> datetime:
+    """Orders delivered before this instant are past the refund window."""
+    # .days truncates, so the window only closes once REFUND_WINDOW_DAYS + 1 days have passed
+    return (now or datetime.utcnow()) - timedelta(days=REFUND_WINDOW_DAYS + 1)
+
+
 @dataclass
 class OrderItem:
     """Order item entity representing a product in an order."""
@@ -51,3 +76,39 @@ class Order:
     refund_reason: Optional[str] = None
     refund_items: Optional[List[Dict]] = None  # Requested refund items (product_id, quantity)
     customer_name: Optional[str] = None
+
+
+@dataclass
+class OrderEvent:
+    """Append-only record of a single order lifecycle change."""
+
+    id: Optional[int]
+    order_id: int
+    customer_id: str
+    event_type: OrderEventType
+    payload: Dict
+    created_at: Optional[datetime]
+
+
+@dataclass
+class OrderArchivalReport:
+    """Outcome of an order archival run."""
+
+    archived_orders: int = 0
+    archived_items: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    orders_per_second: float = 0.0
+    max_lock_hold_ms: float = 0.0  # Longest single write transaction
+    avg_lock_hold_ms: float = 0.0
+
+
+@dataclass
+class CustomerOrderSummary:
+    """Compact per-customer order projection (no items, no decrypted addresses)."""
+
+    customer_id: str
+    order_count: int
+    lifetime_spend: float
+    recent_orders: List[Dict]  # Newest first: id, status, amounts, timestamps
+    updated_at: Optional[datetime] = None
@@ -1,16 +1,30 @@
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime
 import json
-from sqlalchemy.orm import Session
-from app.infrastructure.database.sqlite.models.order import OrderModel, OrderItemModel
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload
+from app.infrastructure.database.sqlite.models.order import (
+    OrderModel,
+    OrderItemModel,
+    OrderEventModel,
+    OrderArchiveModel,
+    OrderItemArchiveModel,
+    CustomerOrderSummaryModel,
+)
 from app.infrastructure.database.sqlite.models.user import UserModel
-from app.domains.order.entity import Order, OrderItem, OrderStatus
+from app.domains.order.entity import Order, OrderItem, OrderStatus, OrderEvent, OrderEventType, CustomerOrderSummary, refund_window_open
+from app.domains.notifications.outbox import OutboxEmail
+from app.domains.notifications.repository import EmailOutboxRepository
 from app.core.crypto import encrypt_str, decrypt_str
 
 
 class OrderRepository:
     """Repository for order data access operations."""
 
+    # Number of order headers kept in each customer summary projection
+    SUMMARY_RECENT_ORDERS = 5
+
     def __init__(self, db: Session):
         self.db = db
 
@@ -21,8 +35,141 @@ class OrderRepository:
             return None
         return f"{user.first_name} {user.last_name}".strip()
 
-    def create(self, order: Order) -> Order:
-        """Create a new order with items."""
+    def _record_event(self, order: OrderModel, event_type: OrderEventType, payload: Optional[Dict] = None) -> None:
+        """Append a lifecycle event; committed together with the order change."""
+        self.db.add(
+            OrderEventModel(
+                order_id=order.id,
+                customer_id=order.customer_id,
+                event_type=event_type,
+                payload=payload or None,
+            )
+        )
+
+    def _queue_emails(self, order: OrderModel, emails: Optional[List[OutboxEmail]]) -> None:
+        """Queue outbox emails about this order; committed together with the order change."""
+        if not emails:
+            return
+        outbox = EmailOutboxRepository(self.db)
+        for email in emails:
+            outbox.add(email, order_id=order.id)
+
+    @staticmethod
+    def _spend_contribution(order) -> float:
+        """Amount an order contributes to lifetime spend in its current state."""
+        if order.status == OrderStatus.CANCELLED:
+            return 0.0
+        if order.status == OrderStatus.REFUNDED:
+            return order.total_amount - (order.refund_amount or 0.0)
+        return order.total_amount
+
+    @staticmethod
+    def _summary_header(order) -> Dict:
+        """Header fields stored in the summary projection (works for models and rows)."""
+        return {
+            "id": order.id,
+            "status": OrderStatus(order.status).value,
+            "total_amount": order.total_amount,
+            "tax_amount": order.tax_amount,
+            "shipping_amount": order.shipping_amount,
+            "created_at": order.created_at.isoformat() if order.created_at else None,
+            "delivered_at": order.delivered_at.isoformat() if order.delivered_at else None,
+        }
+
+    def _recent_headers(self, customer_id: str) -> List[Dict]:
+        """The customer's newest order headers across hot and archived orders, read from the order tables."""
+        headers: List = []
+        for model in (OrderModel, OrderArchiveModel):
+            headers.extend(
+                self.db.query(
+                    model.id,
+                    model.status,
+                    model.total_amount,
+                    model.tax_amount,
+                    model.shipping_amount,
+                    model.created_at,
+                    model.delivered_at,
+                )
+                .filter(model.customer_id == customer_id)
+                .order_by(model.created_at.desc(), model.id.desc())
+                .limit(self.SUMMARY_RECENT_ORDERS)
+                .all()
+            )
+        headers.sort(key=lambda h: (h.created_at, h.id), reverse=True)
+        return [self._summary_header(h) for h in headers[: self.SUMMARY_RECENT_ORDERS]]
+
+    def _customer_totals(self, customer_id: str) -> Dict:
+        """Recompute a customer's order count and lifetime spend from hot and archived orders."""
+        order_count = 0
+        lifetime_spend = 0.0
+        for model in (OrderModel, OrderArchiveModel):
+            spend = case(
+                (model.status == OrderStatus.CANCELLED, 0.0),
+                (model.status == OrderStatus.REFUNDED, model.total_amount - func.coalesce(model.refund_amount, 0.0)),
+                else_=model.total_amount,
+            )
+            count, total = (
+                self.db.query(func.count(model.id), func.coalesce(func.sum(spend), 0.0))
+                .filter(model.customer_id == customer_id)
+                .one()
+            )
+            order_count += count
+            lifetime_spend += total
+        return {"order_count": order_count, "lifetime_spend": round(lifetime_spend, 2)}
+
+    def _sync_customer_summary(self, order: OrderModel, spend_delta: float = 0.0, new_order: bool = False) -> None:
+        """
+        Apply an order write to the customer's projection in the same transaction.
+
+        Counters are adjusted in SQL and the recent headers are re-read from the
+        order tables once this write is flushed, so concurrent order writes for
+        one customer cannot overwrite each other's changes.
+        """
+        self.db.flush()
+        customer_id = order.customer_id
+        columns = CustomerOrderSummaryModel.__table__.c
+        values = {
+            "lifetime_spend": func.round(columns.lifetime_spend + spend_delta, 2),
+            "recent_orders": self._recent_headers(customer_id),
+        }
+        if new_order:
+            values["order_count"] = columns.order_count + 1
+
+        if self.db.get(CustomerOrderSummaryModel, customer_id) is not None:
+            self.db.execute(
+                update(CustomerOrderSummaryModel)
+                .where(CustomerOrderSummaryModel.customer_id == customer_id)
+                .values(**values)
+                .execution_options(synchronize_session="fetch")
+            )
+            return
+        # First write for this customer: the recomputed totals already include this order;
+        # if another writer created the row meanwhile, apply this order on top of it instead
+        self.db.execute(
+            sqlite_insert(CustomerOrderSummaryModel)
+            .values(customer_id=customer_id, recent_orders=values["recent_orders"], **self._customer_totals(customer_id))
+            .on_conflict_do_update(index_elements=[columns.customer_id], set_=values)
+        )
+
+    def get_customer_summary(self, customer_id: str) -> CustomerOrderSummary:
+        """Read a customer's order projection; without a stored row it is computed, not written."""
+        summary = self.db.get(CustomerOrderSummaryModel, customer_id)
+        if summary is None:
+            return CustomerOrderSummary(
+                customer_id=customer_id,
+                recent_orders=self._recent_headers(customer_id),
+                **self._customer_totals(customer_id),
+            )
+        return CustomerOrderSummary(
+            customer_id=summary.customer_id,
+            order_count=summary.order_count,
+            lifetime_spend=summary.lifetime_spend,
+            recent_orders=summary.recent_orders or [],
+            updated_at=summary.updated_at,
+        )
+
+    def create(self, order: Order, emails: Optional[List[OutboxEmail]] = None) -> Order:
+        """Create a new order with items, queueing ``emails`` in the same transaction."""
         # Create order model
         order_model = OrderModel(
             customer_id=order.customer_id,
@@ -48,18 +195,39 @@ class OrderRepository:
             )
             self.db.add(item_model)
 
+        self._record_event(
+            order_model,
+            OrderEventType.CREATED,
+            {"total": order_model.total_amount, "items": len(order.items)},
+        )
+        self._sync_customer_summary(
+            order_model, spend_delta=self._spend_contribution(order_model), new_order=True
+        )
+        self._queue_emails(order_model, emails)
+
         self.db.commit()
         self.db.refresh(order_model)
         customer_name = self._get_customer_name(order_model.customer_id)
         return self._to_entity(order_model, customer_name)
 
-    def get_all(self, customer_id: Optional[str] = None) -> List[Order]:
-        """Retrieve all orders, optionally filtered by customer, and include customer name."""
+    def get_all(self, customer_id: Optional[str] = None, include_archived: bool = False) -> List[Order]:
+        """Retrieve all orders, optionally filtered by customer, and include customer name.
+
+        Archived orders are merged in only when ``include_archived`` is set.
+        """
         query = self.db.query(OrderModel)
         if customer_id:
             query = query.filter(OrderModel.customer_id == customer_id)
         orders = query.order_by(OrderModel.created_at.desc()).all()
 
+        if include_archived:
+            archived_query = self.db.query(OrderArchiveModel)
+            if customer_id:
+                archived_query = archived_query.filter(OrderArchiveModel.customer_id == customer_id)
+            archived = archived_query.order_by(OrderArchiveModel.created_at.desc()).all()
+            if archived:
+                orders = sorted(orders + archived, key=lambda o: o.created_at, reverse=True)
+
         customer_ids = {o.customer_id for o in orders}
         users = (
             self.db.query(UserModel)
@@ -75,22 +243,61 @@ class OrderRepository:
 
     def get_all_orders(self, customer_id: Optional[str] = None) -> List[Order]:
         """Compatibility wrapper for domains that still call get_all_orders."""
-        return self.get_all(customer_id)
+        return self.get_all(customer_id, include_archived=True)
 
     def get_by_id(self, order_id: int) -> Optional[Order]:
-        """Retrieve a single order by ID."""
+        """Retrieve a single order by ID, falling back to the archive."""
         order = self.db.query(OrderModel).filter(OrderModel.id == order_id).first()
+        if not order:
+            order = self.db.query(OrderArchiveModel).filter(OrderArchiveModel.id == order_id).first()
         if not order:
             return None
         customer_name = self._get_customer_name(order.customer_id)
         return self._to_entity(order, customer_name)
 
+    def get_by_ids(self, order_ids: List[int]) -> List[Order]:
+        """Retrieve several orders with their items, from the hot or archive tables, in the given id order."""
+        if not order_ids:
+            return []
+        found = {}
+        for model in (OrderModel, OrderArchiveModel):
+            missing = [order_id for order_id in order_ids if order_id not in found]
+            if not missing:
+                break
+            for order in self.db.query(model).options(selectinload(model.items)).filter(model.id.in_(missing)):
+                found[order.id] = self._to_entity(order)
+        return [found[order_id] for order_id in order_ids if order_id in found]
+
+    def find_delivered_order_with_product(self, customer_id: str, product_id: int) -> Optional[int]:
+        """Return the id of a delivered order of this customer containing the product, if any.
+
+        One indexed join per table (hot, then archive); no orders are hydrated.
+        """
+        for order_model, item_model in ((OrderModel, OrderItemModel), (OrderArchiveModel, OrderItemArchiveModel)):
+            order_id = (
+                self.db.query(item_model.order_id)
+                .join(order_model, order_model.id == item_model.order_id)
+                .filter(
+                    item_model.product_id == product_id,
+                    order_model.customer_id == customer_id,
+                    order_model.status == OrderStatus.DELIVERED,
+                )
+                .order_by(item_model.order_id.asc())
+                .limit(1)
+                .scalar()
+            )
+            if order_id is not None:
+                return order_id
+        return None
+
     def update_status(self, order_id: int, status: OrderStatus) -> Optional[Order]:
         """Update order status."""
         order = self.db.query(OrderModel).filter(OrderModel.id == order_id).first()
         if not order:
             return None
 
+        previous_status = order.status
+        previous_spend = self._spend_contribution(order)
         order.status = status
 
         # Update relevant timestamps based on status
@@ -103,6 +310,13 @@ class OrderRepository:
         elif status == OrderStatus.REFUNDED:
             order.refunded_at = datetime.utcnow()
 
+        self._record_event(
+            order,
+            OrderEventType.STATUS_CHANGED,
+            {"from": OrderStatus(previous_status).value, "to": OrderStatus(status).value},
+        )
+        self._sync_customer_summary(order, spend_delta=self._spend_contribution(order) - previous_spend)
+
         self.db.commit()
         self.db.refresh(order)
         customer_name = self._get_customer_name(order.customer_id)
@@ -117,9 +331,13 @@ class OrderRepository:
         if order.status != OrderStatus.PROCESSING:
             return None
 
+        previous_spend = self._spend_contribution(order)
         order.status = OrderStatus.CANCELLED
         order.cancelled_at = datetime.utcnow()
 
+        self._record_event(order, OrderEventType.CANCELLED)
+        self._sync_customer_summary(order, spend_delta=-previous_spend)
+
         self.db.commit()
         self.db.refresh(order)
         customer_name = self._get_customer_name(order.customer_id)
@@ -134,12 +352,11 @@ class OrderRepository:
         if order.status != OrderStatus.DELIVERED:
             return None
 
-        # Check if within 30 days (delivered_at must be set for delivered orders)
+        # Check if within the refund window (delivered_at must be set for delivered orders)
         if not order.delivered_at:
             return None  # Delivered order must have delivered_at timestamp
 
-        days_since_delivery = (datetime.utcnow() - order.delivered_at).days
-        if days_since_delivery > 30:
+        if not refund_window_open(order.delivered_at):
             return None
 
         # Validate requested items against order items
@@ -159,13 +376,22 @@ class OrderRepository:
         order.refund_reason = reason  # Save the refund reason
         order.refund_items = json.dumps(items) if items else None
 
+        self._record_event(order, OrderEventType.REFUND_REQUESTED, {"items": len(items) if items else None})
+        self._sync_customer_summary(order)
+
         self.db.commit()
         self.db.refresh(order)
         customer_name = self._get_customer_name(order.customer_id)
         return self._to_entity(order, customer_name)
 
-    def approve_refund(self, order_id: int, refund_amount: float, items: Optional[List[Dict]] = None) -> Optional[Order]:
-        """Approve a refund request."""
+    def approve_refund(
+        self,
+        order_id: int,
+        refund_amount: float,
+        items: Optional[List[Dict]] = None,
+        emails: Optional[List[OutboxEmail]] = None,
+    ) -> Optional[Order]:
+        """Approve a refund request, queueing ``emails`` in the same transaction."""
         order = self.db.query(OrderModel).filter(OrderModel.id == order_id).first()
         if not order:
             return None
@@ -173,18 +399,23 @@ class OrderRepository:
         if order.status != OrderStatus.REFUND_REQUESTED:
             return None
 
+        previous_spend = self._spend_contribution(order)
         order.status = OrderStatus.REFUNDED
         order.refunded_at = datetime.utcnow()
         order.refund_amount = refund_amount
         order.refund_items = json.dumps(items) if items else order.refund_items
 
+        self._record_event(order, OrderEventType.REFUND_APPROVED, {"amount": refund_amount})
+        self._sync_customer_summary(order, spend_delta=self._spend_contribution(order) - previous_spend)
+        self._queue_emails(order, emails)
+
         self.db.commit()
         self.db.refresh(order)
         customer_name = self._get_customer_name(order.customer_id)
         return self._to_entity(order, customer_name)
 
-    def reject_refund(self, order_id: int) -> Optional[Order]:
-        """Reject a refund request and revert to delivered status."""
+    def reject_refund(self, order_id: int, emails: Optional[List[OutboxEmail]] = None) -> Optional[Order]:
+        """Reject a refund request and revert to delivered status, queueing ``emails`` with it."""
         order = self.db.query(OrderModel).filter(OrderModel.id == order_id).first()
         if not order:
             return None
@@ -196,6 +427,10 @@ class OrderRepository:
         order.refund_items = None
         order.refund_amount = None
 
+        self._record_event(order, OrderEventType.REFUND_REJECTED)
+        self._sync_customer_summary(order)
+        self._queue_emails(order, emails)
+
         self.db.commit()
         self.db.refresh(order)
         customer_name = self._get_customer_name(order.customer_id)
@@ -205,12 +440,91 @@ class OrderRepository:
         """Delete an order by ID. Returns True if deleted, False if not found."""
         order = self.db.query(OrderModel).filter(OrderModel.id == order_id).first()
         if order:
+            # Drop the projection; it is rebuilt on the next read
+            summary = self.db.get(CustomerOrderSummaryModel, order.customer_id)
+            if summary is not None:
+                self.db.delete(summary)
             self.db.delete(order)
             self.db.commit()
             return True
         return False
 
-    def _to_entity(self, model: OrderModel, customer_name: Optional[str] = None) -> Order:
+    def archive_delivered_batch(self, delivered_before: datetime, batch_size: int) -> Tuple[int, int]:
+        """Move one batch of delivered orders into the archive tables.
+
+        Copy and delete run in a single transaction. Returns (orders, items) moved.
+        """
+        order_ids = [
+            row[0]
+            for row in self.db.query(OrderModel.id)
+            .filter(
+                OrderModel.status == OrderStatus.DELIVERED,
+                OrderModel.delivered_at < delivered_before,
+            )
+            .order_by(OrderModel.id.asc())
+            .limit(batch_size)
+            .all()
+        ]
+        if not order_ids:
+            return 0, 0
+
+        order_columns = [c.name for c in OrderArchiveModel.__table__.columns if c.name != "archived_at"]
+        item_columns = [c.name for c in OrderItemArchiveModel.__table__.columns]
+        orders_table = OrderModel.__table__
+        items_table = OrderItemModel.__table__
+
+        self.db.execute(
+            insert(OrderArchiveModel.__table__).from_select(
+                order_columns,
+                select(*[orders_table.c[name] for name in order_columns]).where(orders_table.c.id.in_(order_ids)),
+            )
+        )
+        item_count = self.db.execute(
+            insert(OrderItemArchiveModel.__table__).from_select(
+                item_columns,
+                select(*[items_table.c[name] for name in item_columns]).where(items_table.c.order_id.in_(order_ids)),
+            )
+        ).rowcount
+
+        self.db.query(OrderItemModel).filter(OrderItemModel.order_id.in_(order_ids)).delete(synchronize_session=False)
+        self.db.query(OrderModel).filter(OrderModel.id.in_(order_ids)).delete(synchronize_session=False)
+
+        self.db.commit()
+        return len(order_ids), item_count
+
+    def get_events(self, order_id: int) -> List[OrderEvent]:
+        """Retrieve the lifecycle timeline of a single order, oldest first."""
+        events = (
+            self.db.query(OrderEventModel)
+            .filter(OrderEventModel.order_id == order_id)
+            .order_by(OrderEventModel.id.asc())
+            .all()
+        )
+        return [self._to_event(e) for e in events]
+
+    def get_events_after(self, after_id: int = 0, limit: int = 500) -> List[OrderEvent]:
+        """Retrieve events with id greater than the cursor (keyset on primary key)."""
+        events = (
+            self.db.query(OrderEventModel)
+            .filter(OrderEventModel.id > after_id)
+            .order_by(OrderEventModel.id.asc())
+            .limit(limit)
+            .all()
+        )
+        return [self._to_event(e) for e in events]
+
+    def _to_event(self, model: OrderEventModel) -> OrderEvent:
+        """Convert SQLAlchemy event model to domain entity."""
+        return OrderEvent(
+            id=model.id,
+            order_id=model.order_id,
+            customer_id=model.customer_id,
+            event_type=model.event_type,
+            payload=model.payload or {},
+            created_at=model.created_at,
+        )
+
+    def _to_entity(self, model: OrderModel | OrderArchiveModel, customer_name: Optional[str] = None) -> Order:
         """Convert SQLAlchemy model to domain entity."""
         items = [
             OrderItem(
@@ -1,7 +1,7 @@
 from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel, ConfigDict, Field, field_validator
-from app.domains.order.entity import OrderStatus
+from app.domains.order.entity import OrderStatus, OrderEventType
 
 
 class OrderItemCreate(BaseModel):
@@ -66,6 +66,56 @@ class OrderResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class OrderEventResponse(BaseModel):
+    """Schema for an order lifecycle event."""
+
+    id: int
+    order_id: int
+    customer_id: str
+    event_type: OrderEventType
+    payload: dict = Field(default_factory=dict)
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OrderArchivalReportResponse(BaseModel):
+    """Schema for an order archival run report."""
+
+    archived_orders: int
+    archived_items: int
+    batches: int
+    elapsed_seconds: float
+    orders_per_second: float
+    max_lock_hold_ms: float
+    avg_lock_hold_ms: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OrderHeaderResponse(BaseModel):
+    """Schema for a compact order header (no items or address)."""
+
+    id: int
+    status: OrderStatus
+    total_amount: float
+    tax_amount: float
+    shipping_amount: float
+    created_at: Optional[datetime] = None
+    delivered_at: Optional[datetime] = None
+
+
+class CustomerOrderSummaryResponse(BaseModel):
+    """Schema for a customer's order summary projection."""
+
+    customer_id: str
+    order_count: int
+    lifetime_spend: float
+    recent_orders: List[OrderHeaderResponse]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class OrderStatusUpdate(BaseModel):
     """Schema for updating order status."""
 
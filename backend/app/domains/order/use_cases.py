@@ -1,74 +1,26 @@
-from typing import List, Optional
+import time
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
 from sqlalchemy.orm import Session
+from app.core.logging import logger
 from app.domains.order.repository import OrderRepository
-from app.domains.order.entity import Order, OrderItem, OrderStatus
+from app.domains.order.entity import (
+    Order,
+    OrderItem,
+    OrderStatus,
+    OrderEvent,
+    OrderArchivalReport,
+    CustomerOrderSummary,
+    REFUND_WINDOW_DAYS,
+    refund_window_closed_before,
+)
 from app.domains.catalog.repository import ProductRepository
+from app.domains.notifications.fanout import WishlistFanout, detect_wishlist_events
 from app.domains.notifications.notifier import WishlistNotifier
+from app.domains.notifications.outbox import OutboxEmail
 from app.domains.wishlist.repository import WishlistRepository
 
 
-def _notify_if_restocked(
-    wishlist_repo: Optional[WishlistRepository],
-    notifier: Optional[WishlistNotifier],
-    previous_product,
-    updated_product,
-):
-    """
-    Send back-in-stock notification when stock crosses from 0 to >0.
-    """
-    if not wishlist_repo or not notifier:
-        return
-    if previous_product.stock != 0 or updated_product.stock <= 0:
-        return
-
-    user_ids = wishlist_repo.get_user_ids_by_product(int(updated_product.id))
-    if not user_ids:
-        return
-
-    notifier.send_stock_email(
-        user_ids,
-        {
-            "id": updated_product.id,
-            "name": updated_product.name,
-            "price": updated_product.price,
-            "final_price": updated_product.final_price or updated_product.price,
-            "stock": updated_product.stock,
-            "image": getattr(updated_product, "image", None),
-        },
-    )
-
-
-def _notify_if_stock_depleted(
-    wishlist_repo: Optional[WishlistRepository],
-    notifier: Optional[WishlistNotifier],
-    previous_product,
-    updated_product,
-):
-    """
-    Send out-of-stock notification when stock crosses from >0 to 0.
-    """
-    if not wishlist_repo or not notifier:
-        return
-    if previous_product.stock <= 0 or updated_product.stock != 0:
-        return
-
-    user_ids = wishlist_repo.get_user_ids_by_product(int(updated_product.id))
-    if not user_ids:
-        return
-
-    notifier.send_out_of_stock_email(
-        user_ids,
-        {
-            "id": updated_product.id,
-            "name": updated_product.name,
-            "price": updated_product.price,
-            "final_price": updated_product.final_price or updated_product.price,
-            "stock": updated_product.stock,
-            "image": getattr(updated_product, "image", None),
-        },
-    )
-
-
 def _process_payment_refund(order: Order, amount: float) -> bool:
     """
     Simulated refund processing (no external payment gateway in this project).
@@ -87,6 +39,7 @@ def create_order(
     shipping_cost: float = 10.0,
     wishlist_repo: Optional[WishlistRepository] = None,
     notifier: Optional[WishlistNotifier] = None,
+    emails: Optional[List[OutboxEmail]] = None,
 ) -> Optional[Order]:
     """
     Create a new order.
@@ -99,12 +52,14 @@ def create_order(
         tax_rate: Tax rate (default 8%)
         shipping_threshold: Free shipping threshold (default $100)
         shipping_cost: Shipping cost if under threshold (default $10)
+        emails: Outbox emails queued in the same transaction as the order
 
     Returns:
         Created Order entity or None if validation fails
     """
     product_repo = ProductRepository(db)
     order_repo = OrderRepository(db)
+    fanout = WishlistFanout(wishlist_repo, notifier)
 
     # Validate products and calculate totals
     order_items = []
@@ -114,9 +69,11 @@ def create_order(
         # Lock the product row to prevent race conditions during stock check
         product = product_repo.get_by_id(item_data["product_id"], lock_for_update=True)
         if not product:
+            db.rollback()
             return None  # Product not found
 
         if product.stock < item_data["quantity"]:
+            db.rollback()
             return None  # Insufficient stock
 
         # Use purchase-time effective price (discounted if applicable)
@@ -137,9 +94,11 @@ def create_order(
         )
 
         # Decrease stock
-        updated_product = product_repo.update(product.id, {"stock": product.stock - item_data["quantity"]})
+        updated_product = product_repo.update(
+            product.id, {"stock": product.stock - item_data["quantity"]}, commit=False
+        )
         if updated_product:
-            _notify_if_stock_depleted(wishlist_repo, notifier, product, updated_product)
+            fanout.extend(detect_wishlist_events(product, updated_product))
 
     # Calculate tax and shipping
     tax_amount = subtotal * tax_rate
@@ -160,22 +119,42 @@ def create_order(
         items=order_items,
     )
 
-    return order_repo.create(order)
+    # Stock changes, wishlist notifications and the order commit together
+    fanout.flush()
+    return order_repo.create(order, emails)
 
 
-def get_all_orders(db: Session, customer_id: Optional[str] = None) -> List[Order]:
+def get_all_orders(
+    db: Session, customer_id: Optional[str] = None, include_archived: bool = False
+) -> List[Order]:
     """
     Retrieve all orders, optionally filtered by customer.
 
     Args:
         db: Database session
         customer_id: Optional customer ID to filter by
+        include_archived: Also return orders moved to the archive tables
 
     Returns:
         List of Order entities
     """
     repository = OrderRepository(db)
-    return repository.get_all(customer_id)
+    return repository.get_all(customer_id, include_archived=include_archived)
+
+
+def get_customer_summary(db: Session, customer_id: str) -> CustomerOrderSummary:
+    """
+    Retrieve the compact order summary projection for a customer.
+
+    Args:
+        db: Database session
+        customer_id: ID of the customer
+
+    Returns:
+        CustomerOrderSummary with order count, lifetime spend and recent order headers
+    """
+    repository = OrderRepository(db)
+    return repository.get_customer_summary(customer_id)
 
 
 def get_order_by_id(db: Session, order_id: int) -> Optional[Order]:
@@ -231,12 +210,17 @@ def cancel_order(
     if order:
         # Restore stock for cancelled order
         product_repo = ProductRepository(db)
+        fanout = WishlistFanout(wishlist_repo, notifier)
         for item in order.items:
             product = product_repo.get_by_id(item.product_id)
             if product:
-                updated = product_repo.update(item.product_id, {"stock": product.stock + item.quantity})
+                updated = product_repo.update(
+                    item.product_id, {"stock": product.stock + item.quantity}, commit=False
+                )
                 if updated:
-                    _notify_if_restocked(wishlist_repo, notifier, product, updated)
+                    fanout.extend(detect_wishlist_events(product, updated))
+        fanout.flush()
+        db.commit()
 
     return order
 
@@ -264,6 +248,7 @@ def approve_refund(
     refund_amount: Optional[float] = None,
     wishlist_repo: Optional[WishlistRepository] = None,
     notifier: Optional[WishlistNotifier] = None,
+    emails: Optional[List[OutboxEmail]] = None,
 ) -> Optional[Order]:
     """
     Approve a refund request.
@@ -272,6 +257,7 @@ def approve_refund(
         db: Database session
         order_id: ID of the order to approve refund for
         refund_amount: Optional override for refund amount (defaults to calculated)
+        emails: Outbox emails queued in the same transaction as the approval
 
     Returns:
         Updated Order entity if successful, None otherwise
@@ -299,7 +285,7 @@ def approve_refund(
                 return None
             refund_amount += unit_price * qty
 
-    approved_order = repository.approve_refund(order_id, refund_amount, refund_items)
+    approved_order = repository.approve_refund(order_id, refund_amount, refund_items, emails)
 
     if approved_order:
         # Simulated payment refund (no external gateway)
@@ -309,6 +295,7 @@ def approve_refund(
 
         # Add products back to stock
         product_repo = ProductRepository(db)
+        fanout = WishlistFanout(wishlist_repo, notifier)
         # Use requested quantities if present for restocking
         restock_quantities = {
             item["product_id"]: item["quantity"] for item in (approved_order.refund_items or refund_items or [])
@@ -319,26 +306,31 @@ def approve_refund(
                 continue
             product = product_repo.get_by_id(item.product_id)
             if product:
-                updated = product_repo.update(item.product_id, {"stock": product.stock + requested_qty})
+                updated = product_repo.update(
+                    item.product_id, {"stock": product.stock + requested_qty}, commit=False
+                )
                 if updated:
-                    _notify_if_restocked(wishlist_repo, notifier, product, updated)
+                    fanout.extend(detect_wishlist_events(product, updated))
+        fanout.flush()
+        db.commit()
 
     return approved_order
 
 
-def reject_refund(db: Session, order_id: int) -> Optional[Order]:
+def reject_refund(db: Session, order_id: int, emails: Optional[List[OutboxEmail]] = None) -> Optional[Order]:
     """
     Reject a refund request.
 
     Args:
         db: Database session
         order_id: ID of the order to reject refund for
+        emails: Outbox emails queued in the same transaction as the rejection
 
     Returns:
         Updated Order entity if successful, None otherwise
     """
     repository = OrderRepository(db)
-    return repository.reject_refund(order_id)
+    return repository.reject_refund(order_id, emails)
 
 
 def delete_order(db: Session, order_id: int) -> bool:
@@ -354,3 +346,104 @@ def delete_order(db: Session, order_id: int) -> bool:
     """
     repository = OrderRepository(db)
     return repository.delete(order_id)
+
+
+def get_order_timeline(db: Session, order_id: int) -> List[OrderEvent]:
+    """
+    Retrieve the lifecycle events of an order, oldest first.
+
+    Args:
+        db: Database session
+        order_id: ID of the order
+
+    Returns:
+        List of OrderEvent entities
+    """
+    repository = OrderRepository(db)
+    return repository.get_events(order_id)
+
+
+def iter_order_events(
+    db: Session,
+    after: int = 0,
+    limit: int = 1000,
+    batch_size: int = 200,
+) -> Iterator[OrderEvent]:
+    """
+    Iterate over order events newer than a cursor, fetching in keyset batches.
+
+    Args:
+        db: Database session
+        after: Event id cursor; only events with a greater id are returned
+        limit: Maximum number of events to yield
+        batch_size: Number of rows fetched per query
+
+    Yields:
+        OrderEvent entities in id order
+    """
+    repository = OrderRepository(db)
+    cursor = after
+    remaining = limit
+    while remaining > 0:
+        batch = repository.get_events_after(cursor, min(batch_size, remaining))
+        if not batch:
+            return
+        for event in batch:
+            yield event
+        cursor = batch[-1].id
+        remaining -= len(batch)
+
+
+def archive_delivered_orders(
+    db: Session,
+    retention_days: int = REFUND_WINDOW_DAYS + 1,
+    batch_size: int = 500,
+    max_batches: Optional[int] = None,
+) -> OrderArchivalReport:
+    """
+    Move delivered orders older than the refund window into the archive tables.
+
+    Orders whose refund window is still open are kept whatever
+    ``retention_days`` says, since refunds are only requested on live orders.
+
+    Each batch is its own short transaction so writers are never blocked for
+    long; the report records throughput and per-batch lock-hold times.
+
+    Args:
+        db: Database session
+        retention_days: Days after delivery before an order is archived
+        batch_size: Orders moved per transaction
+        max_batches: Optional cap on batches for this run
+
+    Returns:
+        OrderArchivalReport with counts and timings
+    """
+    repository = OrderRepository(db)
+    now = datetime.utcnow()
+    delivered_before = min(now - timedelta(days=retention_days), refund_window_closed_before(now))
+    report = OrderArchivalReport()
+    hold_times_ms: List[float] = []
+
+    started = time.perf_counter()
+    while max_batches is None or report.batches < max_batches:
+        batch_started = time.perf_counter()
+        orders_moved, items_moved = repository.archive_delivered_batch(delivered_before, batch_size)
+        if not orders_moved:
+            break
+        hold_times_ms.append((time.perf_counter() - batch_started) * 1000)
+        report.batches += 1
+        report.archived_orders += orders_moved
+        report.archived_items += items_moved
+
+    report.elapsed_seconds = round(time.perf_counter() - started, 4)
+    if report.elapsed_seconds > 0:
+        report.orders_per_second = round(report.archived_orders / report.elapsed_seconds, 2)
+    if hold_times_ms:
+        report.max_lock_hold_ms = round(max(hold_times_ms), 2)
+        report.avg_lock_hold_ms = round(sum(hold_times_ms) / len(hold_times_ms), 2)
+
+    logger.info(
+        f"Archived {report.archived_orders} orders ({report.archived_items} items) in {report.batches} batches, "
+        f"{report.orders_per_second} orders/s, max lock hold {report.max_lock_hold_ms} ms"
+    )
+    return report
@@ -2,7 +2,7 @@
 Review Domain Entity
 """
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -11,6 +11,11 @@ class ReviewStatus(str, Enum):
     APPROVED = "approved"
     DISAPPROVED = "disapproved"
 
+class ReviewSort(str, Enum):
+    NEWEST = "newest"
+    HIGHEST = "highest"
+    LOWEST = "lowest"
+
 @dataclass
 class Review:
     """Review entity representing a product review and rating."""
@@ -42,3 +47,20 @@ class Review:
         # Validate comment if provided
         if self.comment and len(self.comment.strip()) < 10:
             raise ValueError("Comment must be at least 10 characters long")
+
+
+@dataclass
+class ReviewPage:
+    """One page of product reviews plus the product's rating histogram."""
+
+    reviews: List[Review]
+    next_cursor: Optional[str]
+    histogram: Dict[int, int]  # star value (1-5) -> number of approved ratings
+
+
+@dataclass
+class ReviewModerationResult:
+    """Outcome of a bulk approve/reject."""
+
+    updated: int
+    not_found: List[int]
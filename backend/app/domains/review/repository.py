@@ -1,13 +1,48 @@
 """
 Review Domain Repository
 """
-from typing import List, Optional
+import base64
+import json
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import String, and_, case, func, or_, type_coerce
 
 from app.infrastructure.database.sqlite.models.review import ReviewModel
-from app.domains.review.entity import Review, ReviewStatus
+from app.domains.review.entity import Review, ReviewSort, ReviewStatus
+
+
+def _encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _decode_keyset_cursor(cursor: str, keys: list) -> list:
+    """Decode a cursor and check it holds one value of the right type per sort key."""
+    values = _decode_cursor(cursor)
+    if len(values) != len(keys) or not all(
+        type(value) is value_type for value, (_, _, value_type) in zip(values, keys)
+    ):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _after_keyset(keys: list, values: list):
+    """Build a row-value "comes after" filter for mixed sort directions."""
+    clauses = []
+    for i, (column, descending, _type) in enumerate(keys):
+        prefix = [keys[j][0] == values[j] for j in range(i)]
+        clauses.append(and_(*prefix, column < values[i] if descending else column > values[i]))
+    return or_(*clauses)
 
 
 class ReviewRepository:
@@ -49,6 +84,61 @@ class ReviewRepository:
         models = query.order_by(ReviewModel.created_at.desc()).all()
         return [self._to_entity(model) for model in models]
 
+    def get_page(
+        self,
+        product_id: int,
+        sort: ReviewSort = ReviewSort.NEWEST,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> Tuple[List[Review], Optional[str]]:
+        """Get one keyset page of approved reviews for a product.
+
+        Returns (reviews, next_cursor); next_cursor is None on the last page.
+        Raises ValueError for a malformed cursor.
+        """
+        # Keys are (expression, descending, cursor value type);
+        # created_at is compared as stored text so cursors round-trip exactly
+        created = type_coerce(ReviewModel.created_at, String)
+        keys = [(created, True, str), (ReviewModel.id, True, int)]
+        if sort in (ReviewSort.HIGHEST, ReviewSort.LOWEST):
+            # Unrated reviews sort last in either direction (NULLS LAST)
+            unrated = case((ReviewModel.rating.is_(None), 1), else_=0)
+            rating = case((ReviewModel.rating.is_(None), 0), else_=ReviewModel.rating)
+            keys[:0] = [(unrated, False, int), (rating, sort == ReviewSort.HIGHEST, int)]
+
+        query = self.db.query(ReviewModel, *[column for column, _, _ in keys]).filter(
+            ReviewModel.product_id == product_id,
+            ReviewModel.is_approved == True,
+        )
+        if cursor:
+            query = query.filter(_after_keyset(keys, _decode_keyset_cursor(cursor, keys)))
+
+        order_by = [column.desc() if descending else column.asc() for column, descending, _ in keys]
+        rows = query.order_by(*order_by).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(list(rows[-1][1:]))
+        return [self._to_entity(row[0]) for row in rows], next_cursor
+
+    def get_rating_histogram(self, product_id: int) -> Dict[int, int]:
+        """Count approved ratings per star value with one grouped query."""
+        histogram = {star: 0 for star in range(1, 6)}
+        rows = (
+            self.db.query(ReviewModel.rating, func.count(ReviewModel.id))
+            .filter(
+                ReviewModel.product_id == product_id,
+                ReviewModel.is_approved == True,
+                ReviewModel.rating.isnot(None),
+            )
+            .group_by(ReviewModel.rating)
+            .all()
+        )
+        for star, count in rows:
+            histogram[star] = count
+        return histogram
+
     def get_pending_reviews(self) -> List[Review]:
         """Get all reviews pending approval."""
         models = self.db.query(ReviewModel).filter(
@@ -56,6 +146,67 @@ class ReviewRepository:
         ).order_by(ReviewModel.created_at.asc()).all()
         return [self._to_entity(model) for model in models]
 
+    def get_pending_page(self, cursor: Optional[str] = None, limit: int = 50) -> Tuple[List[Review], Optional[str]]:
+        """Get one keyset page of the moderation queue, oldest first.
+
+        Raises ValueError for a malformed cursor.
+        """
+        created = type_coerce(ReviewModel.created_at, String)
+        keys = [(created, False, str), (ReviewModel.id, False, int)]
+
+        query = self.db.query(ReviewModel, created, ReviewModel.id).filter(
+            ReviewModel.status == ReviewStatus.PENDING.value
+        )
+        if cursor:
+            query = query.filter(_after_keyset(keys, _decode_keyset_cursor(cursor, keys)))
+
+        rows = query.order_by(created.asc(), ReviewModel.id.asc()).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(list(rows[-1][1:]))
+        return [self._to_entity(row[0]) for row in rows], next_cursor
+
+    def count_pending(self) -> int:
+        """Count reviews awaiting moderation."""
+        return self.db.query(func.count(ReviewModel.id)).filter(
+            ReviewModel.status == ReviewStatus.PENDING.value
+        ).scalar()
+
+    def moderate_reviews(self, review_ids: List[int], approved: bool, moderator_id: str) -> Tuple[int, List[int]]:
+        """Approve or reject many reviews with a single UPDATE.
+
+        Returns (updated_count, ids_not_found).
+        """
+        ids = list(set(review_ids))
+        found = {row[0] for row in self.db.query(ReviewModel.id).filter(ReviewModel.id.in_(ids)).all()}
+        if not found:
+            return 0, sorted(ids)
+
+        if approved:
+            values = {
+                ReviewModel.status: ReviewStatus.APPROVED.value,
+                ReviewModel.is_approved: True,
+                ReviewModel.approved_by: moderator_id,
+                ReviewModel.approved_at: datetime.utcnow(),
+            }
+        else:
+            values = {
+                ReviewModel.status: ReviewStatus.DISAPPROVED.value,
+                ReviewModel.is_approved: False,
+                ReviewModel.approved_by: None,
+                ReviewModel.approved_at: None,
+            }
+
+        updated = (
+            self.db.query(ReviewModel)
+            .filter(ReviewModel.id.in_(found))
+            .update(values, synchronize_session=False)
+        )
+        self.db.commit()
+        return updated, sorted(set(ids) - found)
+
     def check_existing_review(self, user_id: str, product_id: int, order_id: int) -> Optional[Review]:
         """Check if user already reviewed this product from this order."""
         model = self.db.query(ReviewModel).filter(
@@ -1,7 +1,7 @@
 """
 Review Domain Schemas (Pydantic models for API validation)
 """
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 from app.domains.review.entity import ReviewStatus
@@ -38,6 +38,36 @@ class ReviewResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ReviewPageResponse(BaseModel):
+    """Schema for a page of product reviews with the rating histogram."""
+    reviews: List[ReviewResponse]
+    next_cursor: Optional[str] = Field(None, description="Pass back as `cursor` to fetch the next page")
+    histogram: Dict[int, int] = Field(..., description="Approved rating counts keyed by star value 1-5")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class ReviewApprovalAction(BaseModel):
     """Schema for approving/rejecting a review."""
     approved: bool = Field(..., description="True to approve, False to reject")
+
+
+class ReviewModerationQueueResponse(BaseModel):
+    """Schema for a page of the pending review queue."""
+    reviews: List[ReviewResponse]
+    next_cursor: Optional[str] = Field(None, description="Pass back as `cursor` to fetch the next page")
+    total_pending: int
+
+
+class ReviewBulkModerationRequest(BaseModel):
+    """Schema for approving/rejecting many reviews at once."""
+    review_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    approved: bool = Field(..., description="True to approve, False to reject")
+
+
+class ReviewBulkModerationResponse(BaseModel):
+    """Schema for the outcome of a bulk moderation."""
+    updated: int
+    not_found: List[int]
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,14 +1,12 @@
 """
 Review Domain Use Cases (Business Logic)
 """
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
 
-from app.domains.review.entity import Review, ReviewStatus
+from app.domains.review.entity import Review, ReviewModerationResult, ReviewPage, ReviewSort, ReviewStatus
 from app.domains.review.repository import ReviewRepository
 from app.domains.order.repository import OrderRepository
-from app.domains.order.entity import OrderStatus
-from app.infrastructure.database.sqlite.models.order import OrderItemModel
 from app.infrastructure.database.sqlite.models.review import ReviewModel
 
 
@@ -58,21 +56,7 @@ def create_review(
         return None  # User already reviewed this product
 
     # 2. Find any delivered order that contains this product for this user
-    # Get all user's delivered orders
-    user_orders = order_repo.get_all_orders(customer_id=user_id)
-    delivered_orders = [order for order in user_orders if order.status == OrderStatus.DELIVERED]
-
-    # Find an order that contains the product
-    valid_order_id = None
-    for order in delivered_orders:
-        order_item = db.query(OrderItemModel).filter(
-            OrderItemModel.order_id == order.id,
-            OrderItemModel.product_id == product_id
-        ).first()
-
-        if order_item:
-            valid_order_id = order.id
-            break
+    valid_order_id = order_repo.find_delivered_order_with_product(user_id, product_id)
 
     # 3. If no valid order found, user hasn't purchased this product
     if valid_order_id is None:
@@ -118,6 +102,38 @@ def get_product_reviews(db: Session, product_id: int, include_pending: bool = Fa
     return repo.get_by_product(product_id, approved_only=not include_pending)
 
 
+def get_product_review_page(
+    db: Session,
+    product_id: int,
+    sort: ReviewSort = ReviewSort.NEWEST,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+) -> ReviewPage:
+    """
+    Get one page of approved reviews for a product with its rating histogram.
+
+    Args:
+        db: Database session
+        product_id: ID of the product
+        sort: Sort order (newest, highest, lowest)
+        cursor: Opaque cursor from a previous page
+        limit: Page size
+
+    Returns:
+        ReviewPage entity
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    repo = ReviewRepository(db)
+    reviews, next_cursor = repo.get_page(product_id, sort=sort, cursor=cursor, limit=limit)
+    return ReviewPage(
+        reviews=reviews,
+        next_cursor=next_cursor,
+        histogram=repo.get_rating_histogram(product_id),
+    )
+
+
 def get_pending_reviews(db: Session) -> List[Review]:
     """
     Get all reviews pending approval (for product managers).
@@ -132,6 +148,48 @@ def get_pending_reviews(db: Session) -> List[Review]:
     return repo.get_pending_reviews()
 
 
+def get_moderation_queue(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> Tuple[List[Review], Optional[str], int]:
+    """
+    Get one page of the pending review queue (for product managers).
+
+    Args:
+        db: Database session
+        cursor: Opaque cursor from a previous page
+        limit: Page size
+
+    Returns:
+        Tuple of (reviews, next_cursor, total_pending)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    repo = ReviewRepository(db)
+    reviews, next_cursor = repo.get_pending_page(cursor=cursor, limit=limit)
+    return reviews, next_cursor, repo.count_pending()
+
+
+def moderate_reviews(db: Session, review_ids: List[int], approved: bool, moderator_id: str) -> ReviewModerationResult:
+    """
+    Approve or reject many reviews at once (product manager only).
+
+    Args:
+        db: Database session
+        review_ids: IDs of the reviews to moderate
+        approved: True to approve, False to reject
+        moderator_id: UUID of the product manager
+
+    Returns:
+        ReviewModerationResult with the updated count and unknown IDs
+    """
+    repo = ReviewRepository(db)
+    updated, not_found = repo.moderate_reviews(review_ids, approved, moderator_id)
+    return ReviewModerationResult(updated=updated, not_found=not_found)
+
+
 def approve_review(db: Session, review_id: int, approved_by: str) -> Optional[Review]:
     """
     Approve a review (product manager only).
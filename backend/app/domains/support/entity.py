@@ -11,6 +11,22 @@ class ConversationStatus(str, Enum):
     CLOSED = "closed"
 
 
+class ConversationPriority(str, Enum):
+    URGENT = "urgent"
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+# Stored rank per priority; the queue serves lower ranks first
+PRIORITY_RANK = {
+    ConversationPriority.URGENT: 0,
+    ConversationPriority.HIGH: 1,
+    ConversationPriority.NORMAL: 2,
+    ConversationPriority.LOW: 3,
+}
+
+
 class MessageStatus(str, Enum):
     DELIVERED = "delivered"
     READ = "read"
@@ -44,6 +60,7 @@ class SupportMessage:
     attachment: Optional[SupportAttachment]
     status: MessageStatus
     created_at: datetime
+    client_message_id: Optional[str] = None
 
 
 @dataclass
@@ -53,6 +70,8 @@ class SupportCustomerContextSnapshot:
     orders_summary: list
     wish_list_items: list
     captured_at: datetime
+    order_count: Optional[int] = None
+    lifetime_spend: Optional[float] = None
 
 
 @dataclass
@@ -72,3 +91,24 @@ class SupportConversation:
     messages: List[SupportMessage] = field(default_factory=list)
     attachments: List[SupportAttachment] = field(default_factory=list)
     context_snapshot: Optional[SupportCustomerContextSnapshot] = None
+    priority: ConversationPriority = ConversationPriority.NORMAL
+    sla_due_at: Optional[datetime] = None
+
+
+@dataclass
+class SupportConversationHeader:
+    """The conversation fields needed to authorize and route a message, without its history."""
+    id: str
+    status: ConversationStatus
+    customer_id: Optional[str]
+    conversation_token: Optional[str]
+    assigned_agent_id: Optional[str]
+
+
+@dataclass
+class SupportBlobGCReport:
+    """Outcome of an attachment blob garbage-collection run."""
+
+    deleted_blobs: int = 0  # Blob rows whose last reference was released
+    deleted_orphans: int = 0  # Files with no blob row, e.g. from an upload that failed after writing
+    freed_bytes: int = 0
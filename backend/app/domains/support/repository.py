@@ -1,27 +1,50 @@
 import uuid
-from typing import List, Optional
-from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple
+from datetime import datetime, timedelta
 
+from sqlalchemy import and_, delete, or_, select, update
 from sqlalchemy.orm import Session
 
 from app.core.crypto import encrypt_str, decrypt_str
 from app.domains.support.entity import (
+    PRIORITY_RANK,
+    ConversationPriority,
     ConversationStatus,
     MessageStatus,
     SenderRole,
     SupportAttachment,
     SupportConversation,
+    SupportConversationHeader,
     SupportCustomerContextSnapshot,
     SupportMessage,
 )
 from app.infrastructure.database.sqlite.models.support import (
     SupportAttachmentModel,
+    SupportBlobModel,
     SupportContextSnapshotModel,
     SupportConversationModel,
     SupportMessageModel,
 )
 
 
+_PRIORITY_BY_RANK = {rank: priority for priority, rank in PRIORITY_RANK.items()}
+
+# Queue order: priority rank, then SLA deadline, then age; matches ix_support_conversations_queue
+_QUEUE_ORDER = (
+    SupportConversationModel.priority.asc(),
+    SupportConversationModel.sla_due_at.asc(),
+    SupportConversationModel.created_at.asc(),
+)
+
+
+def _claim_values(agent_id: str) -> dict:
+    return {
+        "assigned_agent_id": agent_id,
+        "status": ConversationStatus.ASSIGNED.value,
+        "updated_at": datetime.utcnow(),
+    }
+
+
 class SupportRepository:
     """Data access for support conversations, messages, and attachments."""
 
@@ -51,6 +74,7 @@ class SupportRepository:
             attachment=attachment,
             status=MessageStatus(model.status),
             created_at=model.created_at,
+            client_message_id=model.client_message_id,
         )
 
     def _to_context(self, model: Optional[SupportContextSnapshotModel]) -> Optional[SupportCustomerContextSnapshot]:
@@ -62,6 +86,8 @@ class SupportRepository:
             orders_summary=model.orders_summary or [],
             wish_list_items=model.wish_list_items or [],
             captured_at=model.captured_at,
+            order_count=model.order_count,
+            lifetime_spend=model.lifetime_spend,
         )
 
     def _to_conversation(self, model: SupportConversationModel, include_messages: bool = True) -> SupportConversation:
@@ -83,6 +109,8 @@ class SupportRepository:
             messages=messages,
             attachments=attachments,
             context_snapshot=self._to_context(model.context_snapshot),
+            priority=_PRIORITY_BY_RANK.get(model.priority, ConversationPriority.NORMAL),
+            sla_due_at=model.sla_due_at,
         )
 
     def create_conversation(
@@ -95,8 +123,11 @@ class SupportRepository:
         initial_message: Optional[str],
         initial_sender_role: SenderRole,
         conversation_token: Optional[str] = None,
+        priority: ConversationPriority = ConversationPriority.NORMAL,
+        sla_minutes: Optional[int] = None,
     ) -> SupportConversation:
         conversation_id = str(uuid.uuid4())
+        now = datetime.utcnow()
         model = SupportConversationModel(
             id=conversation_id,
             status=ConversationStatus.OPEN.value,
@@ -104,7 +135,10 @@ class SupportRepository:
             conversation_token=conversation_token,
             guest_name=guest_name,
             guest_email=encrypt_str(guest_email),
-            last_message_at=datetime.utcnow(),
+            created_at=now,
+            last_message_at=now,
+            priority=PRIORITY_RANK[priority],
+            sla_due_at=now + timedelta(minutes=sla_minutes) if sla_minutes is not None else None,
         )
 
         if context_snapshot:
@@ -113,6 +147,8 @@ class SupportRepository:
                 cart_items=context_snapshot.get("cart_items") or [],
                 orders_summary=context_snapshot.get("orders_summary") or [],
                 wish_list_items=context_snapshot.get("wish_list_items") or [],
+                order_count=context_snapshot.get("order_count"),
+                lifetime_spend=context_snapshot.get("lifetime_spend"),
             )
 
         if initial_message:
@@ -141,6 +177,29 @@ class SupportRepository:
         )
         return self._to_conversation(model) if model else None
 
+    def get_conversation_header(self, conversation_id: str) -> Optional[SupportConversationHeader]:
+        """Read only the conversation's own columns; no messages, attachments or snapshot are loaded."""
+        row = (
+            self.db.query(
+                SupportConversationModel.id,
+                SupportConversationModel.status,
+                SupportConversationModel.customer_id,
+                SupportConversationModel.conversation_token,
+                SupportConversationModel.assigned_agent_id,
+            )
+            .filter(SupportConversationModel.id == conversation_id)
+            .first()
+        )
+        if row is None:
+            return None
+        return SupportConversationHeader(
+            id=row.id,
+            status=ConversationStatus(row.status),
+            customer_id=row.customer_id,
+            conversation_token=row.conversation_token,
+            assigned_agent_id=row.assigned_agent_id,
+        )
+
     def get_conversation_by_token(self, token: str) -> Optional[SupportConversation]:
         model = (
             self.db.query(SupportConversationModel)
@@ -153,32 +212,78 @@ class SupportRepository:
         rows = (
             self.db.query(SupportConversationModel)
             .filter(SupportConversationModel.status.in_([ConversationStatus.OPEN.value, ConversationStatus.ASSIGNED.value]))
-            .order_by(SupportConversationModel.created_at.asc())
+            .order_by(*_QUEUE_ORDER)
             .limit(limit)
             .all()
         )
         return [self._to_conversation(row, include_messages=False) for row in rows]
 
     def claim_conversation(self, conversation_id: str, agent_id: str) -> Optional[SupportConversation]:
-        conversation = (
-            self.db.query(SupportConversationModel)
-            .filter(
+        """Assign an unclaimed conversation with one conditional UPDATE; None if another agent won."""
+        result = self.db.execute(
+            update(SupportConversationModel)
+            .where(
                 SupportConversationModel.id == conversation_id,
                 SupportConversationModel.assigned_agent_id.is_(None),
                 SupportConversationModel.status.in_([ConversationStatus.OPEN.value, ConversationStatus.ASSIGNED.value]),
             )
-            .first()
+            .values(_claim_values(agent_id))
+            .execution_options(synchronize_session=False)
         )
-        if not conversation:
+        self.db.commit()
+        if result.rowcount != 1:
             return None
+        return self.get_conversation(conversation_id)
 
-        conversation.assigned_agent_id = agent_id
-        conversation.status = ConversationStatus.ASSIGNED.value
-        conversation.updated_at = datetime.utcnow()
+    def claim_next(self, agent_id: str) -> Optional[SupportConversation]:
+        """
+        Assign the best waiting conversation to an agent in a single statement.
 
+        The candidate subquery and the update run as one UPDATE, so two agents
+        calling this at once never receive the same conversation. Returns None
+        when nothing is waiting.
+        """
+        best = (
+            select(SupportConversationModel.id)
+            .where(
+                SupportConversationModel.status == ConversationStatus.OPEN.value,
+                SupportConversationModel.assigned_agent_id.is_(None),
+            )
+            .order_by(*_QUEUE_ORDER)
+            .limit(1)
+            .scalar_subquery()
+        )
+        claimed_id = self.db.execute(
+            update(SupportConversationModel)
+            .where(
+                SupportConversationModel.id == best,
+                SupportConversationModel.status == ConversationStatus.OPEN.value,
+                SupportConversationModel.assigned_agent_id.is_(None),
+            )
+            .values(_claim_values(agent_id))
+            .returning(SupportConversationModel.id)
+            .execution_options(synchronize_session=False)
+        ).scalar()
         self.db.commit()
-        self.db.refresh(conversation)
-        return self._to_conversation(conversation)
+        return self.get_conversation(claimed_id) if claimed_id else None
+
+    def set_priority(
+        self, conversation_id: str, priority: ConversationPriority, sla_minutes: int
+    ) -> Optional[SupportConversation]:
+        """Change a conversation's priority; its SLA deadline is recomputed from when it was opened."""
+        model = (
+            self.db.query(SupportConversationModel)
+            .filter(SupportConversationModel.id == conversation_id)
+            .first()
+        )
+        if not model:
+            return None
+        model.priority = PRIORITY_RANK[priority]
+        model.sla_due_at = (model.created_at or datetime.utcnow()) + timedelta(minutes=sla_minutes)
+        model.updated_at = datetime.utcnow()
+        self.db.commit()
+        self.db.refresh(model)
+        return self._to_conversation(model, include_messages=False)
 
     def close_conversation(self, conversation_id: str, resolution_notes: Optional[str]) -> Optional[SupportConversation]:
         conversation = (
@@ -231,6 +336,55 @@ class SupportRepository:
         )
         return self._to_attachment(model) if model else None
 
+    def delete_attachment(self, attachment_id: str) -> Optional[SupportAttachment]:
+        """
+        Delete an attachment; its message stays, without the attachment. Returns the deleted attachment.
+
+        Goes through ``Session.delete`` so the ``after_delete`` hook releases the
+        blob: a bulk ``delete()`` statement would skip the hook and leave the
+        blob referenced, and never collected, for good.
+        """
+        model = (
+            self.db.query(SupportAttachmentModel)
+            .filter(SupportAttachmentModel.id == attachment_id)
+            .first()
+        )
+        if not model:
+            return None
+        attachment = self._to_attachment(model)
+        # The ORM clears attachment_id on the referencing message before the delete
+        self.db.delete(model)
+        self.db.commit()
+        return attachment
+
+    def get_unreferenced_blobs(self, released_before: datetime, limit: int = 500) -> List[Tuple[str, str]]:
+        """(checksum, storage_path) of blobs with no attachments left since before ``released_before``."""
+        rows = self.db.execute(
+            select(SupportBlobModel.checksum, SupportBlobModel.storage_path)
+            .where(SupportBlobModel.ref_count == 0, SupportBlobModel.released_at < released_before)
+            .limit(limit)
+        ).all()
+        return [tuple(row) for row in rows]
+
+    def delete_unreferenced_blob(self, checksum: str) -> bool:
+        """Delete a blob row unless an attachment has referenced it again. Returns True if deleted."""
+        result = self.db.execute(
+            delete(SupportBlobModel).where(SupportBlobModel.checksum == checksum, SupportBlobModel.ref_count == 0)
+        )
+        self.db.commit()
+        return result.rowcount == 1
+
+    def get_known_blob_checksums(self, checksums: Iterable[str]) -> Set[str]:
+        """The subset of ``checksums`` that have a blob row."""
+        checksums = list(checksums)
+        if not checksums:
+            return set()
+        return set(
+            self.db.execute(
+                select(SupportBlobModel.checksum).where(SupportBlobModel.checksum.in_(checksums))
+            ).scalars()
+        )
+
     def add_message(
         self,
         *,
@@ -239,7 +393,14 @@ class SupportRepository:
         sender_id: Optional[str],
         body: Optional[str],
         attachment_id: Optional[str] = None,
+        client_message_id: Optional[str] = None,
     ) -> Optional[SupportMessage]:
+        """
+        Store a message and bump the conversation's last_message_at.
+
+        Raises IntegrityError if ``client_message_id`` was already used in the
+        conversation.
+        """
         conversation = (
             self.db.query(SupportConversationModel)
             .filter(SupportConversationModel.id == conversation_id)
@@ -257,6 +418,7 @@ class SupportRepository:
             attachment_id=attachment_id,
             status=MessageStatus.DELIVERED.value,
             created_at=datetime.utcnow(),
+            client_message_id=client_message_id,
         )
         self.db.add(message_model)
 
@@ -267,12 +429,60 @@ class SupportRepository:
         self.db.refresh(message_model)
         return self._to_message(message_model)
 
-    def get_recent_messages(self, conversation_id: str, limit: int = 50) -> List[SupportMessage]:
-        messages = (
+    def get_message_by_client_id(self, conversation_id: str, client_message_id: str) -> Optional[SupportMessage]:
+        model = (
             self.db.query(SupportMessageModel)
-            .filter(SupportMessageModel.conversation_id == conversation_id)
-            .order_by(SupportMessageModel.created_at.desc())
-            .limit(limit)
-            .all()
+            .filter(
+                SupportMessageModel.conversation_id == conversation_id,
+                SupportMessageModel.client_message_id == client_message_id,
+            )
+            .first()
         )
-        return [self._to_message(m) for m in reversed(messages)]
+        return self._to_message(model) if model else None
+
+    def get_recent_messages(self, conversation_id: str, limit: int = 50) -> List[SupportMessage]:
+        messages, _has_more = self.get_message_page(conversation_id, limit=limit)
+        return messages
+
+    def get_message_page(
+        self,
+        conversation_id: str,
+        limit: int = 50,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+    ) -> Tuple[List[SupportMessage], bool]:
+        """Get one keyset page of a conversation's messages, oldest first.
+
+        ``before``/``after`` are message ids; the page holds the messages just
+        older or newer than that message, ordered on (created_at, id). Without a
+        cursor the latest messages are returned. Returns (messages, has_more),
+        where has_more says whether further messages lie beyond the page in the
+        direction being read. Raises ValueError for a cursor that is not a
+        message of this conversation.
+        """
+        created, message_id = SupportMessageModel.created_at, SupportMessageModel.id
+        query = self.db.query(SupportMessageModel).filter(SupportMessageModel.conversation_id == conversation_id)
+
+        cursor = before or after
+        if cursor:
+            anchor = (
+                self.db.query(created)
+                .filter(message_id == cursor, SupportMessageModel.conversation_id == conversation_id)
+                .scalar()
+            )
+            if anchor is None:
+                raise ValueError("Unknown message cursor")
+            if before:
+                query = query.filter(or_(created < anchor, and_(created == anchor, message_id < cursor)))
+            else:
+                query = query.filter(or_(created > anchor, and_(created == anchor, message_id > cursor)))
+
+        if after:
+            rows = query.order_by(created.asc(), message_id.asc()).limit(limit + 1).all()
+        else:
+            rows = query.order_by(created.desc(), message_id.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if not after:
+            rows.reverse()
+        return [self._to_message(m) for m in rows], has_more
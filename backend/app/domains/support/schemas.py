@@ -3,7 +3,7 @@ from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
-from app.domains.support.entity import ConversationStatus, MessageStatus, SenderRole
+from app.domains.support.entity import ConversationPriority, ConversationStatus, MessageStatus, SenderRole
 
 
 class SupportCartItem(BaseModel):
@@ -51,6 +51,7 @@ class SupportMessageResponse(BaseModel):
     status: MessageStatus
     created_at: datetime
     attachment: Optional[SupportAttachmentResponse] = None
+    client_message_id: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -60,6 +61,8 @@ class SupportContextSnapshotResponse(BaseModel):
     orders_summary: list
     wish_list_items: list
     captured_at: datetime
+    order_count: Optional[int] = None
+    lifetime_spend: Optional[float] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -77,6 +80,8 @@ class SupportConversationResponse(BaseModel):
     updated_at: datetime
     closed_at: Optional[datetime] = None
     resolution_notes: Optional[str] = None
+    priority: ConversationPriority = ConversationPriority.NORMAL
+    sla_due_at: Optional[datetime] = None
     context_snapshot: Optional[SupportContextSnapshotResponse] = None
     messages: List[SupportMessageResponse] = Field(default_factory=list)
 
@@ -92,6 +97,8 @@ class SupportConversationSummary(BaseModel):
     guest_email: Optional[str] = None
     last_message_at: Optional[datetime] = None
     created_at: datetime
+    priority: ConversationPriority = ConversationPriority.NORMAL
+    sla_due_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -102,3 +109,22 @@ class SupportQueueResponse(BaseModel):
 
 class SupportCloseRequest(BaseModel):
     resolution_notes: Optional[str] = None
+
+
+class SupportPriorityUpdate(BaseModel):
+    priority: ConversationPriority
+
+
+class SupportSocketMetricsResponse(BaseModel):
+    connections: int
+    conversations: int
+    queued_messages: int
+    max_queue_depth: int
+    queue_capacity: int
+    evicted_total: int
+    idle_reaped_total: int
+    db_threads_busy: int
+    db_threads: int
+    db_pool_size: int
+    db_pool_checked_out: int
+    db_pool_overflow: int
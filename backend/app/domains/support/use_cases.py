@@ -1,58 +1,72 @@
+import time
 import uuid
 from typing import List, Optional, Tuple
-from datetime import datetime
+from datetime import datetime, timedelta
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
 from app.core.logging import logger
 from app.domains.order.repository import OrderRepository
 from app.domains.support.entity import (
+    ConversationPriority,
     ConversationStatus,
     SenderRole,
     SupportAttachment,
+    SupportBlobGCReport,
     SupportConversation,
+    SupportConversationHeader,
     SupportCustomerContextSnapshot,
     SupportMessage,
 )
 from app.domains.support.repository import SupportRepository
+from app.infrastructure.storageutils.local import iter_support_blob_files, remove_support_blob
 from app.infrastructure.database.sqlite.repositories.wishlist_repository import WishlistRepositorySQLite
 from app.domains.wishlist import use_cases as wishlist_use_cases
 
 
+def _sla_minutes(priority: ConversationPriority) -> int:
+    sla = get_settings().SUPPORT_SLA_MINUTES
+    return sla.get(priority.value, sla.get(ConversationPriority.NORMAL.value, 240))
+
+
 def _build_context_snapshot(db: Session, customer_id: Optional[str], cart_items: list | None) -> dict:
     orders_summary: List[dict] = []
     wishlist_summary: List[dict] = []
+    order_count = None
+    lifetime_spend = None
 
     if customer_id:
-        # Fetch orders
+        # Totals come from the maintained projection; only its few recent orders are hydrated
         order_repo = OrderRepository(db)
-        orders = order_repo.get_all(customer_id)
-        orders_summary = [
-            {
-                "id": order.id,
-                "status": getattr(order.status, "value", order.status),
-                "total_amount": order.total_amount,
-                "tax_amount": order.tax_amount,
-                "shipping_amount": order.shipping_amount,
-                "created_at": order.created_at.isoformat() if order.created_at else None,
-                "delivery_address": order.delivery_address,
-                "delivered_at": order.delivered_at.isoformat() if order.delivered_at else None,
+        summary = order_repo.get_customer_summary(customer_id)
+        order_count = summary.order_count
+        lifetime_spend = summary.lifetime_spend
+        details = {
+            order.id: order for order in order_repo.get_by_ids([h["id"] for h in summary.recent_orders])
+        }
+        for header in summary.recent_orders:
+            order = details.get(header["id"])
+            orders_summary.append({
+                **header,
+                "delivery_address": order.delivery_address if order else None,
                 "items": [
                     {
+                        "product_id": item.product_id,
                         "product_name": item.product_name,
-                        "product_price": item.product_price,
                         "quantity": item.quantity,
                         "subtotal": item.subtotal,
                     }
-                    for item in order.items
+                    for item in (order.items if order else [])
                 ],
-            }
-            for order in orders
-        ]
+            })
 
         # Fetch wishlist items
         wishlist_repo = WishlistRepositorySQLite(db)
-        wishlist_products = wishlist_use_cases.list_wishlist(db, customer_id, wishlist_repo)
+        wishlist_products = wishlist_use_cases.list_wishlist(
+            db, customer_id, wishlist_repo, limit=get_settings().SUPPORT_CONTEXT_WISHLIST_LIMIT
+        )
         wishlist_summary = [
             {
                 "id": product.id,
@@ -67,6 +81,8 @@ def _build_context_snapshot(db: Session, customer_id: Optional[str], cart_items:
     return {
         "cart_items": cart_items or [],
         "orders_summary": orders_summary,
+        "order_count": order_count,
+        "lifetime_spend": lifetime_spend,
         "wish_list_items": wishlist_summary,
     }
 
@@ -111,6 +127,8 @@ def start_conversation(
         initial_message=initial_message,
         initial_sender_role=SenderRole.CUSTOMER,
         conversation_token=token,
+        priority=ConversationPriority.NORMAL,
+        sla_minutes=_sla_minutes(ConversationPriority.NORMAL),
     )
     return conversation, token
 
@@ -120,6 +138,12 @@ def get_conversation(db: Session, conversation_id: str) -> Optional[SupportConve
     return repo.get_conversation(conversation_id)
 
 
+def get_conversation_header(db: Session, conversation_id: str) -> Optional[SupportConversationHeader]:
+    """Get a conversation's status, owner, token and assigned agent without loading its history."""
+    repo = SupportRepository(db)
+    return repo.get_conversation_header(conversation_id)
+
+
 def list_queue(db: Session, limit: int = 50) -> List[SupportConversation]:
     repo = SupportRepository(db)
     return repo.list_queue(limit=limit)
@@ -133,6 +157,39 @@ def claim_conversation(db: Session, conversation_id: str, agent_id: str) -> Opti
     return claimed
 
 
+def claim_next_conversation(db: Session, agent_id: str) -> Optional[SupportConversation]:
+    """
+    Atomically assign the most urgent waiting conversation to an agent.
+
+    Args:
+        db: Database session
+        agent_id: Agent taking the conversation
+
+    Returns:
+        The claimed conversation, or None if no conversation is waiting
+    """
+    repo = SupportRepository(db)
+    return repo.claim_next(agent_id)
+
+
+def set_conversation_priority(
+    db: Session, conversation_id: str, priority: ConversationPriority
+) -> Optional[SupportConversation]:
+    """
+    Reprioritize a conversation and move its SLA deadline to match.
+
+    Args:
+        db: Database session
+        conversation_id: Conversation to update
+        priority: New priority
+
+    Returns:
+        The updated conversation, or None if it does not exist
+    """
+    repo = SupportRepository(db)
+    return repo.set_priority(conversation_id, priority, _sla_minutes(priority))
+
+
 def close_conversation(db: Session, conversation_id: str, resolution_notes: Optional[str]) -> Optional[SupportConversation]:
     repo = SupportRepository(db)
     return repo.close_conversation(conversation_id, resolution_notes)
@@ -157,6 +214,48 @@ def add_message(
     )
 
 
+def add_client_message(
+    db: Session,
+    *,
+    conversation_id: str,
+    sender_role: SenderRole,
+    sender_id: Optional[str],
+    body: Optional[str],
+    client_message_id: Optional[str],
+) -> Tuple[Optional[SupportMessage], bool]:
+    """
+    Store a chat message at most once per client-generated id.
+
+    Args:
+        db: Database session
+        conversation_id: Conversation the message belongs to
+        sender_role: Customer or agent
+        sender_id: Sending user, None for guests
+        body: Message text
+        client_message_id: Id the client generated for this send; None disables deduplication
+
+    Returns:
+        (message, created); created is False when the id was already used and
+        the stored message is returned instead of a new one
+    """
+    repo = SupportRepository(db)
+    try:
+        message = repo.add_message(
+            conversation_id=conversation_id,
+            sender_role=sender_role,
+            sender_id=sender_id,
+            body=body,
+            client_message_id=client_message_id,
+        )
+    except IntegrityError:
+        # Unique (conversation_id, client_message_id): this send is a retry
+        db.rollback()
+        if not client_message_id:
+            raise
+        return repo.get_message_by_client_id(conversation_id, client_message_id), False
+    return message, True
+
+
 def add_attachment(
     db: Session,
     *,
@@ -184,6 +283,117 @@ def get_attachment(db: Session, attachment_id: str) -> Optional[SupportAttachmen
     return repo.get_attachment(attachment_id)
 
 
+def delete_attachment(db: Session, attachment_id: str) -> Optional[SupportAttachment]:
+    """
+    Delete an attachment and release its blob.
+
+    The message that carried it is kept without the attachment. The file is
+    removed by the attachment GC job once no other attachment shares it.
+
+    Args:
+        db: Database session
+        attachment_id: ID of the attachment to delete
+
+    Returns:
+        The deleted SupportAttachment, or None if it does not exist
+    """
+    repo = SupportRepository(db)
+    return repo.delete_attachment(attachment_id)
+
+
+def collect_attachment_blobs(
+    db: Session,
+    base_dir: str,
+    grace_seconds: int,
+    batch_size: int = 500,
+) -> SupportBlobGCReport:
+    """
+    Delete attachment blobs no attachment refers to any more.
+
+    Blob rows whose reference count has been zero for longer than the grace
+    period are deleted first, then their files. Files under the blob directory
+    with no row at all (an upload that failed after writing, or an interrupted
+    write) are deleted once older than the grace period. A file touched by a
+    new upload of the same content is kept.
+
+    Args:
+        db: Database session
+        base_dir: Attachment storage directory
+        grace_seconds: How long an unreferenced blob is kept
+        batch_size: Blob rows or files checked per query
+
+    Returns:
+        SupportBlobGCReport with counts and bytes freed
+    """
+    repo = SupportRepository(db)
+    report = SupportBlobGCReport()
+    released_before = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    modified_before = time.time() - grace_seconds
+
+    while True:
+        blobs = repo.get_unreferenced_blobs(released_before, limit=batch_size)
+        for checksum, storage_path in blobs:
+            if repo.delete_unreferenced_blob(checksum):
+                report.deleted_blobs += 1
+                report.freed_bytes += remove_support_blob(base_dir, storage_path, modified_before) or 0
+        if len(blobs) < batch_size:
+            break
+
+    def sweep(files):
+        known = repo.get_known_blob_checksums(name for name, _ in files if not name.startswith("."))
+        for name, storage_path in files:
+            if name in known:
+                continue
+            freed = remove_support_blob(base_dir, storage_path, modified_before)
+            if freed is not None:
+                report.deleted_orphans += 1
+                report.freed_bytes += freed
+
+    files = []
+    for entry in iter_support_blob_files(base_dir, modified_before):
+        files.append(entry)
+        if len(files) >= batch_size:
+            sweep(files)
+            files = []
+    sweep(files)
+
+    if report.deleted_blobs or report.deleted_orphans:
+        logger.info(
+            f"Support blob GC: deleted {report.deleted_blobs} blobs and {report.deleted_orphans} orphaned files, "
+            f"freed {report.freed_bytes} bytes"
+        )
+    return report
+
+
 def recent_messages(db: Session, conversation_id: str, limit: int = 50) -> List[SupportMessage]:
     repo = SupportRepository(db)
     return repo.get_recent_messages(conversation_id, limit=limit)
+
+
+def message_page(
+    db: Session,
+    conversation_id: str,
+    limit: int = 50,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+) -> Tuple[List[SupportMessage], bool]:
+    """
+    Get a page of conversation history around a message cursor.
+
+    Args:
+        db: Database session
+        conversation_id: Conversation to read
+        limit: Page size
+        before: Message id; return the messages just older than it
+        after: Message id; return the messages just newer than it
+
+    Returns:
+        (messages oldest first, whether more messages lie beyond the page)
+
+    Raises:
+        ValueError: If both cursors are given or the cursor is not a message of the conversation
+    """
+    if before and after:
+        raise ValueError("Use either before or after, not both")
+    repo = SupportRepository(db)
+    return repo.get_message_page(conversation_id, limit=limit, before=before, after=after)
@@ -1,6 +1,9 @@
-from typing import Protocol, List, Optional
+from dataclasses import dataclass
+from typing import Dict, Iterable, Protocol, List, Optional
 from datetime import datetime
 
+from app.domains.catalog.entity import Product
+
 
 class WishlistItem:
     def __init__(self, id: int, user_id: str, product_id: int, created_at: datetime):
@@ -10,10 +13,22 @@ class WishlistItem:
         self.created_at = created_at
 
 
+@dataclass(frozen=True)
+class WishlistRecipient:
+    """A user who wishlisted a product, with the address to notify."""
+
+    user_id: str
+    email: str
+
+
 class WishlistRepository(Protocol):
     def get_user_ids_by_product(self, product_id: int) -> List[str]:
         """Return distinct user IDs who have this product in their wishlist."""
 
+    def get_recipients_by_products(self, product_ids: Iterable[int]) -> Dict[int, List[WishlistRecipient]]:
+        """Resolve many products to their wishlisters' (user, email) pairs in one pass."""
+        ...
+
     def exists(self, user_id: str, product_id: int) -> bool:
         ...
 
@@ -26,6 +41,10 @@ class WishlistRepository(Protocol):
     def list_items(self, user_id: str) -> List[WishlistItem]:
         ...
 
+    def list_products(self, user_id: str, limit: Optional[int] = None, offset: int = 0) -> List[Product]:
+        """Return wishlisted products (newest first) in one joined query."""
+        ...
+
     def clear(self, user_id: str) -> int:
         """Clear all wishlist items for a user. Returns number deleted."""
         ...
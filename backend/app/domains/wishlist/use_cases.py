@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from sqlalchemy.orm import Session
 
 from app.domains.catalog.repository import ProductRepository
@@ -6,16 +6,14 @@ from app.domains.catalog.entity import Product
 from app.domains.wishlist.repository import WishlistRepository
 
 
-def list_wishlist(db: Session, user_id: str, wishlist_repo: WishlistRepository) -> List[Product]:
-    repo = wishlist_repo
-    product_repo = ProductRepository(db)
-    items = repo.list_items(user_id)
-    products: List[Product] = []
-    for item in items:
-        product = product_repo.get_by_id(item.product_id)
-        if product:
-            products.append(product)
-    return products
+def list_wishlist(
+    db: Session,
+    user_id: str,
+    wishlist_repo: WishlistRepository,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> List[Product]:
+    return wishlist_repo.list_products(user_id, limit=limit, offset=offset)
 
 
 def add_to_wishlist(db: Session, user_id: str, product_id: int, wishlist_repo: WishlistRepository) -> Product:
@@ -1,12 +1,22 @@
 from app.infrastructure.database.sqlite.models.product import ProductModel
 from app.infrastructure.database.sqlite.models.category import CategoryModel
-from app.infrastructure.database.sqlite.models.order import OrderModel, OrderItemModel
+from app.infrastructure.database.sqlite.models.order import (
+    OrderModel,
+    OrderItemModel,
+    OrderEventModel,
+    OrderArchiveModel,
+    OrderItemArchiveModel,
+    CustomerOrderSummaryModel,
+)
 from app.infrastructure.database.sqlite.models.user import UserModel
+from app.infrastructure.database.sqlite.models.email_outbox import EmailOutboxModel
 from app.infrastructure.database.sqlite.models.review import ReviewModel
 from app.infrastructure.database.sqlite.models.support import (
     SupportAttachmentModel,
+    SupportBlobModel,
+    SupportBroadcastModel,
     SupportConversationModel,
     SupportContextSnapshotModel,
     SupportMessageModel,
 )
-from app.infrastructure.database.sqlite.models.wishlist import WishlistModel
+from app.infrastructure.database.sqlite.models.wishlist import WishlistModel, WishlistDigestEntryModel
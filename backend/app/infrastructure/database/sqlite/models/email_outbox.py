@@ -0,0 +1,29 @@
+from sqlalchemy import Column, DateTime, Enum as SQLEnum, Index, Integer, JSON, String, Text, func
+
+from app.domains.notifications.outbox import EmailOutboxStatus
+from app.infrastructure.database.sqlite.session import Base
+
+
+class EmailOutboxModel(Base):
+    """Emails waiting for (or done with) delivery by the outbox worker."""
+
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Worker scan: due rows by status, oldest first
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    template = Column(String(64), nullable=False)
+    to_address = Column(String(255), nullable=False)
+    context = Column(JSON, nullable=True)
+    order_id = Column(Integer, nullable=True, index=True)  # No FK: the order may be archived
+    status = Column(SQLEnum(EmailOutboxStatus), default=EmailOutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, server_default=func.now(), nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<EmailOutbox(id={self.id}, template={self.template}, status={self.status})>"
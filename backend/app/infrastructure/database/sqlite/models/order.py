@@ -1,14 +1,16 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.infrastructure.database.sqlite.session import Base
-from app.domains.order.entity import OrderStatus
+from app.domains.order.entity import OrderStatus, OrderEventType
 
 
 class OrderModel(Base):
     """SQLAlchemy model for orders."""
 
     __tablename__ = "orders"
+    # AUTOINCREMENT: ids moved to orders_archive must never be handed out again
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     customer_id = Column(String(36), nullable=False, index=True)  # UUID string
@@ -40,6 +42,11 @@ class OrderItemModel(Base):
     """SQLAlchemy model for order items."""
 
     __tablename__ = "order_items"
+    __table_args__ = (
+        # Covers "which orders contain product X" lookups (review eligibility)
+        Index("ix_order_items_product_order", "product_id", "order_id"),
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -54,3 +61,86 @@ class OrderItemModel(Base):
 
     def __repr__(self):
         return f"<OrderItem(id={self.id}, order_id={self.order_id}, product_id={self.product_id}, quantity={self.quantity})>"
+
+
+class OrderEventModel(Base):
+    """SQLAlchemy model for the append-only order event log."""
+
+    __tablename__ = "order_events"
+
+    # Monotonic integer id doubles as the sync cursor for downstream consumers
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    order_id = Column(Integer, nullable=False, index=True)  # No FK: events outlive deleted/archived orders
+    customer_id = Column(String(36), nullable=False, index=True)
+    event_type = Column(SQLEnum(OrderEventType), nullable=False)
+    payload = Column(JSON, nullable=True)  # Small typed payload, e.g. {"from": "processing", "to": "in-transit"}
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<OrderEvent(id={self.id}, order_id={self.order_id}, type={self.event_type})>"
+
+
+class OrderArchiveModel(Base):
+    """Cold storage for delivered orders past the refund window; mirrors ``orders``."""
+
+    __tablename__ = "orders_archive"
+
+    id = Column(Integer, primary_key=True)  # Keeps the original order id
+    customer_id = Column(String(36), nullable=False, index=True)
+    status = Column(SQLEnum(OrderStatus), nullable=False)
+    total_amount = Column(Float, nullable=False)
+    tax_amount = Column(Float, nullable=False)
+    shipping_amount = Column(Float, nullable=False)
+    delivery_address = Column(String(500), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+    cancelled_at = Column(DateTime(timezone=True), nullable=True)
+    refund_requested_at = Column(DateTime(timezone=True), nullable=True)
+    refunded_at = Column(DateTime(timezone=True), nullable=True)
+    refund_amount = Column(Float, nullable=True)
+    refund_reason = Column(String(500), nullable=True)
+    refund_items = Column(String(1000), nullable=True)
+
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    items = relationship("OrderItemArchiveModel", back_populates="order", cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<OrderArchive(id={self.id}, customer_id={self.customer_id}, status={self.status})>"
+
+
+class OrderItemArchiveModel(Base):
+    """Cold storage for items of archived orders; mirrors ``order_items``."""
+
+    __tablename__ = "order_items_archive"
+    __table_args__ = (
+        Index("ix_order_items_archive_product_order", "product_id", "order_id"),
+    )
+
+    id = Column(Integer, primary_key=True)  # Keeps the original item id
+    order_id = Column(Integer, ForeignKey("orders_archive.id", ondelete="CASCADE"), nullable=False, index=True)
+    product_id = Column(Integer, nullable=False, index=True)
+    product_name = Column(String(200), nullable=False)
+    product_price = Column(Float, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    subtotal = Column(Float, nullable=False)
+
+    order = relationship("OrderArchiveModel", back_populates="items")
+
+
+class CustomerOrderSummaryModel(Base):
+    """Per-customer order projection maintained on every order write."""
+
+    __tablename__ = "customer_order_summaries"
+
+    customer_id = Column(String(36), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    lifetime_spend = Column(Float, nullable=False, default=0.0)  # Excludes cancelled orders and refunded amounts
+    recent_orders = Column(JSON, nullable=False, default=list)  # Newest first, header fields only
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<CustomerOrderSummary(customer_id={self.customer_id}, orders={self.order_count})>"
@@ -1,7 +1,7 @@
 """
 Review Database Model
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Text, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Text, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.infrastructure.database.sqlite.session import Base
@@ -13,6 +13,10 @@ class ReviewModel(Base):
     __tablename__ = "reviews"
     __table_args__ = (
         UniqueConstraint('user_id', 'product_id', name='uq_user_product_review'),
+        # Serves paginated "reviews of product X" listings newest-first
+        Index('ix_reviews_product_approved_created', 'product_id', 'is_approved', 'created_at'),
+        # Serves the oldest-first moderation queue
+        Index('ix_reviews_status_created', 'status', 'created_at'),
     )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -21,7 +25,7 @@ class ReviewModel(Base):
     product_id = Column(Integer, ForeignKey('products.id', ondelete='CASCADE'), nullable=False, index=True)
     user_id = Column(String(36), nullable=False, index=True)  # UUID from identity system
     user_name = Column(String(200), nullable=False)  # Denormalized for display (first_name + last_name)
-    order_id = Column(Integer, ForeignKey('orders.id', ondelete='CASCADE'), nullable=False, index=True)
+    order_id = Column(Integer, nullable=False, index=True)  # No FK: the order may be moved to orders_archive
 
     # Review content
     rating = Column(Integer, nullable=True)  # 1-5 stars (optional)
@@ -39,7 +43,7 @@ class ReviewModel(Base):
 
     # Relationships
     product = relationship("ProductModel", backref="reviews")
-    order = relationship("OrderModel", backref="reviews")
+    order = relationship("OrderModel", primaryjoin="foreign(ReviewModel.order_id) == OrderModel.id", viewonly=True)
 
     def __repr__(self):
         return f"<Review(id={self.id}, product_id={self.product_id}, user_id={self.user_id}, rating={self.rating}, approved={self.is_approved})>"
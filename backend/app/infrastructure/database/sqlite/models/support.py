@@ -2,13 +2,18 @@ from datetime import datetime
 from sqlalchemy import (
     Column,
     DateTime,
+    Float,
     ForeignKey,
+    Index,
     Integer,
     JSON,
     String,
     Text,
     UniqueConstraint,
+    event,
+    update,
 )
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import relationship
 
 from app.infrastructure.database.sqlite.session import Base
@@ -16,6 +21,10 @@ from app.infrastructure.database.sqlite.session import Base
 
 class SupportConversationModel(Base):
     __tablename__ = "support_conversations"
+    __table_args__ = (
+        # Serves the agent queue: best priority first, then the nearest SLA deadline
+        Index("ix_support_conversations_queue", "status", "priority", "sla_due_at"),
+    )
 
     id = Column(String(36), primary_key=True, index=True)
     status = Column(String(20), nullable=False, index=True, default="open")
@@ -29,6 +38,8 @@ class SupportConversationModel(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     closed_at = Column(DateTime, nullable=True)
     last_message_at = Column(DateTime, default=datetime.utcnow, index=True)
+    priority = Column(Integer, nullable=False, default=2)
+    sla_due_at = Column(DateTime, nullable=True)
 
     messages = relationship(
         "SupportMessageModel",
@@ -51,6 +62,12 @@ class SupportConversationModel(Base):
 
 class SupportMessageModel(Base):
     __tablename__ = "support_messages"
+    __table_args__ = (
+        # History pages are keyset scans on (created_at, id) within one conversation
+        Index("ix_support_messages_conversation_created", "conversation_id", "created_at", "id"),
+        # A retried send with the same client id maps to the message already stored
+        UniqueConstraint("conversation_id", "client_message_id", name="uq_support_message_client_id"),
+    )
 
     id = Column(String(36), primary_key=True, index=True)
     conversation_id = Column(String(36), ForeignKey("support_conversations.id"), index=True, nullable=False)
@@ -60,6 +77,7 @@ class SupportMessageModel(Base):
     attachment_id = Column(String(36), ForeignKey("support_attachments.id"), nullable=True)
     status = Column(String(20), nullable=False, default="delivered")
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    client_message_id = Column(String(64), nullable=True)
 
     conversation = relationship("SupportConversationModel", back_populates="messages")
     attachment = relationship("SupportAttachmentModel", back_populates="message", uselist=False)
@@ -84,13 +102,85 @@ class SupportAttachmentModel(Base):
     message = relationship("SupportMessageModel", back_populates="attachment", uselist=False)
 
 
+class SupportBlobModel(Base):
+    """
+    One stored attachment file, keyed by the SHA-256 of its content.
+
+    ``ref_count`` is the number of attachment rows pointing at the blob; it is
+    kept by the attachment insert/delete hooks below, which only run for ORM
+    flushes, so attachment rows must be added with ``Session.add`` and removed
+    with ``Session.delete`` rather than bulk statements. Blobs left at zero are
+    removed by the attachment GC job once ``released_at`` is older than its
+    grace period.
+    """
+
+    __tablename__ = "support_blobs"
+    __table_args__ = (
+        Index("ix_support_blobs_unreferenced", "ref_count", "released_at"),
+    )
+
+    checksum = Column(String(64), primary_key=True)
+    size_bytes = Column(Integer, nullable=False)
+    storage_path = Column(String(500), nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    released_at = Column(DateTime, nullable=True)
+
+
+def _is_blob(target: SupportAttachmentModel) -> bool:
+    # Attachments stored before blobs existed live under their conversation's directory
+    return bool(target.checksum) and target.storage_path.startswith("blobs/")
+
+
+@event.listens_for(SupportAttachmentModel, "after_insert")
+def _acquire_blob(mapper, connection, target):
+    if not _is_blob(target):
+        return
+    connection.execute(
+        insert(SupportBlobModel)
+        .values(checksum=target.checksum, size_bytes=target.size_bytes, storage_path=target.storage_path, ref_count=1)
+        .on_conflict_do_update(
+            index_elements=[SupportBlobModel.checksum],
+            set_={"ref_count": SupportBlobModel.ref_count + 1, "released_at": None},
+        )
+    )
+
+
+@event.listens_for(SupportAttachmentModel, "after_delete")
+def _release_blob(mapper, connection, target):
+    if not _is_blob(target):
+        return
+    connection.execute(
+        update(SupportBlobModel)
+        .where(SupportBlobModel.checksum == target.checksum, SupportBlobModel.ref_count > 0)
+        .values(ref_count=SupportBlobModel.ref_count - 1, released_at=datetime.utcnow())
+    )
+
+
 class SupportContextSnapshotModel(Base):
     __tablename__ = "support_context_snapshots"
 
     conversation_id = Column(String(36), ForeignKey("support_conversations.id"), primary_key=True)
     cart_items = Column(JSON, nullable=True)
-    orders_summary = Column(JSON, nullable=True)
+    orders_summary = Column(JSON, nullable=True)  # Most recent orders only
+    order_count = Column(Integer, nullable=True)  # All of the customer's orders, including archived ones
+    lifetime_spend = Column(Float, nullable=True)
     wish_list_items = Column(JSON, nullable=True)
     captured_at = Column(DateTime, default=datetime.utcnow)
 
     conversation = relationship("SupportConversationModel", back_populates="context_snapshot")
+
+
+class SupportBroadcastModel(Base):
+    """Support socket events relayed between app processes by the SQLite broadcast backend."""
+
+    __tablename__ = "support_broadcasts"
+    # Pollers track the last id they saw; once the newest rows are pruned plain
+    # ROWID would hand those ids out again and the new messages would be skipped
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    channel = Column(String(36), nullable=False)
+    origin = Column(String(36), nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -1,11 +1,15 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, UniqueConstraint, func
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, UniqueConstraint, Index, JSON, func
 from sqlalchemy.orm import relationship
 from app.infrastructure.database.sqlite.session import Base
 
 
 class WishlistModel(Base):
     __tablename__ = "wishlists"
-    __table_args__ = (UniqueConstraint("user_id", "product_id", name="uq_wishlist_user_product"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "product_id", name="uq_wishlist_user_product"),
+        # Inverted product -> wishlisters index for notification fan-out
+        Index("ix_wishlists_product_user", "product_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -17,3 +21,27 @@ class WishlistModel(Base):
 
     def __repr__(self) -> str:
         return f"<Wishlist(id={self.id}, user_id={self.user_id}, product_id={self.product_id})>"
+
+
+class WishlistDigestEntryModel(Base):
+    """Buffered wishlist event for one recipient, waiting to be sent in a digest."""
+
+    __tablename__ = "wishlist_digest_entries"
+    __table_args__ = (
+        Index("ix_wishlist_digest_entries_user_created", "user_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    email = Column(String(255), nullable=False)
+    event_type = Column(String(32), nullable=False)
+    product_id = Column(Integer, nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Send attempts of the digest carrying this entry; while a worker holds the entry or
+    # waits to retry it, next_attempt_at is in the future
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<WishlistDigestEntry(id={self.id}, user_id={self.user_id}, event_type={self.event_type})>"
@@ -1,14 +1,21 @@
-from typing import List
+from typing import Dict, Iterable, List, Optional
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.domains.wishlist.repository import WishlistRepository, WishlistItem
+from app.domains.catalog.entity import Product
+from app.domains.catalog.repository import ProductRepository
+from app.domains.wishlist.repository import WishlistRepository, WishlistItem, WishlistRecipient
+from app.infrastructure.database.sqlite.models.product import ProductModel
+from app.infrastructure.database.sqlite.models.user import UserModel
 from app.infrastructure.database.sqlite.models.wishlist import WishlistModel
 
 
 class WishlistRepositorySQLite(WishlistRepository):
     """SQLite implementation of the wishlist repository."""
 
+    # Keep IN (...) lists well under SQLite's bound-parameter limit
+    RECIPIENT_LOOKUP_CHUNK = 500
+
     def __init__(self, db: Session):
         self.db = db
 
@@ -18,6 +25,21 @@ class WishlistRepositorySQLite(WishlistRepository):
         # De-duplicate in case of unexpected duplicates
         return list(set(rows))
 
+    def get_recipients_by_products(self, product_ids: Iterable[int]) -> Dict[int, List[WishlistRecipient]]:
+        ids = sorted({int(pid) for pid in product_ids})
+        recipients: Dict[int, List[WishlistRecipient]] = {}
+        for start in range(0, len(ids), self.RECIPIENT_LOOKUP_CHUNK):
+            chunk = ids[start:start + self.RECIPIENT_LOOKUP_CHUNK]
+            stmt = (
+                select(WishlistModel.product_id, UserModel.id, UserModel.email)
+                .join(UserModel, UserModel.id == WishlistModel.user_id)
+                .where(WishlistModel.product_id.in_(chunk))
+            )
+            for product_id, user_id, email in self.db.execute(stmt):
+                if email:
+                    recipients.setdefault(product_id, []).append(WishlistRecipient(user_id=user_id, email=email))
+        return recipients
+
     def exists(self, user_id: str, product_id: int) -> bool:
         return (
             self.db.query(WishlistModel)
@@ -91,6 +113,19 @@ class WishlistRepositorySQLite(WishlistRepository):
             for item in items
         ]
 
+    def list_products(self, user_id: str, limit: Optional[int] = None, offset: int = 0) -> List[Product]:
+        # Single query: wishlist join products, with the category eagerly joined by the model
+        query = (
+            self.db.query(ProductModel)
+            .join(WishlistModel, WishlistModel.product_id == ProductModel.id)
+            .filter(WishlistModel.user_id == user_id)
+            .order_by(WishlistModel.created_at.desc(), WishlistModel.id.desc())
+            .offset(offset)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        return [ProductRepository.to_entity(model) for model in query.all()]
+
     def clear(self, user_id: str) -> int:
         deleted = self.db.query(WishlistModel).filter(WishlistModel.user_id == user_id).delete()
         if deleted:
@@ -20,6 +20,17 @@ event.listen(engine, "connect", _enable_foreign_keys)
 
 SessionLocal = sessionmaker(bind=engine)
 
+
+def pool_status() -> dict:
+    """Connection pool usage for the app engine; zeros for pools that do not track it."""
+    pool = engine.pool
+    stat = lambda name: getattr(pool, name)() if hasattr(pool, name) else 0  # noqa: E731
+    return {
+        "db_pool_size": stat("size"),
+        "db_pool_checked_out": stat("checkedout"),
+        "db_pool_overflow": max(stat("overflow"), 0),
+    }
+
 Base = declarative_base()
 
 def get_db():
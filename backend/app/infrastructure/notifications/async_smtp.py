@@ -0,0 +1,181 @@
+import asyncio
+import concurrent.futures
+import time
+from email.message import EmailMessage
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import aiosmtplib
+
+from app.core.config import get_settings
+from app.core.logging import logger
+
+# 421: the server is closing the channel, so the connection must be replaced
+_SERVICE_CLOSING = 421
+
+
+class _AsyncConnection:
+    def __init__(self, client: aiosmtplib.SMTP):
+        self.client = client
+        self.last_used = time.monotonic()
+
+    async def close(self) -> None:
+        try:
+            await self.client.quit()
+        except Exception:  # noqa: BLE001
+            self.client.close()
+
+
+class AsyncSMTPTransport:
+    """
+    Event-loop SMTP sender with bounded concurrency.
+
+    Sends run on the event loop instead of Starlette's threadpool, so a slow
+    mail server no longer ties up the threads that serve sync endpoints. At
+    most ``max_concurrency`` messages are in flight, each on its own reusable
+    authenticated connection; idle connections older than
+    ``keepalive_seconds`` are checked with NOOP before reuse, and a send that
+    hits a dropped connection is retried once on a fresh one.
+
+    Sync code running in a worker thread can hand a message over with
+    ``submit`` once the transport is bound to the running loop. TLS follows
+    ``SMTPConnectionPool``: STARTTLS when enabled, implicit TLS otherwise.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        use_ssl: Optional[bool] = None,
+        max_concurrency: int = 4,
+        timeout: float = 10,
+        keepalive_seconds: float = 60,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.use_ssl = not starttls if use_ssl is None else use_ssl
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.keepalive_seconds = keepalive_seconds
+        self._idle: List[_AsyncConnection] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.connects = 0
+        self.sent = 0
+
+    def bind(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Attach to the application's event loop (call from startup)."""
+        self._loop = loop or asyncio.get_running_loop()
+
+    @property
+    def bound(self) -> bool:
+        return self._loop is not None and not self._loop.is_closed()
+
+    async def _connect(self) -> _AsyncConnection:
+        client = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            use_tls=self.use_ssl,
+            start_tls=False if self.use_ssl else self.starttls,
+            timeout=self.timeout,
+        )
+        await client.connect()
+        if self.username and self.password:
+            await client.login(self.username, self.password)
+        self.connects += 1
+        return _AsyncConnection(client)
+
+    async def _acquire(self, fresh: bool) -> _AsyncConnection:
+        while self._idle and not fresh:
+            conn = self._idle.pop()
+            if time.monotonic() - conn.last_used < self.keepalive_seconds:
+                return conn
+            try:
+                await conn.client.noop()
+                return conn
+            except Exception:  # noqa: BLE001
+                await conn.close()
+        return await self._connect()
+
+    def _release(self, conn: _AsyncConnection) -> None:
+        conn.last_used = time.monotonic()
+        self._idle.append(conn)
+
+    async def send(self, msg: EmailMessage, recipients: Optional[List[str]] = None) -> Dict[str, aiosmtplib.SMTPResponse]:
+        """
+        Send one message. Raises if it was not accepted for any recipient.
+
+        ``recipients`` overrides the envelope recipients taken from the headers.
+        Returns the refused recipients with the server's reply when others were
+        accepted.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            for attempt in (1, 2):
+                # Retry on a new connection: other idle ones may have dropped too
+                conn = await self._acquire(fresh=attempt == 2)
+                try:
+                    errors, _ = await conn.client.send_message(msg, recipients=recipients)
+                except (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused) as exc:
+                    if getattr(exc, "code", None) != _SERVICE_CLOSING:
+                        # Message rejected; the connection itself is still usable
+                        self._release(conn)
+                        raise
+                    await conn.close()
+                    if attempt == 2:
+                        raise
+                    logger.warning(f"SMTP server closed the connection ({exc}); reconnecting")
+                    continue
+                except (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError, OSError) as exc:
+                    await conn.close()
+                    if attempt == 2:
+                        raise
+                    logger.warning(f"SMTP connection lost ({exc}); reconnecting")
+                    continue
+                except Exception:
+                    self._release(conn)
+                    raise
+                self._release(conn)
+                self.sent += 1
+                return errors
+
+    def submit(self, msg: EmailMessage, recipients: Optional[List[str]] = None) -> concurrent.futures.Future:
+        """Schedule a send from a worker thread without waiting for the mail server."""
+        if not self.bound:
+            raise RuntimeError("AsyncSMTPTransport is not bound to an event loop")
+        future = asyncio.run_coroutine_threadsafe(self.send(msg, recipients), self._loop)
+        future.add_done_callback(_log_submit_failure)
+        return future
+
+    async def close(self) -> None:
+        while self._idle:
+            await self._idle.pop().close()
+
+
+def _log_submit_failure(future: concurrent.futures.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Failed to send email: {future.exception()}")
+
+
+@lru_cache
+def get_async_email_transport() -> Optional[AsyncSMTPTransport]:
+    """Process-wide async transport, or None when SMTP is not configured."""
+    settings = get_settings()
+    if not settings.SMTP_HOST:
+        return None
+    return AsyncSMTPTransport(
+        host=settings.SMTP_HOST,
+        port=settings.SMTP_PORT,
+        username=settings.SMTP_USERNAME,
+        password=settings.SMTP_PASSWORD,
+        starttls=settings.SMTP_STARTTLS,
+        max_concurrency=settings.EMAIL_ASYNC_CONCURRENCY,
+        keepalive_seconds=settings.SMTP_KEEPALIVE_SECONDS,
+    )
@@ -0,0 +1,136 @@
+import asyncio
+from typing import Any, Dict, List
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.logging import logger
+from app.domains.notifications import use_cases as notification_use_cases
+from app.domains.notifications.digest import WishlistDigest
+from app.domains.notifications.notifier import WishlistEvent, WishlistEventType, WishlistNotifier
+from app.domains.notifications.repository import WishlistDigestRepository
+from app.domains.wishlist.repository import WishlistRecipient
+from app.infrastructure.database.sqlite.session import SessionLocal
+from app.infrastructure.notifications.async_smtp import AsyncSMTPTransport, get_async_email_transport
+from app.infrastructure.notifications.email_notifier import EmailWishlistNotifier
+
+
+class DigestWishlistNotifier(WishlistNotifier):
+    """
+    Buffers wishlist events per recipient instead of emailing them one by one.
+
+    Entries are written to the request session without committing, so they
+    are saved together with the product change that caused them, or not at
+    all. The digest flusher sends them once they are committed.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _enqueue(self, event: WishlistEvent, recipients: List[WishlistRecipient]) -> None:
+        WishlistDigestRepository(self.db).enqueue(event, recipients)
+
+    def send_stock_email(self, recipients: List[WishlistRecipient], product: Dict[str, Any]) -> None:
+        self._enqueue(WishlistEvent(WishlistEventType.BACK_IN_STOCK, product), recipients)
+
+    def send_out_of_stock_email(self, recipients: List[WishlistRecipient], product: Dict[str, Any]) -> None:
+        self._enqueue(WishlistEvent(WishlistEventType.OUT_OF_STOCK, product), recipients)
+
+    def send_discount_email(
+        self,
+        recipients: List[WishlistRecipient],
+        product: Dict[str, Any],
+        discount_active: bool,
+        discount_rate: float,
+    ) -> None:
+        self._enqueue(
+            WishlistEvent(WishlistEventType.DISCOUNT_CHANGED, product, discount_active, discount_rate),
+            recipients,
+        )
+
+
+def flush_due_digests() -> int:
+    """Send every digest whose window has elapsed, using a fresh session."""
+    settings = get_settings()
+    db = SessionLocal()
+    try:
+        return notification_use_cases.flush_wishlist_digests(
+            db,
+            EmailWishlistNotifier(),
+            window_seconds=settings.WISHLIST_DIGEST_WINDOW_SECONDS,
+            max_attempts=settings.WISHLIST_DIGEST_MAX_ATTEMPTS,
+            backoff_base_seconds=settings.WISHLIST_DIGEST_BACKOFF_SECONDS,
+        )
+    finally:
+        db.close()
+
+
+def _collect_due_digests() -> List[WishlistDigest]:
+    db = SessionLocal()
+    try:
+        return notification_use_cases.collect_due_digests(
+            db, window_seconds=get_settings().WISHLIST_DIGEST_WINDOW_SECONDS
+        )
+    finally:
+        db.close()
+
+
+def _record_digests(sent: List[WishlistDigest], failed: List[WishlistDigest]) -> None:
+    settings = get_settings()
+    db = SessionLocal()
+    try:
+        for digest in sent:
+            notification_use_cases.complete_digest(db, digest)
+        for digest in failed:
+            notification_use_cases.fail_digest(
+                db,
+                digest,
+                max_attempts=settings.WISHLIST_DIGEST_MAX_ATTEMPTS,
+                backoff_base_seconds=settings.WISHLIST_DIGEST_BACKOFF_SECONDS,
+            )
+    finally:
+        db.close()
+
+
+async def flush_due_digests_async(transport: AsyncSMTPTransport) -> int:
+    """
+    Send due digests concurrently on the event loop.
+
+    Only the database reads and deletes go through the threadpool; SMTP
+    round-trips are awaited, bounded by the transport's concurrency limit.
+    """
+    digests = await run_in_threadpool(_collect_due_digests)
+    if not digests:
+        return 0
+
+    notifier = EmailWishlistNotifier()
+    results = await asyncio.gather(
+        *(transport.send(notifier.build_digest_message(digest)) for digest in digests),
+        return_exceptions=True,
+    )
+    sent, failed = [], []
+    for digest, result in zip(digests, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to send wishlist digest to user {digest.user_id}: {result}")
+            failed.append(digest)
+        else:
+            sent.append(digest)
+    await run_in_threadpool(_record_digests, sent, failed)
+
+    logger.info(f"Wishlist digests: sent {len(sent)}/{len(digests)}")
+    return len(sent)
+
+
+async def run_digest_flusher(interval_seconds: int) -> None:
+    """Periodically flush wishlist digests until cancelled."""
+    transport = get_async_email_transport()
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            if transport:
+                await flush_due_digests_async(transport)
+            else:
+                await run_in_threadpool(flush_due_digests)
+        except Exception as exc:  # noqa: BLE001
+            logger.error(f"Wishlist digest flush failed: {exc}")
@@ -1,104 +1,98 @@
 import logging
-import smtplib
 from email.message import EmailMessage
 from typing import List, Dict, Any
 
-from sqlalchemy.orm import Session
-
 from app.core.config import get_settings
+from app.domains.notifications.digest import WishlistDigest
 from app.domains.notifications.notifier import WishlistNotifier
-from app.infrastructure.database.sqlite.models.user import UserModel
+from app.domains.wishlist.repository import WishlistRecipient
+from app.infrastructure.notifications.async_smtp import get_async_email_transport
+from app.infrastructure.notifications.email_templates import RenderedEmail, get_email_templates
+from app.infrastructure.notifications.smtp_pool import get_smtp_pool
 
 logger = logging.getLogger(__name__)
 
+# Recipients only appear in the SMTP envelope, never in the headers
+UNDISCLOSED_RECIPIENTS = "undisclosed-recipients:;"
+
 
 class EmailWishlistNotifier(WishlistNotifier):
-    """SMTP-backed notifier for wishlist events."""
+    """
+    SMTP-backed notifier for wishlist events.
+
+    The app buffers events with ``DigestWishlistNotifier`` and uses this class
+    to send the resulting digests. Direct sends go out as one message with the
+    recipients only in the envelope, so subscribers never see each other.
+    """
 
-    def __init__(self, db: Session):
-        self.db = db
+    def __init__(self):
         self.settings = get_settings()
 
-    def _get_emails(self, user_ids: List[str]) -> List[str]:
-        if not user_ids:
-            return []
-        rows = (
-            self.db.query(UserModel.email)
-            .filter(UserModel.id.in_(user_ids))
-            .all()
-        )
-        emails = [row[0] for row in rows if row and row[0]]
-        # De-duplicate
-        return list({e for e in emails})
+    @staticmethod
+    def _get_emails(recipients: List[WishlistRecipient]) -> List[str]:
+        # De-duplicate while keeping order
+        return list(dict.fromkeys(r.email for r in recipients if r.email))
 
-    def _send(self, to_addresses: List[str], subject: str, body: str) -> None:
+    def _build_message(self, to_addresses: List[str], rendered: RenderedEmail) -> EmailMessage:
+        msg = EmailMessage()
+        msg["Subject"] = rendered.subject
+        msg["From"] = self.settings.EMAIL_FROM
+        msg["To"] = ", ".join(to_addresses)
+        msg.set_content(rendered.text)
+        msg.add_alternative(rendered.html, subtype="html")
+        return msg
+
+    def _send(self, to_addresses: List[str], rendered: RenderedEmail) -> None:
         if not to_addresses:
             return
-        if not self.settings.SMTP_HOST or not self.settings.SMTP_USERNAME or not self.settings.SMTP_PASSWORD:
+        if not self.settings.smtp_configured:
             logger.warning("SMTP not configured; skipping email send.")
             return
 
-        msg = EmailMessage()
-        msg["Subject"] = subject
-        msg["From"] = self.settings.EMAIL_FROM
-        msg["To"] = ", ".join(to_addresses)
-        msg.set_content(body)
-
+        msg = self._build_message([UNDISCLOSED_RECIPIENTS], rendered)
+        transport = get_async_email_transport()
+        if transport and transport.bound:
+            # Hand off to the event loop instead of holding this worker thread on SMTP
+            transport.submit(msg, recipients=to_addresses)
+            return
         try:
-            with smtplib.SMTP(self.settings.SMTP_HOST, self.settings.SMTP_PORT, timeout=10) as smtp:
-                if self.settings.SMTP_STARTTLS:
-                    smtp.starttls()
-                smtp.login(self.settings.SMTP_USERNAME, self.settings.SMTP_PASSWORD)
-                smtp.send_message(msg)
+            get_smtp_pool().send(msg, to_addrs=to_addresses)
         except Exception as exc:
             logger.error("Failed to send wishlist email: %s", exc)
 
-    def send_stock_email(self, user_ids: List[str], product: Dict[str, Any]) -> None:
-        emails = self._get_emails(user_ids)
-        subject = f"Good news: {product.get('name', 'Product')} is back!"
-        body = (
-            "Heads up, wishlist friend!\n"
-            "----------------------------------------\n"
-            f"{product.get('name')} just came back in stock.\n"
-            f"Price: ${product.get('final_price', product.get('price', 0))}\n"
-            f"Stock: {product.get('stock', 'Available')} ready to ship.\n"
-            "Move fast before it disappears again.\n"
-            "----------------------------------------\n"
-            "Open your wishlist to grab it now."
-        )
-        self._send(emails, subject, body)
-
-    def send_out_of_stock_email(self, user_ids: List[str], product: Dict[str, Any]) -> None:
-        emails = self._get_emails(user_ids)
-        subject = f"Sold out: {product.get('name', 'Product')} just ran out"
-        body = (
-            "Quick update from your wishlist:\n"
-            "----------------------------------------\n"
-            f"{product.get('name')} just went out of stock.\n"
-            "We will ping you when it returns, so you can be first in line.\n"
-            "----------------------------------------\n"
-            "Keep an eye on your wishlist for a restock alert."
-        )
-        self._send(emails, subject, body)
+    def send_stock_email(self, recipients: List[WishlistRecipient], product: Dict[str, Any]) -> None:
+        rendered = get_email_templates().render_product_email("wishlist_back_in_stock", product)
+        self._send(self._get_emails(recipients), rendered)
+
+    def send_out_of_stock_email(self, recipients: List[WishlistRecipient], product: Dict[str, Any]) -> None:
+        rendered = get_email_templates().render_product_email("wishlist_out_of_stock", product)
+        self._send(self._get_emails(recipients), rendered)
 
     def send_discount_email(
         self,
-        user_ids: List[str],
+        recipients: List[WishlistRecipient],
         product: Dict[str, Any],
         discount_active: bool,
         discount_rate: float,
     ) -> None:
-        emails = self._get_emails(user_ids)
-        status_label = "Discount active" if discount_active else "Discount ended"
-        subject = f"{status_label}: {product.get('name', 'Product')}"
-        price_line = f"Deal price: ${product.get('final_price', product.get('price', 0))}"
-        body = (
-            "Wishlist deal update:\n"
-            "----------------------------------------\n"
-            f"{product.get('name')} now has a {discount_rate}% change.\n"
-            f"{price_line}\n"
-            f"Status: {'Live discount' if discount_active else 'Discount ended'}\n"
-            "----------------------------------------\n"
-            "Peek at your wishlist to see the latest price."
+        rendered = get_email_templates().render_product_email(
+            "wishlist_discount",
+            product,
+            discount_active=discount_active,
+            discount_rate=discount_rate,
         )
-        self._send(emails, subject, body)
+        self._send(self._get_emails(recipients), rendered)
+
+    def send_digest_email(self, digest: WishlistDigest) -> bool:
+        if not self.settings.smtp_configured:
+            logger.warning("SMTP not configured; skipping email send.")
+            return False
+        try:
+            get_smtp_pool().send(self.build_digest_message(digest))
+        except Exception as exc:
+            logger.error("Failed to send wishlist digest: %s", exc)
+            return False
+        return True
+
+    def build_digest_message(self, digest: WishlistDigest) -> EmailMessage:
+        return self._build_message([digest.email], get_email_templates().render_digest(digest.items))
@@ -1,7 +1,7 @@
-import smtplib
 from email.message import EmailMessage
 from app.core.config import get_settings
 from app.core.logging import logger
+from app.infrastructure.notifications.smtp_pool import get_smtp_pool
 
 def send_email_with_attachment(
     to_email: str,
@@ -27,18 +27,7 @@ def send_email_with_attachment(
     msg.add_attachment(attachment_bytes, maintype=maintype, subtype=subtype, filename=filename)
 
     try:
-        if settings.SMTP_STARTTLS:
-            with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as smtp:
-                smtp.ehlo()
-                smtp.starttls()
-                if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
-                    smtp.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-                smtp.send_message(msg)
-        else:
-            with smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT) as smtp:
-                if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
-                    smtp.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-                smtp.send_message(msg)
+        get_smtp_pool().send(msg)
         logger.info(f"Sent order invoice email to {to_email}")
     except Exception as e:
         logger.error(f"Failed to send invoice email to {to_email}: {e}")
@@ -0,0 +1,157 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Hashable, Tuple
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template, select_autoescape
+from markupsafe import Markup
+
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+
+# Subject lines are short enough to live here rather than in their own files
+SUBJECTS: Dict[str, str] = {
+    "wishlist_back_in_stock": "Good news: {{ product.name or 'Product' }} is back!",
+    "wishlist_out_of_stock": "Sold out: {{ product.name or 'Product' }} just ran out",
+    "wishlist_discount": "Price {{ price_change(discount_active, discount_rate) }}: {{ product.name or 'Product' }}",
+    "wishlist_digest": "Your wishlist: {{ count }} update{{ '' if count == 1 else 's' }}",
+    "order_invoice": "Your invoice #{{ order_id }}",
+    "refund_decision": "Refund {{ status_line }} for order #{{ order_id }}",
+}
+
+# Product fields that can change what a product fragment renders
+_PRODUCT_KEY_FIELDS = ("id", "name", "price", "final_price", "stock", "image")
+
+
+def _product_context(product: Dict[str, Any]) -> Dict[str, Any]:
+    # Templates see a fixed set of fields so missing keys render as None
+    return {field: product.get(field) for field in _PRODUCT_KEY_FIELDS}
+
+
+def price_change(discount_active: bool, discount_rate: float) -> str:
+    """Describe a discount change as the price move: "dropped by 20%" or "rose by 25%"."""
+    rate = float(discount_rate or 0)
+    if discount_active:
+        return f"dropped by {rate:g}%"
+    if 0 < rate < 100:
+        # Ending a 20% discount takes the price back up by 25%
+        return f"rose by {round(rate / (100 - rate) * 100, 1):g}%"
+    return "rose back to full price"
+
+
+@dataclass(frozen=True)
+class RenderedEmail:
+    subject: str
+    text: str
+    html: str
+
+
+class EmailTemplateRegistry:
+    """
+    Compiled email templates with text and HTML parts.
+
+    Every template is compiled once when the registry is created. Product
+    fragments (the product card, a digest line) are rendered once per distinct
+    product state and served from a bounded LRU cache afterwards, so a fan-out
+    or a batch of digests naming the same products does not re-render them.
+    """
+
+    def __init__(self, directory: Path = TEMPLATE_DIR, fragment_cache_size: int = 4096):
+        self.env = Environment(
+            loader=FileSystemLoader(str(directory)),
+            autoescape=select_autoescape(enabled_extensions=("html.j2",), default_for_string=False),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            keep_trailing_newline=True,
+            undefined=StrictUndefined,
+        )
+        self.env.globals["price_change"] = price_change
+        self._templates: Dict[str, Tuple[Template, Template, Template]] = {
+            name: (
+                self.env.from_string(subject),
+                self.env.get_template(f"{name}.txt.j2"),
+                self.env.get_template(f"{name}.html.j2"),
+            )
+            for name, subject in SUBJECTS.items()
+        }
+        self._fragments: Dict[str, Tuple[Template, Template]] = {
+            name: (self.env.get_template(f"_{name}.txt.j2"), self.env.get_template(f"_{name}.html.j2"))
+            for name in ("product", "digest_item")
+        }
+        self._fragment_cache: "OrderedDict[Hashable, Tuple[str, Markup]]" = OrderedDict()
+        self._fragment_cache_size = fragment_cache_size
+        self._lock = threading.Lock()
+        self.fragment_hits = 0
+        self.fragment_misses = 0
+
+    def render(self, name: str, **context: Any) -> RenderedEmail:
+        subject, text, html = self._templates[name]
+        return RenderedEmail(
+            subject=subject.render(**context).strip(),
+            text=text.render(**context),
+            html=html.render(**context),
+        )
+
+    def fragment(self, name: str, product: Dict[str, Any], **context: Any) -> Tuple[str, Markup]:
+        """Render (text, html) for a product fragment, cached per product state and context."""
+        key = (
+            name,
+            tuple(product.get(field) for field in _PRODUCT_KEY_FIELDS),
+            tuple(sorted(context.items())),
+        )
+        with self._lock:
+            cached = self._fragment_cache.get(key)
+            if cached is not None:
+                self._fragment_cache.move_to_end(key)
+                self.fragment_hits += 1
+                return cached
+
+        text_template, html_template = self._fragments[name]
+        product_context = _product_context(product)
+        rendered = (
+            text_template.render(product=product_context, **context),
+            Markup(html_template.render(product=product_context, **context)),
+        )
+        with self._lock:
+            self.fragment_misses += 1
+            self._fragment_cache[key] = rendered
+            if len(self._fragment_cache) > self._fragment_cache_size:
+                self._fragment_cache.popitem(last=False)
+        return rendered
+
+    def render_product_email(self, name: str, product: Dict[str, Any], **context: Any) -> RenderedEmail:
+        """Render a single-product email, embedding the cached product card."""
+        text_block, html_block = self.fragment("product", product)
+        subject, text, html = self._templates[name]
+        product = _product_context(product)
+        return RenderedEmail(
+            subject=subject.render(product=product, **context).strip(),
+            text=text.render(product=product, product_block=text_block, **context),
+            html=html.render(product=product, product_block=html_block, **context),
+        )
+
+    def render_digest(self, items) -> RenderedEmail:
+        """Render a wishlist digest from ``WishlistDigestItem`` entries using cached item lines."""
+        parts = [
+            self.fragment(
+                "digest_item",
+                item.product,
+                event_type=item.event_type.value,
+                discount_active=item.discount_active,
+                discount_rate=item.discount_rate,
+            )
+            for item in items
+        ]
+        subject, text, html = self._templates["wishlist_digest"]
+        return RenderedEmail(
+            subject=subject.render(count=len(parts)).strip(),
+            text=text.render(lines=[p[0] for p in parts]),
+            html=html.render(lines=[p[1] for p in parts]),
+        )
+
+
+@lru_cache
+def get_email_templates() -> EmailTemplateRegistry:
+    """Process-wide registry; created at startup so templates are compiled before the first email."""
+    return EmailTemplateRegistry()
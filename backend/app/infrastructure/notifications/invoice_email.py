@@ -1,93 +1,63 @@
 from email.message import EmailMessage
-import smtplib
 
+from app.domains.notifications.outbox import OutboxEmail
 from app.domains.order.entity import Order
 from app.infrastructure.pdf.invoice import generate_invoice_pdf
-from app.infrastructure.notifications.email_service import send_email_with_attachment
+from app.infrastructure.notifications.email_templates import RenderedEmail, get_email_templates
 from app.core.config import get_settings
-from app.core.logging import logger
-
-def send_order_invoice_email(order: Order, to_email: str, customer_name: str | None = None) -> None:
-    pdf_bytes = generate_invoice_pdf(order, customer_name=customer_name)
-    subject = f"Your invoice #{order.id}"
-    body = "Thank you for your purchase. Your invoice is attached."
-    filename = f"invoice-{order.id}.pdf"
-    send_email_with_attachment(to_email, subject, body, pdf_bytes, filename)
 
+# Outbox templates rendered by the outbox worker
+ORDER_INVOICE_TEMPLATE = "order_invoice"
+REFUND_DECISION_TEMPLATE = "refund_decision"
 
-def send_refund_notification_email(order: Order, to_email: str, refund_amount: float, customer_name: str | None = None) -> None:
-    """
-    Send a simple refund notification email (no attachment).
-    """
-    settings = get_settings()
-    if not settings.SMTP_HOST:
-        logger.warning("SMTP not configured; skipping refund notification email send")
-        return
 
-    msg = EmailMessage()
-    msg["Subject"] = f"Refund approved for order #{order.id}"
-    msg["From"] = settings.EMAIL_FROM
-    msg["To"] = to_email
-    name = customer_name or "Customer"
-    msg.set_content(
-        f"Hello {name},\n\n"
-        f"Your refund request for order #{order.id} has been approved.\n"
-        f"Refunded amount: ${refund_amount:.2f}\n"
-        "The amount will be returned to your original payment method.\n\n"
-        "Thank you."
+def order_invoice_outbox_email(to_email: str, customer_name: str | None = None) -> OutboxEmail:
+    """Outbox entry for an order invoice; the order id is set when it is queued with the order."""
+    return OutboxEmail(
+        template=ORDER_INVOICE_TEMPLATE,
+        to_address=to_email,
+        context={"customer_name": customer_name},
     )
 
-    try:
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=10) as smtp:
-            if settings.SMTP_STARTTLS:
-                smtp.starttls()
-            if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
-                smtp.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-            smtp.send_message(msg)
-        logger.info(f"Sent refund notification email to {to_email}")
-    except Exception as exc:
-        logger.error(f"Failed to send refund notification email to {to_email}: {exc}")
 
+def refund_decision_outbox_email(to_email: str, approved: bool, notes: str | None = None, customer_name: str | None = None) -> OutboxEmail:
+    """Outbox entry for a refund decision; the refunded amount is read from the order at send time."""
+    return OutboxEmail(
+        template=REFUND_DECISION_TEMPLATE,
+        to_address=to_email,
+        context={"approved": approved, "notes": notes, "customer_name": customer_name},
+    )
 
-def send_refund_decision_email(order: Order, to_email: str, approved: bool, refund_amount: float | None = None, notes: str | None = None, customer_name: str | None = None) -> None:
-    """
-    Send refund decision email (approved or rejected).
-    """
-    settings = get_settings()
-    if not settings.SMTP_HOST:
-        logger.warning("SMTP not configured; skipping refund decision email send")
-        return
 
+def _templated_message(rendered: RenderedEmail, to_email: str) -> EmailMessage:
     msg = EmailMessage()
-    status_line = "approved" if approved else "rejected"
-    subject = f"Refund {status_line} for order #{order.id}" if approved else f"Refund {status_line} for order #{order.id}"
-    msg["Subject"] = subject
-    msg["From"] = settings.EMAIL_FROM
+    msg["Subject"] = rendered.subject
+    msg["From"] = get_settings().EMAIL_FROM
     msg["To"] = to_email
-    name = customer_name or "Customer"
+    msg.set_content(rendered.text)
+    msg.add_alternative(rendered.html, subtype="html")
+    return msg
 
-    body_lines = [
-        f"Hello {name},",
-        "",
-        f"Your refund request for order #{order.id} has been {status_line}.",
-    ]
-    if approved and refund_amount is not None:
-        body_lines.append(f"Refunded amount: ${refund_amount:.2f}")
-    if notes:
-        body_lines.append(f"Notes: {notes}")
-    if approved:
-        body_lines.append("The amount will be returned to your original payment method.")
-    body_lines.append("")
-    body_lines.append("Thank you.")
-    msg.set_content("\n".join(body_lines))
 
-    try:
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=10) as smtp:
-            if settings.SMTP_STARTTLS:
-                smtp.starttls()
-            if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
-                smtp.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-            smtp.send_message(msg)
-        logger.info(f"Sent refund decision email to {to_email}")
-    except Exception as exc:
-        logger.error(f"Failed to send refund decision email to {to_email}: {exc}")
+def build_order_invoice_message(order: Order, to_email: str, customer_name: str | None = None) -> EmailMessage:
+    rendered = get_email_templates().render(
+        ORDER_INVOICE_TEMPLATE, order_id=order.id, customer_name=customer_name
+    )
+    msg = _templated_message(rendered, to_email)
+    pdf_bytes = generate_invoice_pdf(order, customer_name=customer_name)
+    msg.add_attachment(pdf_bytes, maintype="application", subtype="pdf", filename=f"invoice-{order.id}.pdf")
+    return msg
+
+
+def build_refund_decision_message(order: Order, to_email: str, approved: bool, refund_amount: float | None = None, notes: str | None = None, customer_name: str | None = None) -> EmailMessage:
+    rendered = get_email_templates().render(
+        REFUND_DECISION_TEMPLATE,
+        order_id=order.id,
+        status_line="approved" if approved else "rejected",
+        approved=approved,
+        refund_amount=refund_amount,
+        notes=notes,
+        customer_name=customer_name,
+    )
+    return _templated_message(rendered, to_email)
+
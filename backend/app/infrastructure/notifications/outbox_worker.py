@@ -0,0 +1,158 @@
+import asyncio
+from email.message import EmailMessage
+from typing import Callable, Dict, List, Optional, Union
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.logging import logger
+from app.domains.notifications import use_cases as notification_use_cases
+from app.domains.notifications.outbox import OutboxDrainReport, OutboxEmail
+from app.domains.order.repository import OrderRepository
+from app.infrastructure.database.sqlite.session import SessionLocal
+from app.infrastructure.notifications.invoice_email import (
+    ORDER_INVOICE_TEMPLATE,
+    REFUND_DECISION_TEMPLATE,
+    build_order_invoice_message,
+    build_refund_decision_message,
+)
+from app.infrastructure.notifications.async_smtp import AsyncSMTPTransport, get_async_email_transport
+from app.infrastructure.notifications.smtp_pool import get_smtp_pool
+
+
+def _render_order_invoice(db: Session, email: OutboxEmail) -> EmailMessage:
+    order = OrderRepository(db).get_by_id(email.order_id)
+    if not order:
+        raise ValueError(f"Order {email.order_id} not found")
+    return build_order_invoice_message(order, email.to_address, email.context.get("customer_name"))
+
+
+def _render_refund_decision(db: Session, email: OutboxEmail) -> EmailMessage:
+    order = OrderRepository(db).get_by_id(email.order_id)
+    if not order:
+        raise ValueError(f"Order {email.order_id} not found")
+    approved = bool(email.context.get("approved"))
+    return build_refund_decision_message(
+        order,
+        email.to_address,
+        approved,
+        order.refund_amount if approved else None,
+        email.context.get("notes"),
+        email.context.get("customer_name"),
+    )
+
+
+RENDERERS: Dict[str, Callable[[Session, OutboxEmail], EmailMessage]] = {
+    ORDER_INVOICE_TEMPLATE: _render_order_invoice,
+    REFUND_DECISION_TEMPLATE: _render_refund_decision,
+}
+
+
+def render_outbox_email(db: Session, email: OutboxEmail) -> EmailMessage:
+    renderer = RENDERERS.get(email.template)
+    if renderer is None:
+        raise ValueError(f"Unknown email template '{email.template}'")
+    return renderer(db, email)
+
+
+def drain_outbox_once(session_factory: Callable[[], Session] = SessionLocal) -> OutboxDrainReport:
+    """Render and send one batch of due outbox emails over the shared SMTP pool."""
+    settings = get_settings()
+    pool = get_smtp_pool()
+    db = session_factory()
+    try:
+        return notification_use_cases.drain_email_outbox(
+            db,
+            lambda email: pool.send(render_outbox_email(db, email)),
+            batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+            backoff_base_seconds=settings.EMAIL_OUTBOX_BACKOFF_SECONDS,
+        )
+    finally:
+        db.close()
+
+
+def _claim_batch(batch_size: int) -> List[OutboxEmail]:
+    db = SessionLocal()
+    try:
+        return notification_use_cases.claim_outbox_batch(db, batch_size)
+    finally:
+        db.close()
+
+
+def _render_batch(emails: List[OutboxEmail]) -> List[Union[EmailMessage, Exception]]:
+    db = SessionLocal()
+    try:
+        rendered: List[Union[EmailMessage, Exception]] = []
+        for email in emails:
+            try:
+                rendered.append(render_outbox_email(db, email))
+            except Exception as exc:  # noqa: BLE001
+                rendered.append(exc)
+        return rendered
+    finally:
+        db.close()
+
+
+def _record_batch(emails: List[OutboxEmail], results: List[Optional[BaseException]]) -> OutboxDrainReport:
+    settings = get_settings()
+    report = OutboxDrainReport()
+    db = SessionLocal()
+    try:
+        for email, error in zip(emails, results):
+            notification_use_cases.record_outbox_result(
+                db,
+                email,
+                report,
+                error,
+                max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+                backoff_base_seconds=settings.EMAIL_OUTBOX_BACKOFF_SECONDS,
+            )
+    finally:
+        db.close()
+    notification_use_cases.log_outbox_report(report)
+    return report
+
+
+async def drain_outbox_async(transport: AsyncSMTPTransport) -> OutboxDrainReport:
+    """
+    Send one batch of due outbox emails concurrently on the event loop.
+
+    Claiming, rendering (invoice PDFs) and recording results are short calls
+    in the threadpool; the SMTP round-trips are awaited on the transport.
+    """
+    emails = await run_in_threadpool(_claim_batch, get_settings().EMAIL_OUTBOX_BATCH_SIZE)
+    if not emails:
+        return OutboxDrainReport()
+
+    rendered = await run_in_threadpool(_render_batch, emails)
+
+    async def _send(message: Union[EmailMessage, Exception]) -> Optional[BaseException]:
+        if isinstance(message, Exception):
+            return message
+        try:
+            await transport.send(message)
+        except Exception as exc:  # noqa: BLE001
+            return exc
+        return None
+
+    results = await asyncio.gather(*(_send(message) for message in rendered))
+    return await run_in_threadpool(_record_batch, emails, list(results))
+
+
+async def run_outbox_worker(interval_seconds: int) -> None:
+    """Drain the outbox until cancelled; full batches are followed immediately by the next one."""
+    batch_size = get_settings().EMAIL_OUTBOX_BATCH_SIZE
+    transport = get_async_email_transport()
+    while True:
+        try:
+            if transport:
+                report = await drain_outbox_async(transport)
+            else:
+                report = await run_in_threadpool(drain_outbox_once)
+        except Exception as exc:  # noqa: BLE001
+            logger.error(f"Email outbox drain failed: {exc}")
+            report = None
+        if report is None or report.claimed < batch_size:
+            await asyncio.sleep(interval_seconds)
@@ -0,0 +1,193 @@
+import queue
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.core.logging import logger
+
+# 421: the server is closing the channel, so the connection must be replaced
+_SERVICE_CLOSING = 421
+
+
+class _PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+
+    def close(self) -> None:
+        try:
+            self.smtp.quit()
+        except Exception:  # noqa: BLE001
+            try:
+                self.smtp.close()
+            except Exception:  # noqa: BLE001
+                pass
+
+
+class SMTPConnectionPool:
+    """
+    Small pool of long-lived, authenticated SMTP connections.
+
+    Connections are opened lazily up to ``size`` and reused across sends, so
+    the TLS handshake and login happen once per connection instead of once
+    per message. A connection idle for longer than ``keepalive_seconds`` is
+    probed with NOOP before reuse; dead connections are replaced, and a send
+    that fails on a broken connection is retried once on a fresh one.
+
+    With ``starttls`` the connection is upgraded with STARTTLS (port 587);
+    without it implicit TLS (SMTP_SSL, port 465) is used, so credentials never
+    travel in plaintext. ``use_ssl=False`` together with ``starttls=False``
+    gives a plain connection, for local test servers only.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        use_ssl: Optional[bool] = None,
+        size: int = 2,
+        timeout: float = 10,
+        keepalive_seconds: float = 60,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.use_ssl = not starttls if use_ssl is None else use_ssl
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.keepalive_seconds = keepalive_seconds
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open = 0
+        self.connects = 0
+        self.sent = 0
+
+    def _connect(self) -> _PooledConnection:
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            smtp.ehlo()
+            if self.starttls:
+                smtp.starttls()
+                smtp.ehlo()
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        self.connects += 1
+        return _PooledConnection(smtp)
+
+    def _is_alive(self, conn: _PooledConnection) -> bool:
+        try:
+            return conn.smtp.noop()[0] == 250
+        except Exception:  # noqa: BLE001
+            return False
+
+    def _acquire(self, fresh: bool = False) -> _PooledConnection:
+        while not fresh:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if time.monotonic() - conn.last_used < self.keepalive_seconds or self._is_alive(conn):
+                return conn
+            self._discard(conn)
+
+        with self._lock:
+            can_open = self._open < self.size
+            if can_open:
+                self._open += 1
+        if can_open:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._open -= 1
+                raise
+
+        # Pool exhausted: wait for a connection to come back
+        conn = self._idle.get(timeout=self.timeout)
+        if time.monotonic() - conn.last_used < self.keepalive_seconds or self._is_alive(conn):
+            return conn
+        self._discard(conn)
+        return self._acquire()
+
+    def _release(self, conn: _PooledConnection) -> None:
+        conn.last_used = time.monotonic()
+        self._idle.put(conn)
+
+    def _discard(self, conn: _PooledConnection) -> None:
+        conn.close()
+        with self._lock:
+            self._open -= 1
+
+    def send(self, msg: EmailMessage, to_addrs: Optional[List[str]] = None) -> Dict[str, Tuple[int, bytes]]:
+        """
+        Send a message over a pooled connection.
+
+        ``to_addrs`` overrides the envelope recipients taken from the headers.
+        Returns the recipients the server refused when others were accepted;
+        raises if the message was not accepted for anyone.
+        """
+        for attempt in (1, 2):
+            # Retry on a new connection: other idle ones may have dropped too
+            conn = self._acquire(fresh=attempt == 2)
+            try:
+                refused = conn.smtp.send_message(msg, to_addrs=to_addrs)
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as exc:
+                if getattr(exc, "smtp_code", None) != _SERVICE_CLOSING:
+                    # Message rejected; the connection itself is still usable
+                    self._release(conn)
+                    raise
+                self._discard(conn)
+                if attempt == 2:
+                    raise
+                logger.warning(f"SMTP server closed the connection ({exc}); reconnecting")
+                continue
+            except OSError as exc:
+                # Covers SMTPServerDisconnected and socket errors
+                self._discard(conn)
+                if attempt == 2:
+                    raise
+                logger.warning(f"SMTP connection lost ({exc}); reconnecting")
+                continue
+            except Exception:
+                self._release(conn)
+                raise
+            self._release(conn)
+            self.sent += 1
+            return refused
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+
+@lru_cache
+def get_smtp_pool() -> Optional[SMTPConnectionPool]:
+    """Process-wide SMTP pool, or None when SMTP is not configured."""
+    settings = get_settings()
+    if not settings.SMTP_HOST:
+        return None
+    return SMTPConnectionPool(
+        host=settings.SMTP_HOST,
+        port=settings.SMTP_PORT,
+        username=settings.SMTP_USERNAME,
+        password=settings.SMTP_PASSWORD,
+        starttls=settings.SMTP_STARTTLS,
+        size=settings.SMTP_POOL_SIZE,
+        keepalive_seconds=settings.SMTP_KEEPALIVE_SECONDS,
+    )
@@ -0,0 +1,163 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.logging import logger
+from app.infrastructure.database.sqlite.models.support import SupportBroadcastModel
+from app.infrastructure.database.sqlite.session import SessionLocal
+
+# Delivers one message to the sockets this process holds for a channel
+Deliver = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+class BroadcastBackend:
+    """
+    Fan-out of socket events to every app process.
+
+    ``publish`` hands a message to the backend; the backend calls the
+    ``deliver`` callback given to ``start`` in each process that should see it
+    (including the publishing one).
+    """
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+
+class InMemoryBroadcast(BroadcastBackend):
+    """Single-process backend: messages go straight to this process's sockets."""
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        if self._deliver is not None:
+            await self._deliver(channel, message)
+
+
+class SQLiteBroadcast(BroadcastBackend):
+    """
+    Multi-process backend relaying events through the ``support_broadcasts`` table.
+
+    A published message is delivered to local sockets right away and written
+    to the table; every other process polls for rows newer than the last one it
+    saw and delivers those. Rows are tagged with the publishing process so it
+    does not deliver its own messages twice, and are pruned once older than
+    ``retention_seconds``. Suited to several workers sharing one SQLite file;
+    delivery to other processes lags by up to ``poll_seconds``.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        poll_seconds: float = 0.1,
+        retention_seconds: int = 60,
+        batch_size: int = 500,
+    ):
+        super().__init__()
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds
+        self.retention_seconds = retention_seconds
+        self.batch_size = batch_size
+        self.origin = str(uuid.uuid4())
+        self._last_id = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        await super().start(deliver)
+        # Only relay what is published from now on
+        self._last_id = await run_in_threadpool(self._max_id)
+        self._task = asyncio.create_task(self._poll_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        await run_in_threadpool(self._insert, channel, message)
+        if self._deliver is not None:
+            await self._deliver(channel, message)
+
+    def _max_id(self) -> int:
+        with self.session_factory() as db:
+            return db.execute(select(func.max(SupportBroadcastModel.id))).scalar() or 0
+
+    def _insert(self, channel: str, message: Dict[str, Any]) -> None:
+        with self.session_factory() as db:
+            db.execute(
+                insert(SupportBroadcastModel).values(channel=channel, origin=self.origin, payload=message)
+            )
+            db.commit()
+
+    def _fetch(self, after_id: int) -> List[Tuple[int, str, str, Dict[str, Any]]]:
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(
+                    SupportBroadcastModel.id,
+                    SupportBroadcastModel.channel,
+                    SupportBroadcastModel.origin,
+                    SupportBroadcastModel.payload,
+                )
+                .where(SupportBroadcastModel.id > after_id)
+                .order_by(SupportBroadcastModel.id)
+                .limit(self.batch_size)
+            ).all()
+            return [tuple(row) for row in rows]
+
+    def _prune(self) -> None:
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention_seconds)
+        with self.session_factory() as db:
+            db.execute(delete(SupportBroadcastModel).where(SupportBroadcastModel.created_at < cutoff))
+            db.commit()
+
+    async def poll_once(self) -> int:
+        """Deliver rows published by other processes since the last poll. Returns rows delivered."""
+        rows = await run_in_threadpool(self._fetch, self._last_id)
+        delivered = 0
+        for row_id, channel, origin, payload in rows:
+            self._last_id = row_id
+            if origin == self.origin or self._deliver is None:
+                continue
+            await self._deliver(channel, payload)
+            delivered += 1
+        return delivered
+
+    async def _poll_forever(self) -> None:
+        polls = 0
+        prune_every = max(1, int(self.retention_seconds / max(self.poll_seconds, 0.01)))
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await self.poll_once()
+                polls += 1
+                if polls % prune_every == 0:
+                    await run_in_threadpool(self._prune)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.error(f"Support broadcast poll failed: {exc}")
+
+
+def get_broadcast_backend() -> BroadcastBackend:
+    """Backend selected by ``SUPPORT_BROADCAST_BACKEND`` ("memory" or "sqlite")."""
+    settings = get_settings()
+    if settings.SUPPORT_BROADCAST_BACKEND == "sqlite":
+        return SQLiteBroadcast(
+            poll_seconds=settings.SUPPORT_BROADCAST_POLL_SECONDS,
+            retention_seconds=settings.SUPPORT_BROADCAST_RETENTION_SECONDS,
+        )
+    if settings.SUPPORT_BROADCAST_BACKEND != "memory":
+        logger.warning(f"Unknown SUPPORT_BROADCAST_BACKEND {settings.SUPPORT_BROADCAST_BACKEND!r}; using memory")
+    return InMemoryBroadcast()
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import WebSocket
+
+from app.core.logging import logger
+
+
+class QueuedSocketSender:
+    """
+    Bounded outbound queue with its own writer task for one websocket.
+
+    ``offer`` never waits: it queues the message or returns False when the
+    queue is full, leaving the caller to decide what to do with a client that
+    cannot keep up. The writer sends queued messages in order and calls
+    ``on_failed`` if a send raises. Sends are awaited directly rather than
+    under ``wait_for`` so an unblocked writer drains its whole queue in one
+    turn; a send stuck past ``send_timeout`` is reported by ``stalled``.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue: int = 100,
+        send_timeout: float = 10,
+        on_failed: Optional[Callable[["QueuedSocketSender", str], None]] = None,
+    ):
+        self.websocket = websocket
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max(1, max_queue))
+        self.send_timeout = send_timeout
+        self.on_failed = on_failed
+        self.sent = 0
+        self.closed = False
+        self._sending_since: Optional[float] = None
+        self._task = asyncio.create_task(self._run())
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    def offer(self, message: Dict[str, Any]) -> bool:
+        """Queue a message without waiting. Returns False if the queue is full or closed."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def close(self) -> None:
+        """Stop the writer; queued messages are dropped."""
+        self.closed = True
+        if not self._task.done():
+            self._task.cancel()
+
+    @property
+    def stalled(self) -> bool:
+        """True while a single send has been blocked for longer than ``send_timeout``."""
+        return self._sending_since is not None and time.monotonic() - self._sending_since > self.send_timeout
+
+    async def _run(self) -> None:
+        while True:
+            message = await self.queue.get()
+            self._sending_since = time.monotonic()
+            try:
+                await self.websocket.send_json(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                self._fail(f"send failed: {str(exc) or type(exc).__name__}")
+                return
+            finally:
+                self._sending_since = None
+            self.sent += 1
+
+    def _fail(self, reason: str) -> None:
+        self.closed = True
+        if self.on_failed is not None:
+            self.on_failed(self, reason)
+        else:
+            logger.warning(f"Websocket writer stopped: {reason}")
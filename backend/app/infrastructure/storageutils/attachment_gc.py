@@ -0,0 +1,33 @@
+import asyncio
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.core.logging import logger
+from app.domains.support import use_cases as support_use_cases
+from app.domains.support.entity import SupportBlobGCReport
+from app.infrastructure.database.sqlite.session import SessionLocal
+
+
+def collect_support_blobs() -> SupportBlobGCReport:
+    """Run one attachment blob GC pass with its own session."""
+    settings = get_settings()
+    db = SessionLocal()
+    try:
+        return support_use_cases.collect_attachment_blobs(
+            db,
+            base_dir=settings.SUPPORT_ATTACHMENT_DIR,
+            grace_seconds=settings.SUPPORT_BLOB_GC_GRACE_SECONDS,
+        )
+    finally:
+        db.close()
+
+
+async def run_attachment_gc(interval_seconds: int) -> None:
+    """Periodically delete unreferenced support attachment blobs until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_in_threadpool(collect_support_blobs)
+        except Exception as exc:  # noqa: BLE001
+            logger.error(f"Support attachment GC failed: {exc}")
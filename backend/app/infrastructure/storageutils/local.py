@@ -1,23 +1,35 @@
 import hashlib
 import os
+import uuid
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Iterable, Iterator, Optional, Tuple
 from fastapi import HTTPException, UploadFile
 from starlette import status
 
 from app.core.logging import logger
 
+# Attachment content is stored once per checksum under base_dir/blobs/<2-char shard>/<sha256>
+BLOB_DIR = "blobs"
+
+
+def support_blob_path(checksum: str) -> str:
+    """Storage path of a blob, relative to the attachment base directory."""
+    return f"{BLOB_DIR}/{checksum[:2]}/{checksum}"
+
 
 def save_support_attachment(
     *,
-    conversation_id: str,
     upload: UploadFile,
     base_dir: str,
     max_bytes: int,
     allowed_mime_prefixes: Iterable[str],
 ) -> Tuple[str, int, str]:
     """
-    Save an uploaded attachment to disk with basic validation.
+    Save an uploaded attachment as a content-addressed blob with basic validation.
+
+    The upload is hashed before anything is written; content that is already
+    stored is not written again, only its modification time is refreshed so
+    the GC job leaves it alone until the new attachment row references it.
 
     Returns (storage_path, size_bytes, checksum).
     """
@@ -28,35 +40,84 @@ def save_support_attachment(
             detail=f"Unsupported attachment type '{mime}'",
         )
 
-    target_dir = Path(base_dir) / conversation_id
-    target_dir.mkdir(parents=True, exist_ok=True)
-
-    filename = upload.filename or "attachment"
-    safe_name = os.path.basename(filename)
-    storage_name = f"{hashlib.sha256(safe_name.encode()).hexdigest()[:8]}_{safe_name}"
-    storage_path = target_dir / storage_name
-
     size = 0
     digest = hashlib.sha256()
-
-    with storage_path.open("wb") as f:
-        while True:
-            chunk = upload.file.read(8192)
-            if not chunk:
-                break
-            size += len(chunk)
-            if size > max_bytes:
-                storage_path.unlink(missing_ok=True)
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Attachment too large (limit {max_bytes} bytes)",
-                )
-            digest.update(chunk)
-            f.write(chunk)
+    while True:
+        chunk = upload.file.read(8192)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Attachment too large (limit {max_bytes} bytes)",
+            )
+        digest.update(chunk)
 
     checksum = digest.hexdigest()
-    logger.info(f"Stored support attachment {storage_path} ({size} bytes)")
+    relative_path = support_blob_path(checksum)
+    storage_path = Path(base_dir) / relative_path
+
+    try:
+        os.utime(storage_path)
+        logger.info(f"Reused support attachment blob {relative_path} ({size} bytes)")
+        return relative_path, size, checksum
+    except FileNotFoundError:
+        pass
 
-    # Return relative path from base_dir (conversation_id/filename)
-    relative_path = f"{conversation_id}/{storage_name}"
+    storage_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write under a temporary name and rename so readers never see a partial blob
+    tmp_path = storage_path.with_name(f".{checksum}.{uuid.uuid4().hex}.tmp")
+    upload.file.seek(0)
+    try:
+        with tmp_path.open("wb") as f:
+            while True:
+                chunk = upload.file.read(8192)
+                if not chunk:
+                    break
+                f.write(chunk)
+        os.replace(tmp_path, storage_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    logger.info(f"Stored support attachment blob {relative_path} ({size} bytes)")
     return relative_path, size, checksum
+
+
+def iter_support_blob_files(base_dir: str, older_than: float) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (file name, storage path) for blob files last modified before ``older_than``.
+
+    Blob files are named by checksum; names starting with "." are temporary
+    files left behind by an interrupted write.
+    """
+    root = Path(base_dir) / BLOB_DIR
+    if not root.is_dir():
+        return
+    for shard in root.iterdir():
+        if not shard.is_dir():
+            continue
+        for path in shard.iterdir():
+            try:
+                if path.stat().st_mtime < older_than:
+                    yield path.name, f"{BLOB_DIR}/{shard.name}/{path.name}"
+            except FileNotFoundError:
+                continue
+
+
+def remove_support_blob(base_dir: str, storage_path: str, older_than: Optional[float] = None) -> Optional[int]:
+    """
+    Delete a blob file. Returns the bytes freed, or None if it was missing or modified since ``older_than``.
+
+    The modification time is checked right before unlinking because an upload
+    of the same content touches the file before it references it again.
+    """
+    path = Path(base_dir) / storage_path
+    try:
+        stat = path.stat()
+        if older_than is not None and stat.st_mtime >= older_than:
+            return None
+        path.unlink()
+    except FileNotFoundError:
+        return None
+    return stat.st_size
@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -7,11 +9,25 @@ from app.core.logging import logger
 from app.infrastructure.database.sqlite.session import Base, engine, SessionLocal
 from app.infrastructure.database.sqlite.models.product import ProductModel
 from app.infrastructure.database.sqlite.models.category import CategoryModel
-from app.infrastructure.database.sqlite.models.order import OrderModel, OrderItemModel
+from app.infrastructure.database.sqlite.models.order import (
+    OrderModel,
+    OrderItemModel,
+    OrderEventModel,
+    OrderArchiveModel,
+    OrderItemArchiveModel,
+    CustomerOrderSummaryModel,
+)
 from app.infrastructure.database.sqlite.models.user import UserModel
+from app.infrastructure.database.sqlite.models.email_outbox import EmailOutboxModel
 from app.infrastructure.database.sqlite.models.review import ReviewModel
-from app.infrastructure.database.sqlite.models.wishlist import WishlistModel
+from app.infrastructure.database.sqlite.models.wishlist import WishlistModel, WishlistDigestEntryModel
 from app.infrastructure.database.sqlite.seeder import seed_database
+from app.infrastructure.notifications.digest_notifier import run_digest_flusher
+from app.infrastructure.notifications.outbox_worker import run_outbox_worker
+from app.infrastructure.notifications.smtp_pool import get_smtp_pool
+from app.infrastructure.notifications.async_smtp import get_async_email_transport
+from app.infrastructure.notifications.email_templates import get_email_templates
+from app.infrastructure.storageutils.attachment_gc import run_attachment_gc
 
 from app.api.endpoints import auth as auth_endpoints
 from app.api.endpoints import products as products_endpoints
@@ -62,7 +78,38 @@ def create_application() -> FastAPI:
             seed_database(db)
         finally:
             db.close()
-          
+
+    background_tasks = []
+
+    @app.on_event("startup")
+    async def start_background_workers():
+        # Compile email templates now rather than on the first send
+        get_email_templates()
+        await support_endpoints.manager.start()
+        transport = get_async_email_transport()
+        if transport:
+            transport.bind()
+        if settings.SMTP_HOST:
+            background_tasks.append(asyncio.create_task(run_outbox_worker(settings.EMAIL_OUTBOX_POLL_SECONDS)))
+        # Also retries entries whose post-request flush failed when the digest window is 0
+        if settings.smtp_configured:
+            background_tasks.append(
+                asyncio.create_task(run_digest_flusher(settings.WISHLIST_DIGEST_FLUSH_INTERVAL_SECONDS))
+            )
+        if settings.SUPPORT_BLOB_GC_INTERVAL_SECONDS > 0:
+            background_tasks.append(asyncio.create_task(run_attachment_gc(settings.SUPPORT_BLOB_GC_INTERVAL_SECONDS)))
+
+    @app.on_event("shutdown")
+    async def stop_background_workers():
+        for task in background_tasks:
+            task.cancel()
+        await support_endpoints.manager.stop()
+        pool = get_smtp_pool()
+        if pool:
+            pool.close()
+        transport = get_async_email_transport()
+        if transport:
+            await transport.close()
 
     return app
 
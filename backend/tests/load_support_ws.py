@@ -0,0 +1,111 @@
+"""
+Load test for the support chat websocket.
+
+Opens N chat sockets against a running server (two guest participants per
+conversation), then has every socket send messages at a fixed interval and
+measures the time until its own message comes back through the broadcast.
+Per-message latency should stay flat as N grows; if DB calls block the event
+loop it climbs with the number of sockets instead.
+
+Not collected by pytest. Run against a local server, e.g.:
+
+    uvicorn app.main:app --port 8000 &
+    python tests/load_support_ws.py --base-url http://127.0.0.1:8000 --sockets 10 100 1000
+
+Requires the ``websockets`` and ``httpx`` packages.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+import httpx
+import websockets
+
+
+async def _create_conversations(base_url: str, count: int, concurrency: int = 20):
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+
+        async def create(i: int):
+            async with semaphore:
+                response = await client.post(
+                    "/api/v1/support/conversations",
+                    json={"guest_name": f"Load {i}", "guest_email": f"load{i}@example.com", "initial_message": "hi"},
+                )
+                response.raise_for_status()
+                body = response.json()
+                return body["id"], body["conversation_token"]
+
+        return await asyncio.gather(*(create(i) for i in range(count)))
+
+
+async def _chat_socket(ws_url: str, messages: int, interval: float, start: asyncio.Event, latencies: list):
+    async with websockets.connect(ws_url, max_queue=None) as ws:
+        await ws.recv()  # history
+        await start.wait()
+        # Spread senders over the interval so load is steady rather than bursty
+        await asyncio.sleep(interval * (uuid.uuid4().int % 1000) / 1000)
+        for _ in range(messages):
+            marker = uuid.uuid4().hex
+            sent = time.perf_counter()
+            await ws.send(json.dumps({"action": "send_message", "body": marker}))
+            while True:
+                event = json.loads(await ws.recv())
+                if event.get("type") == "message" and event["payload"]["body"] == marker:
+                    latencies.append((time.perf_counter() - sent) * 1000)
+                    break
+            await asyncio.sleep(interval)
+
+
+async def run_level(base_url: str, sockets: int, messages: int, interval: float) -> dict:
+    conversations = await _create_conversations(base_url, max(1, sockets // 2))
+    ws_base = base_url.replace("http", "ws", 1)
+    urls = [
+        f"{ws_base}/api/v1/support/ws?conversation_id={cid}&conversation_token={token}"
+        for cid, token in conversations
+        for _ in range(2)
+    ][:sockets]
+
+    start = asyncio.Event()
+    latencies: list = []
+    tasks = [asyncio.create_task(_chat_socket(url, messages, interval, start, latencies)) for url in urls]
+    await asyncio.sleep(1 + sockets / 200)  # let every socket connect
+    started = time.perf_counter()
+    start.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "sockets": sockets,
+        "messages": len(latencies),
+        "msg_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+        "max_ms": latencies[-1],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--sockets", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--messages", type=int, default=5, help="messages sent by each socket")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between a socket's messages")
+    args = parser.parse_args()
+
+    print(f"{'sockets':>8} {'msgs':>6} {'msg/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for level in args.sockets:
+        r = await run_level(args.base_url, level, args.messages, args.interval)
+        print(
+            f"{r['sockets']:>8} {r['messages']:>6} {r['msg_per_s']:>7.1f} {r['p50_ms']:>8.1f} "
+            f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['max_ms']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
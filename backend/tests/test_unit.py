@@ -1,10 +1,33 @@
+import asyncio
 import pytest
-from datetime import datetime
+import socketserver
+import threading
+from dataclasses import replace
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from app.domains.catalog.entity import Product
 from app.domains.catalog.schemas import ProductResponse, ProductUpdate, ProductDiscountRequest, ProductDiscountClearRequest
 from app.domains.category.entity import Category
-from app.domains.order.entity import Order, OrderItem, OrderStatus
-from app.domains.order.schemas import OrderCreate, OrderRefundRequest, OrderRefundApproval
+from app.domains.order.entity import Order, OrderItem, OrderStatus, OrderEvent, OrderEventType
+from app.domains.order.repository import OrderRepository
+from app.domains.review.schemas import ReviewBulkModerationRequest
+from app.domains.notifications.digest import WishlistDigestItem, coalesce_digest_items
+from app.domains.notifications.fanout import detect_wishlist_events
+from app.domains.notifications.outbox import EmailOutboxStatus, OutboxEmail, backoff_seconds
+from app.domains.notifications.repository import EmailOutboxRepository
+from app.domains.notifications.use_cases import drain_email_outbox
+from app.infrastructure.database.sqlite.models.email_outbox import EmailOutboxModel
+from app.infrastructure.notifications.async_smtp import AsyncSMTPTransport
+from app.infrastructure.database.sqlite.models.support import SupportBroadcastModel
+from app.infrastructure.notifications import email_notifier
+from app.infrastructure.notifications.email_templates import EmailTemplateRegistry, RenderedEmail
+from app.infrastructure.notifications.smtp_pool import SMTPConnectionPool
+from app.infrastructure.realtime.broadcast import SQLiteBroadcast
+from app.domains.notifications.notifier import WishlistEventType
+from app.domains.order.schemas import OrderCreate, OrderRefundRequest, OrderRefundApproval, OrderEventResponse
 
 
 # Product Entity Tests
@@ -290,3 +313,1031 @@ def test_product_response_from_entity_mapping():
     assert response.final_price == 90.0
     assert response.discount_active is True
     assert response.category == "Shoes"
+
+
+def test_order_event_response_mapping():
+    """OrderEventResponse should map the event dataclass via from_attributes."""
+    event = OrderEvent(
+        id=7, order_id=3, customer_id="uuid-123",
+        event_type=OrderEventType.STATUS_CHANGED,
+        payload={"from": "processing", "to": "in-transit"},
+        created_at=datetime.now(),
+    )
+
+    response = OrderEventResponse.model_validate(event)
+
+    assert response.id == 7
+    assert response.event_type == "status_changed"
+    assert response.payload["to"] == "in-transit"
+
+
+def test_order_spend_contribution_by_status():
+    """Cancelled orders contribute nothing; refunded orders contribute the net amount."""
+    order = Order(
+        id=1, customer_id="uuid-123",
+        status=OrderStatus.DELIVERED,
+        total_amount=100.0, tax_amount=8.0,
+        shipping_amount=0.0, delivery_address="123 Main St",
+        created_at=None, updated_at=None,
+        items=[]
+    )
+    assert OrderRepository._spend_contribution(order) == 100.0
+
+    order.status = OrderStatus.REFUNDED
+    order.refund_amount = 40.0
+    assert OrderRepository._spend_contribution(order) == 60.0
+
+    order.status = OrderStatus.CANCELLED
+    assert OrderRepository._spend_contribution(order) == 0.0
+
+
+def test_review_bulk_moderation_requires_ids():
+    """Bulk moderation should reject an empty id list."""
+    with pytest.raises(ValueError):
+        ReviewBulkModerationRequest(review_ids=[], approved=True)
+
+
+def test_detect_wishlist_events_for_restock_and_discount():
+    """Restocking and discounting a product should yield both wishlist events."""
+    previous = Product(
+        id=1, name="Test", model="M1", serial_number="SN1",
+        description=None, price=50.0, stock=0, category_id=1,
+        category="Cat", image=None, rating=None,
+        warranty_status=None, distributor=None
+    )
+    current = Product(
+        id=1, name="Test", model="M1", serial_number="SN1",
+        description=None, price=50.0, stock=3, category_id=1,
+        category="Cat", image=None, rating=None,
+        warranty_status=None, distributor=None,
+        discount_rate=10.0, discount_active=True
+    )
+    events = detect_wishlist_events(previous, current)
+    assert [e.event_type for e in events] == [
+        WishlistEventType.BACK_IN_STOCK,
+        WishlistEventType.DISCOUNT_CHANGED,
+    ]
+    assert events[1].discount_rate == 10.0
+    assert detect_wishlist_events(current, current) == []
+
+    ended = detect_wishlist_events(current, replace(current, discount_active=False, discount_rate=None))
+    assert ended[0].discount_active is False
+    assert ended[0].discount_rate == 10.0
+
+
+def test_wishlist_discount_email_says_whether_the_price_dropped_or_rose():
+    """Discount emails should name the direction of the price move."""
+    registry = EmailTemplateRegistry()
+    product = {"id": 1, "name": "Phone", "price": 100.0, "final_price": 80.0, "stock": 1, "image": None}
+    started = registry.render_product_email(
+        "wishlist_discount", product, discount_active=True, discount_rate=20.0
+    )
+    assert started.subject == "Price dropped by 20%: Phone"
+    assert "dropped by 20%" in started.text and "dropped by 20%" in started.html
+
+    ended = registry.render_product_email(
+        "wishlist_discount", dict(product, final_price=100.0), discount_active=False, discount_rate=20.0
+    )
+    assert ended.subject == "Price rose by 25%: Phone"
+    assert "rose by 25%" in ended.text and "change" not in ended.text
+
+
+def test_coalesce_digest_items_keeps_latest_per_product():
+    """A restock followed by a sell-out of the same product only reports the sell-out."""
+    items = [
+        WishlistDigestItem(id=1, event_type=WishlistEventType.BACK_IN_STOCK, product={"id": 1}),
+        WishlistDigestItem(id=2, event_type=WishlistEventType.DISCOUNT_CHANGED, product={"id": 1}, discount_active=True),
+        WishlistDigestItem(id=3, event_type=WishlistEventType.OUT_OF_STOCK, product={"id": 1}),
+        WishlistDigestItem(id=4, event_type=WishlistEventType.DISCOUNT_CHANGED, product={"id": 2}),
+    ]
+    assert [item.id for item in coalesce_digest_items(items)] == [2, 3, 4]
+
+
+class _SMTPStubHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue; recipients containing 'reject' are refused."""
+
+    def handle(self):
+        reply = lambda line: self.wfile.write(f"{line}\r\n".encode())
+        reply("220 stub")
+        in_data = False
+        while True:
+            line = self.rfile.readline().decode().rstrip("\r\n")
+            if in_data:
+                if line == ".":
+                    in_data = False
+                    self.server.delivered += 1
+                    reply("250 queued")
+                continue
+            command = line.split(" ")[0].upper()
+            if command in ("QUIT", ""):  # "" when the client hung up
+                reply("221 bye")
+                return
+            if command == "DATA":
+                in_data = True
+                reply("354 go ahead")
+            elif command == "RCPT" and "reject" in line:
+                reply("550 no such user")
+            else:
+                reply("250 ok")
+
+
+@pytest.fixture
+def smtp_stub():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPStubHandler)
+    server.daemon_threads = True
+    server.delivered = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_email_outbox_retries_then_dead_letters(smtp_stub):
+    """Outbox drain delivers over SMTP, backs off failed sends and dead-letters them."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    EmailOutboxModel.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    outbox = EmailOutboxRepository(db)
+    outbox.add(OutboxEmail(template="plain", to_address="ok@example.com"))
+    outbox.add(OutboxEmail(template="plain", to_address="reject@example.com"))
+    db.commit()
+
+    pool = SMTPConnectionPool("127.0.0.1", smtp_stub.server_address[1], starttls=False, use_ssl=False)
+
+    def deliver(email):
+        msg = EmailMessage()
+        msg["From"] = "store@example.com"
+        msg["To"] = email.to_address
+        msg["Subject"] = email.template
+        msg.set_content("hello")
+        pool.send(msg)
+
+    now = datetime.utcnow()
+    first = drain_email_outbox(db, deliver, max_attempts=2, backoff_base_seconds=30, now=now)
+    assert (first.sent, first.retried, first.dead) == (1, 1, 0)
+    assert smtp_stub.delivered == 1
+
+    # Not due again until the backoff has elapsed
+    assert drain_email_outbox(db, deliver, max_attempts=2, now=now).claimed == 0
+    second = drain_email_outbox(db, deliver, max_attempts=2, now=now + timedelta(seconds=31))
+    assert second.dead == 1
+    assert outbox.count_by_status() == {EmailOutboxStatus.SENT.value: 1, EmailOutboxStatus.DEAD.value: 1}
+    assert backoff_seconds(3, 30) == 120
+    pool.close()
+
+
+def test_smtp_uses_implicit_tls_whenever_starttls_is_off():
+    assert SMTPConnectionPool("mail.example.com", 2465, starttls=False).use_ssl
+    assert not SMTPConnectionPool("mail.example.com", 587).use_ssl
+    assert AsyncSMTPTransport("mail.example.com", 2465, starttls=False).use_ssl
+
+
+def test_async_transport_reuses_connections(smtp_stub):
+    """Concurrent async sends share at most max_concurrency connections."""
+    transport = AsyncSMTPTransport("127.0.0.1", smtp_stub.server_address[1], starttls=False, use_ssl=False, max_concurrency=2)
+
+    def message():
+        msg = EmailMessage()
+        msg["From"] = "store@example.com"
+        msg["To"] = "ok@example.com"
+        msg.set_content("hello")
+        return msg
+
+    async def run():
+        await asyncio.gather(*(transport.send(message()) for _ in range(10)))
+        await transport.close()
+
+    asyncio.run(run())
+    assert smtp_stub.delivered == 10
+    assert transport.connects <= 2
+
+
+def test_email_templates_cache_product_fragments():
+    registry = EmailTemplateRegistry()
+    product = {"id": 1, "name": "Boots <b>", "price": 10.0, "final_price": 9.0, "stock": 3}
+
+    first = registry.render_product_email("wishlist_back_in_stock", product)
+    registry.render_product_email("wishlist_back_in_stock", product)
+    assert registry.fragment_misses == 1
+    assert registry.fragment_hits == 1
+    assert first.subject == "Good news: Boots <b> is back!"
+    assert "Boots &lt;b&gt;" in first.html
+
+    digest = registry.render_digest([
+        WishlistDigestItem(id=1, event_type=WishlistEventType.BACK_IN_STOCK, product=product),
+        WishlistDigestItem(id=2, event_type=WishlistEventType.DISCOUNT_CHANGED, product=product, discount_active=True, discount_rate=10.0),
+    ])
+    assert digest.subject == "Your wishlist: 2 updates"
+    assert "- Boots <b> is back in stock ($9.0)" in digest.text
+    assert "Boots &lt;b&gt;</strong> price dropped by 10%" in digest.html
+
+
+def test_wishlist_email_keeps_recipients_in_the_envelope(smtp_stub, monkeypatch):
+    pool = SMTPConnectionPool("127.0.0.1", smtp_stub.server_address[1], starttls=False, use_ssl=False)
+    monkeypatch.setattr(email_notifier, "get_smtp_pool", lambda: pool)
+    monkeypatch.setattr(email_notifier, "get_async_email_transport", lambda: None)
+    notifier = email_notifier.EmailWishlistNotifier()
+    notifier.settings = notifier.settings.model_copy(
+        update={"SMTP_HOST": "127.0.0.1", "SMTP_USERNAME": "u", "SMTP_PASSWORD": "p"}
+    )
+    rendered = RenderedEmail(subject="Back", text="hi", html="<p>hi</p>")
+    addresses = [f"user{i}@example.com" for i in range(6)] + ["reject@example.com"]
+
+    notifier._send(addresses, rendered)
+
+    # One message for everyone; a refused address does not fail the rest
+    assert smtp_stub.delivered == 1
+    assert notifier._build_message([email_notifier.UNDISCLOSED_RECIPIENTS], rendered)["To"] == "undisclosed-recipients:;"
+    pool.close()
+
+
+def test_sqlite_broadcast_relays_between_processes():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    SupportBroadcastModel.__table__.create(engine)
+    session_factory = sessionmaker(bind=engine)
+    # Long poll interval so only the explicit poll_once calls below read the table
+    worker_a = SQLiteBroadcast(session_factory, poll_seconds=60)
+    worker_b = SQLiteBroadcast(session_factory, poll_seconds=60)
+    received = {"a": [], "b": []}
+
+    async def run():
+        async def deliver_a(channel, message):
+            received["a"].append((channel, message))
+
+        async def deliver_b(channel, message):
+            received["b"].append((channel, message))
+
+        await worker_a.start(deliver_a)
+        await worker_b.start(deliver_b)
+        await worker_a.publish("conv-1", {"type": "message", "body": "hi"})
+        # The publisher delivers locally and skips its own row when polling
+        assert await worker_a.poll_once() == 0
+        assert await worker_b.poll_once() == 1
+        await worker_a.stop()
+        await worker_b.stop()
+
+    asyncio.run(run())
+    assert received["a"] == received["b"] == [("conv-1", {"type": "message", "body": "hi"})]
+
+
+class _FakeSocket:
+    def __init__(self, stuck: bool = False):
+        self.stuck = stuck
+        self.sent = []
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        if self.stuck:
+            await asyncio.Event().wait()
+        self.sent.append(message)
+
+    async def close(self, code=1000, reason=None):
+        self.close_code = code
+
+
+def test_support_manager_evicts_slow_consumer_without_blocking_others():
+    from app.api.endpoints.support import SupportConnectionManager
+
+    async def run():
+        manager = SupportConnectionManager(max_queue=2, send_timeout=5)
+        fast, stuck = _FakeSocket(), _FakeSocket(stuck=True)
+        await manager.connect("conv-1", fast)
+        await manager.connect("conv-1", stuck)
+
+        for i in range(4):
+            await manager.broadcast("conv-1", {"n": i})
+            await asyncio.sleep(0.01)
+
+        metrics = manager.metrics()
+        await manager.stop()
+        return fast, stuck, metrics
+
+    fast, stuck, metrics = asyncio.run(run())
+    assert [m["n"] for m in fast.sent] == [0, 1, 2, 3]
+    # One message is held by the blocked send, two fill the queue, the fourth overflows
+    assert stuck.close_code == 1013
+    assert metrics["evicted_total"] == 1
+    assert metrics["connections"] == 1
+
+
+def test_support_manager_reaps_idle_sockets():
+    from app.api.endpoints.support import SupportConnectionManager
+
+    async def run():
+        manager = SupportConnectionManager(idle_timeout=60)
+        idle, active = _FakeSocket(), _FakeSocket()
+        await manager.connect("conv-1", idle)
+        await manager.connect("conv-1", active)
+
+        manager._last_seen[idle] -= 120
+        manager.touch(active)
+        reaped = manager.reap_idle()
+        await asyncio.sleep(0.01)
+
+        metrics = manager.metrics()
+        await manager.stop()
+        return idle, active, reaped, metrics
+
+    idle, active, reaped, metrics = asyncio.run(run())
+    assert reaped == 1
+    assert idle.close_code == 1000
+    assert active.close_code is None
+    assert metrics["idle_reaped_total"] == 1
+    assert metrics["connections"] == 1
+
+
+def test_support_manager_keeps_quiet_sockets_by_default():
+    from app.api.endpoints.support import SupportConnectionManager
+    from app.core.config import Settings
+
+    async def run():
+        manager = SupportConnectionManager(idle_timeout=Settings(_env_file=None).SUPPORT_WS_IDLE_TIMEOUT_SECONDS)
+        waiting = _FakeSocket()
+        await manager.connect("conv-1", waiting)
+        manager._last_seen[waiting] -= 24 * 3600
+        reaped = manager.reap_idle()
+        started = manager._reaper is not None
+        await manager.stop()
+        return waiting, reaped, started
+
+    waiting, reaped, started = asyncio.run(run())
+    assert (reaped, started) == (0, False)
+    assert waiting.close_code is None
+
+
+def test_support_message_page_walks_history_with_cursors():
+    from app.domains.support.repository import SupportRepository
+    from app.infrastructure.database.sqlite.models.support import SupportMessageModel
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    SupportMessageModel.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    start = datetime(2025, 1, 1)
+    # Pairs share a timestamp so the id tie-break is exercised
+    for i in range(7):
+        db.add(SupportMessageModel(
+            id=f"m{i}", conversation_id="c1", sender_role="customer", body=str(i),
+            created_at=start + timedelta(seconds=i // 2),
+        ))
+    db.add(SupportMessageModel(id="other", conversation_id="c2", sender_role="customer", created_at=start))
+    db.commit()
+    repo = SupportRepository(db)
+
+    latest, has_more = repo.get_message_page("c1", limit=3)
+    assert [m.id for m in latest] == ["m4", "m5", "m6"] and has_more
+    older, has_more = repo.get_message_page("c1", limit=3, before=latest[0].id)
+    assert [m.id for m in older] == ["m1", "m2", "m3"] and has_more
+    oldest, has_more = repo.get_message_page("c1", limit=3, before=older[0].id)
+    assert [m.id for m in oldest] == ["m0"] and not has_more
+    newer, has_more = repo.get_message_page("c1", limit=2, after="m2")
+    assert [m.id for m in newer] == ["m3", "m4"] and has_more
+
+    with pytest.raises(ValueError):
+        repo.get_message_page("c1", before="other")
+
+
+def test_support_partial_history_frames_are_not_full_history():
+    from types import SimpleNamespace
+    from app.api.endpoints.support import _socket_history, _socket_history_page
+    from app.infrastructure.database.sqlite.models import support as support_models
+    from app.infrastructure.database.sqlite.session import Base
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[
+        support_models.SupportMessageModel.__table__,
+        support_models.SupportAttachmentModel.__table__,
+    ])
+    db = sessionmaker(bind=engine)()
+    for i in range(3):
+        db.add(support_models.SupportMessageModel(
+            id=f"m{i}", conversation_id="c1", sender_role="customer", body=str(i),
+            created_at=datetime(2025, 1, 1) + timedelta(seconds=i),
+        ))
+    db.commit()
+    conversation = SimpleNamespace(id="c1", context_snapshot=None)
+
+    full = _socket_history(db, conversation)
+    resumed = _socket_history(db, conversation, "m0")
+    page = _socket_history_page(db, "c1", {"before": "m2"})
+
+    # Only a full history replaces what the client shows
+    assert full["type"] == "history" and [m["id"] for m in full["messages"]] == ["m0", "m1", "m2"]
+    assert resumed["type"] == "history_delta" and [m["id"] for m in resumed["messages"]] == ["m1", "m2"]
+    assert page["type"] == "history_page" and [m["id"] for m in page["messages"]] == ["m0", "m1"]
+
+
+def test_support_client_message_id_is_stored_once():
+    from app.domains.support import use_cases
+    from app.domains.support.entity import SenderRole
+    from app.infrastructure.database.sqlite.models.support import SupportConversationModel, SupportMessageModel
+    from app.infrastructure.database.sqlite.session import Base
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[SupportConversationModel.__table__, SupportMessageModel.__table__])
+    db = sessionmaker(bind=engine)()
+    db.add_all([SupportConversationModel(id="c1"), SupportConversationModel(id="c2")])
+    db.commit()
+    sent = dict(conversation_id="c1", sender_role=SenderRole.CUSTOMER, sender_id=None, body="hi")
+
+    first, created = use_cases.add_client_message(db, client_message_id="k1", **sent)
+    assert created
+    # A retried send after a reconnect returns the stored message
+    again, created = use_cases.add_client_message(db, client_message_id="k1", **sent)
+    assert not created and again.id == first.id
+    other, created = use_cases.add_client_message(db, client_message_id="k1", **{**sent, "conversation_id": "c2"})
+    assert created and other.id != first.id
+    assert db.query(SupportMessageModel).count() == 2
+
+
+def test_support_manager_drops_cached_header_on_close():
+    from app.api.endpoints.support import SupportConnectionManager
+    from app.domains.support.entity import ConversationStatus, SupportConversationHeader
+
+    header = SupportConversationHeader(
+        id="conv-1", status=ConversationStatus.OPEN, customer_id=None,
+        conversation_token="t", assigned_agent_id=None,
+    )
+
+    async def run():
+        manager = SupportConnectionManager()
+        socket = _FakeSocket()
+        await manager.connect("conv-1", socket)
+        manager.cache_header("conv-1", socket, header, manager.header_version("conv-1"))
+        cached = manager.cached_header("conv-1", socket)
+
+        # A header read before the close must not be cached after it
+        stale_version = manager.header_version("conv-1")
+        await manager.broadcast("conv-1", {"type": "conversation_closed"})
+        after_close = manager.cached_header("conv-1", socket)
+        manager.cache_header("conv-1", socket, header, stale_version)
+        after_stale = manager.cached_header("conv-1", socket)
+        await manager.stop()
+        return cached, after_close, after_stale
+
+    cached, after_close, after_stale = asyncio.run(run())
+    assert cached is header
+    assert after_close is None
+    assert after_stale is None
+
+
+def test_support_claim_next_pops_by_priority_then_sla():
+    from app.domains.support.entity import ConversationPriority, SenderRole
+    from app.domains.support.repository import SupportRepository
+    from app.infrastructure.database.sqlite.models import support as support_models
+    from app.infrastructure.database.sqlite.session import Base
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[
+        support_models.SupportConversationModel.__table__,
+        support_models.SupportMessageModel.__table__,
+        support_models.SupportAttachmentModel.__table__,
+        support_models.SupportContextSnapshotModel.__table__,
+    ])
+    repo = SupportRepository(sessionmaker(bind=engine)())
+
+    def open_conversation(name, priority, sla_minutes):
+        return repo.create_conversation(
+            customer_id=None, guest_name=name, guest_email=None, context_snapshot=None,
+            initial_message=None, initial_sender_role=SenderRole.CUSTOMER,
+            priority=priority, sla_minutes=sla_minutes,
+        ).id
+
+    low = open_conversation("low", ConversationPriority.LOW, 5)
+    normal_late = open_conversation("normal-late", ConversationPriority.NORMAL, 240)
+    normal_soon = open_conversation("normal-soon", ConversationPriority.NORMAL, 30)
+    urgent = open_conversation("urgent", ConversationPriority.URGENT, 15)
+
+    assert repo.claim_conversation(normal_soon, "agent-1").assigned_agent_id == "agent-1"
+    assert repo.claim_conversation(normal_soon, "agent-2") is None
+
+    claimed = [repo.claim_next("agent-2").id for _ in range(3)]
+    assert claimed == [urgent, normal_late, low]
+    assert repo.claim_next("agent-2") is None
+
+    repo.set_priority(low, ConversationPriority.URGENT, 15)
+    assert repo.get_conversation(low).priority == ConversationPriority.URGENT
+
+
+def test_support_manager_holds_deltas_until_snapshot_released():
+    from app.api.endpoints.support import SupportConnectionManager
+
+    async def run():
+        manager = SupportConnectionManager(idle_timeout=60)
+        socket = _FakeSocket()
+        await manager.connect("queue", socket, hold=True, idle_reapable=False)
+        await manager.broadcast("queue", {"type": "queue_delta", "n": 1})
+        held = list(socket.sent)
+        manager.release("queue", socket, {"type": "queue_snapshot"})
+        await manager.broadcast("queue", {"type": "queue_delta", "n": 2})
+        await asyncio.sleep(0.01)
+        reaped = manager.reap_idle(now=float("inf"))
+        await manager.stop()
+        return held, socket.sent, reaped
+
+    held, sent, reaped = asyncio.run(run())
+    assert held == []
+    assert [m["type"] for m in sent] == ["queue_snapshot", "queue_delta", "queue_delta"]
+    assert [m.get("n") for m in sent[1:]] == [1, 2]
+    assert reaped == 0
+
+
+def test_support_manager_multiplexes_conversations_on_one_socket():
+    from app.api.endpoints.support import SupportConnectionManager
+
+    async def run():
+        manager = SupportConnectionManager()
+        socket = _FakeSocket()
+        await manager.connect(None, socket, multiplexed=True)
+        manager.subscribe("conv-a", socket)
+        manager.subscribe("conv-b", socket)
+        await manager.broadcast("conv-a", {"type": "message", "n": 1})
+        await manager.broadcast("conv-b", {"type": "message", "n": 2})
+        manager.unsubscribe("conv-a", socket)
+        await manager.broadcast("conv-a", {"type": "message", "n": 3})
+        await asyncio.sleep(0.01)
+        metrics = manager.metrics()
+        manager.disconnect(None, socket)
+        remaining = dict(manager.active_connections)
+        await manager.stop()
+        return socket.sent, metrics, remaining
+
+    sent, metrics, remaining = asyncio.run(run())
+    assert [(m["conversation_id"], m["n"]) for m in sent] == [("conv-a", 1), ("conv-b", 2)]
+    assert metrics["connections"] == 1 and metrics["conversations"] == 1
+    assert remaining == {}
+
+
+def test_support_manager_holds_one_multiplexed_conversation_until_its_history():
+    from app.api.endpoints.support import SupportConnectionManager
+
+    async def run():
+        manager = SupportConnectionManager()
+        socket = _FakeSocket()
+        await manager.connect(None, socket, multiplexed=True)
+        manager.subscribe("conv-a", socket)
+        manager.subscribe("conv-b", socket, hold=True)
+        await manager.broadcast("conv-b", {"type": "message", "n": 1})
+        await manager.broadcast("conv-a", {"type": "message", "n": 2})
+        await asyncio.sleep(0.01)
+        before_release = list(socket.sent)
+        manager.release("conv-b", socket, {"type": "history", "messages": []})
+        await asyncio.sleep(0.01)
+        await manager.stop()
+        return before_release, socket.sent
+
+    before_release, sent = asyncio.run(run())
+    # conv-a is not held back by conv-b's pending history
+    assert [(m["conversation_id"], m.get("n")) for m in before_release] == [("conv-a", 2)]
+    assert [(m["conversation_id"], m["type"]) for m in sent[1:]] == [("conv-b", "history"), ("conv-b", "message")]
+
+
+def test_support_attachments_share_blob_until_gc(tmp_path):
+    import io
+    from fastapi import UploadFile
+    from starlette.datastructures import Headers
+    from app.domains.support import use_cases
+    from app.domains.support.repository import SupportRepository
+    from app.infrastructure.database.sqlite.models import support as support_models
+    from app.infrastructure.database.sqlite.session import Base
+    from app.infrastructure.storageutils.local import save_support_attachment
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[
+        support_models.SupportConversationModel.__table__,
+        support_models.SupportMessageModel.__table__,
+        support_models.SupportAttachmentModel.__table__,
+        support_models.SupportBlobModel.__table__,
+    ])
+    db = sessionmaker(bind=engine)()
+    db.add_all([support_models.SupportConversationModel(id="c1"), support_models.SupportConversationModel(id="c2")])
+    db.commit()
+    repo = SupportRepository(db)
+
+    def upload(conversation_id):
+        file = UploadFile(io.BytesIO(b"same screenshot"), filename="shot.png", headers=Headers({"content-type": "image/png"}))
+        path, size, checksum = save_support_attachment(
+            upload=file, base_dir=str(tmp_path), max_bytes=1024, allowed_mime_prefixes=["image/"],
+        )
+        return repo.save_attachment(
+            conversation_id=conversation_id, filename="shot.png", mime_type="image/png",
+            size_bytes=size, storage_path=path, checksum=checksum,
+        )
+
+    first, second = upload("c1"), upload("c2")
+    db.add(support_models.SupportMessageModel(id="m1", conversation_id="c1", sender_role="customer", attachment_id=first.id))
+    db.commit()
+    assert first.storage_path == second.storage_path
+    assert len(list(tmp_path.glob("blobs/*/*"))) == 1
+    assert db.get(support_models.SupportBlobModel, first.checksum).ref_count == 2
+    orphan = tmp_path / "blobs" / "ab" / ("ab" + "0" * 62)
+    orphan.parent.mkdir(exist_ok=True)
+    orphan.write_bytes(b"left over")
+
+    assert use_cases.delete_attachment(db, first.id).id == first.id
+    assert use_cases.delete_attachment(db, first.id) is None
+    assert db.get(support_models.SupportMessageModel, "m1").attachment_id is None
+    report = use_cases.collect_attachment_blobs(db, base_dir=str(tmp_path), grace_seconds=0)
+    # Still referenced by the second attachment; only the orphaned file goes
+    assert (report.deleted_blobs, report.deleted_orphans) == (0, 1)
+    assert (tmp_path / first.storage_path).exists() and not orphan.exists()
+
+    use_cases.delete_attachment(db, second.id)
+    report = use_cases.collect_attachment_blobs(db, base_dir=str(tmp_path), grace_seconds=0)
+    assert (report.deleted_blobs, report.freed_bytes) == (1, len(b"same screenshot"))
+    assert not (tmp_path / first.storage_path).exists()
+    assert db.get(support_models.SupportBlobModel, first.checksum) is None
+
+
+def test_order_ids_not_reused_after_archival():
+    from app.infrastructure.database.sqlite import models  # noqa: F401  registers every table
+    from app.infrastructure.database.sqlite.models.order import OrderModel
+    from app.infrastructure.database.sqlite.session import Base
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    repo = OrderRepository(db)
+
+    def place_and_deliver():
+        order = repo.create(Order(
+            id=None, customer_id="c1", status=OrderStatus.PROCESSING,
+            total_amount=10.0, tax_amount=0.0, shipping_amount=0.0, delivery_address="Addr",
+            created_at=None, updated_at=None,
+            items=[OrderItem(id=None, order_id=None, product_id=1, product_name="P", product_price=10.0, quantity=1, subtotal=10.0)],
+        ))
+        db.query(OrderModel).filter(OrderModel.id == order.id).update(
+            {"status": OrderStatus.DELIVERED, "delivered_at": datetime(2020, 1, 1)}
+        )
+        db.commit()
+        return order.id
+
+    first = place_and_deliver()
+    assert repo.archive_delivered_batch(datetime(2021, 1, 1), 10) == (1, 1)
+    second = place_and_deliver()
+    assert second != first
+    # Archiving the new order must not collide with the archived one
+    assert repo.archive_delivered_batch(datetime(2021, 1, 1), 10) == (1, 1)
+    ids = [o.id for o in repo.get_all("c1", include_archived=True)]
+    assert sorted(ids) == sorted({first, second})
+    assert repo.get_all("c1") == []
+
+
+def test_review_eligibility_needs_a_delivered_order_of_the_same_customer():
+    from app.infrastructure.database.sqlite import models  # noqa: F401  registers every table
+    from app.infrastructure.database.sqlite.models.order import OrderModel
+    from app.infrastructure.database.sqlite.session import Base
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    repo = OrderRepository(db)
+
+    def place(customer_id, product_id, delivered_at=None):
+        order = repo.create(Order(
+            id=None, customer_id=customer_id, status=OrderStatus.PROCESSING,
+            total_amount=10.0, tax_amount=0.0, shipping_amount=0.0, delivery_address="Addr",
+            created_at=None, updated_at=None,
+            items=[OrderItem(id=None, order_id=None, product_id=product_id, product_name="P", product_price=10.0, quantity=1, subtotal=10.0)],
+        ))
+        if delivered_at:
+            db.query(OrderModel).filter(OrderModel.id == order.id).update(
+                {"status": OrderStatus.DELIVERED, "delivered_at": delivered_at}
+            )
+            db.commit()
+        return order.id
+
+    place("c1", 1)  # Not delivered yet
+    place("c2", 2, delivered_at=datetime.utcnow())  # Another customer's delivered order
+    assert repo.find_delivered_order_with_product("c1", 1) is None
+    assert repo.find_delivered_order_with_product("c1", 2) is None
+
+    delivered = place("c1", 1, delivered_at=datetime.utcnow())
+    assert repo.find_delivered_order_with_product("c1", 1) == delivered
+
+    # Orders moved to the archive still count
+    archived = place("c3", 3, delivered_at=datetime(2020, 1, 1))
+    assert repo.archive_delivered_batch(datetime(2021, 1, 1), 10) == (1, 1)
+    assert repo.find_delivered_order_with_product("c3", 3) == archived
+
+
+def test_orders_inside_refund_window_are_not_archived():
+    from app.domains.order import use_cases as order_use_cases
+    from app.infrastructure.database.sqlite import models  # noqa: F401  registers every table
+    from app.infrastructure.database.sqlite.models.order import OrderModel
+    from app.infrastructure.database.sqlite.session import Base
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    repo = OrderRepository(db)
+
+    def delivered(days_ago):
+        order = repo.create(Order(
+            id=None, customer_id="c1", status=OrderStatus.PROCESSING,
+            total_amount=10.0, tax_amount=0.0, shipping_amount=0.0, delivery_address="Addr",
+            created_at=None, updated_at=None,
+            items=[OrderItem(id=None, order_id=None, product_id=1, product_name="P", product_price=10.0, quantity=1, subtotal=10.0)],
+        ))
+        db.query(OrderModel).filter(OrderModel.id == order.id).update(
+            {"status": OrderStatus.DELIVERED, "delivered_at": datetime.utcnow() - timedelta(days=days_ago)}
+        )
+        db.commit()
+        return order.id
+
+    refundable, expired = delivered(30.5), delivered(31.5)
+    # Even a 30-day retention leaves the still-refundable order alone
+    report = order_use_cases.archive_delivered_orders(db, retention_days=30)
+    assert report.archived_orders == 1
+    assert db.get(OrderModel, expired) is None
+    assert repo.request_refund(refundable, "Broken").status == OrderStatus.REFUND_REQUESTED
+
+
+def test_support_snapshot_carries_order_totals_and_recent_details():
+    from app.domains.support.use_cases import _build_context_snapshot
+    from app.infrastructure.database.sqlite import models  # noqa: F401  registers every table
+    from app.infrastructure.database.sqlite.session import Base
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    repo = OrderRepository(db)
+    for i in range(OrderRepository.SUMMARY_RECENT_ORDERS + 2):
+        repo.create(Order(
+            id=None, customer_id="c1", status=OrderStatus.PROCESSING,
+            total_amount=10.0, tax_amount=0.0, shipping_amount=0.0, delivery_address=f"Addr {i}",
+            created_at=None, updated_at=None,
+            items=[OrderItem(id=None, order_id=None, product_id=1, product_name="P", product_price=10.0, quantity=1, subtotal=10.0)],
+        ))
+
+    snapshot = _build_context_snapshot(db, "c1", cart_items=None)
+    assert snapshot["order_count"] == OrderRepository.SUMMARY_RECENT_ORDERS + 2
+    assert snapshot["lifetime_spend"] == 70.0
+    assert len(snapshot["orders_summary"]) == OrderRepository.SUMMARY_RECENT_ORDERS
+    latest = snapshot["orders_summary"][0]
+    assert latest["delivery_address"].startswith("Addr ")
+    assert latest["items"] == [{"product_id": 1, "product_name": "P", "quantity": 1, "subtotal": 10.0}]
+
+
+def test_customer_summary_keeps_concurrent_order_headers_and_reads_without_writing():
+    from app.infrastructure.database.sqlite import models  # noqa: F401  registers every table
+    from app.infrastructure.database.sqlite.models.order import CustomerOrderSummaryModel
+    from app.infrastructure.database.sqlite.session import Base
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    db_a, db_b = factory(), factory()
+
+    def place(db):
+        return OrderRepository(db).create(Order(
+            id=None, customer_id="c1", status=OrderStatus.PROCESSING,
+            total_amount=10.0, tax_amount=0.0, shipping_amount=0.0, delivery_address="Addr",
+            created_at=None, updated_at=None,
+            items=[OrderItem(id=None, order_id=None, product_id=1, product_name="P", product_price=10.0, quantity=1, subtotal=10.0)],
+        )).id
+
+    first = place(db_a)
+    # Session B has read the summary row as it was before A's next order
+    stale = db_b.get(CustomerOrderSummaryModel, "c1")
+    assert len(stale.recent_orders) == 1
+    second = place(db_a)
+    third = place(db_b)
+
+    summary = OrderRepository(factory()).get_customer_summary("c1")
+    assert summary.order_count == 3 and summary.lifetime_spend == 30.0
+    assert [h["id"] for h in summary.recent_orders] == [third, second, first]
+
+    db = factory()
+    db.query(CustomerOrderSummaryModel).delete()
+    db.commit()
+    rebuilt = OrderRepository(db).get_customer_summary("c1")
+    assert (rebuilt.order_count, len(rebuilt.recent_orders)) == (3, 3)
+    assert factory().query(CustomerOrderSummaryModel).count() == 0
+
+
+def test_review_pages_round_trip_cursors_with_unrated_last():
+    from app.domains.review.entity import ReviewSort
+    from app.domains.review.repository import ReviewRepository, _encode_cursor
+    from app.infrastructure.database.sqlite.models.review import ReviewModel
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    ReviewModel.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    ratings = [3, None, 1, 5, None, 1, 4]
+    for i, rating in enumerate(ratings):
+        db.add(ReviewModel(
+            product_id=1, user_id=f"u{i}", user_name="U", order_id=i, rating=rating, comment="Works as described", is_approved=True,
+            created_at=datetime(2025, 1, 1) + timedelta(minutes=i),
+        ))
+    db.commit()
+    repo = ReviewRepository(db)
+
+    def walk(sort):
+        seen, cursor = [], None
+        while True:
+            page, cursor = repo.get_page(1, sort=sort, cursor=cursor, limit=2)
+            seen += [r.rating for r in page]
+            if cursor is None:
+                return seen
+
+    assert walk(ReviewSort.LOWEST) == [1, 1, 3, 4, 5, None, None]
+    assert walk(ReviewSort.HIGHEST) == [5, 4, 3, 1, 1, None, None]
+    assert len(walk(ReviewSort.NEWEST)) == len(ratings)
+    with pytest.raises(ValueError):
+        repo.get_page(1, sort=ReviewSort.NEWEST, cursor=_encode_cursor([{"x": 1}, "2"]))
+
+
+def test_review_moderation_queue_walks_pages_with_cursors():
+    from app.domains.review.entity import ReviewStatus
+    from app.domains.review.repository import ReviewRepository
+    from app.infrastructure.database.sqlite.models.review import ReviewModel
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    ReviewModel.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    for i in range(5):
+        db.add(ReviewModel(
+            product_id=1, user_id=f"u{i}", user_name="U", order_id=i, rating=4, comment="Works as described",
+            status=ReviewStatus.PENDING.value, is_approved=False,
+            # Two reviews share a timestamp so the id tiebreaker is exercised
+            created_at=datetime(2025, 1, 1) + timedelta(minutes=i // 2),
+        ))
+    db.commit()
+    repo = ReviewRepository(db)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page, cursor = repo.get_pending_page(cursor=cursor, limit=2)
+        seen += [r.user_id for r in page]
+        pages += 1
+        if cursor is None:
+            break
+    assert pages == 3
+    assert seen == [f"u{i}" for i in range(5)]
+
+
+def _pending_review_session(count):
+    from app.domains.review.entity import ReviewStatus
+    from app.infrastructure.database.sqlite.models.review import ReviewModel
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    ReviewModel.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    for i in range(count):
+        db.add(ReviewModel(
+            product_id=1, user_id=f"u{i}", user_name="U", order_id=i, rating=4, comment="Works as described",
+            status=ReviewStatus.PENDING.value, is_approved=False, created_at=datetime(2025, 1, 1) + timedelta(minutes=i),
+        ))
+    db.commit()
+    return db
+
+
+def test_review_moderation_queue_cursor_round_trips_across_moderation():
+    from app.domains.review import use_cases as review_use_cases
+    from app.domains.review.repository import _decode_cursor, _encode_cursor
+
+    db = _pending_review_session(4)
+    first, cursor, total = review_use_cases.get_moderation_queue(db, limit=2)
+    assert total == 4 and [r.user_id for r in first] == ["u0", "u1"]
+    created_at, review_id = _decode_cursor(cursor)
+    assert (type(created_at), review_id) == (str, first[-1].id)
+
+    # Moderating the first page does not shift the next one
+    review_use_cases.moderate_reviews(db, [r.id for r in first], True, "m1")
+    second, cursor, total = review_use_cases.get_moderation_queue(db, cursor=cursor, limit=2)
+    assert total == 2 and [r.user_id for r in second] == ["u2", "u3"] and cursor is None
+
+    for bad in ("not base64!", _encode_cursor([created_at]), _encode_cursor([review_id, created_at])):
+        with pytest.raises(ValueError):
+            review_use_cases.get_moderation_queue(db, cursor=bad)
+
+
+def test_review_bulk_moderation_updates_found_ids_and_reports_missing():
+    from app.domains.review import use_cases as review_use_cases
+    from app.domains.review.entity import ReviewStatus
+    from app.domains.review.repository import ReviewRepository
+
+    db = _pending_review_session(3)
+    result = review_use_cases.moderate_reviews(db, [1, 2, 2, 99], True, "m1")
+    assert (result.updated, result.not_found) == (2, [99])
+    result = review_use_cases.moderate_reviews(db, [3], False, "m1")
+    assert (result.updated, result.not_found) == (1, [])
+
+    repo = ReviewRepository(db)
+    approved, rejected = repo.get_by_id(1), repo.get_by_id(3)
+    assert (approved.status, approved.is_approved, approved.approved_by) == (ReviewStatus.APPROVED, True, "m1")
+    assert (rejected.status, rejected.is_approved, rejected.approved_by) == (ReviewStatus.DISAPPROVED, False, None)
+    assert repo.count_pending() == 0
+    assert review_use_cases.moderate_reviews(db, [404], True, "m1").updated == 0
+
+
+def test_wishlist_digest_claims_are_leased_then_retried_and_dropped():
+    from app.domains.notifications import use_cases as notification_use_cases
+    from app.domains.notifications.notifier import WishlistEvent
+    from app.domains.notifications.repository import WishlistDigestRepository
+    from app.domains.wishlist.repository import WishlistRecipient
+    from app.infrastructure.database.sqlite.models.user import UserModel
+    from app.infrastructure.database.sqlite.models.wishlist import WishlistDigestEntryModel
+    from app.infrastructure.database.sqlite.session import Base
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[UserModel.__table__, WishlistDigestEntryModel.__table__])
+    db = sessionmaker(bind=engine)()
+    WishlistDigestRepository(db).enqueue(
+        WishlistEvent(WishlistEventType.BACK_IN_STOCK, {"id": 1, "name": "P"}),
+        [WishlistRecipient(user_id="u1", email="u1@example.com")],
+    )
+    db.commit()
+    now = datetime.utcnow() + timedelta(hours=1)
+
+    (digest,) = notification_use_cases.collect_due_digests(db, window_seconds=0, now=now)
+    assert digest.attempts == 1
+    # Another worker sees nothing while the claim is leased
+    assert notification_use_cases.collect_due_digests(db, window_seconds=0, now=now) == []
+
+    notification_use_cases.fail_digest(db, digest, max_attempts=2, backoff_base_seconds=60, now=now)
+    assert notification_use_cases.collect_due_digests(db, window_seconds=0, now=now + timedelta(seconds=30)) == []
+    (retry,) = notification_use_cases.collect_due_digests(db, window_seconds=0, now=now + timedelta(seconds=61))
+    assert retry.attempts == 2 and retry.entry_ids == digest.entry_ids
+
+    notification_use_cases.fail_digest(db, retry, max_attempts=2, now=now)
+    assert db.query(WishlistDigestEntryModel).count() == 0
+
+
+def test_wishlist_digest_entries_commit_with_the_product_change(monkeypatch):
+    from app.domains.catalog import use_cases as catalog_use_cases
+    from app.infrastructure.database.sqlite import models  # noqa: F401  registers every table
+    from app.infrastructure.database.sqlite.models.category import CategoryModel
+    from app.infrastructure.database.sqlite.models.product import ProductModel
+    from app.infrastructure.database.sqlite.models.user import UserModel
+    from app.infrastructure.database.sqlite.models.wishlist import WishlistDigestEntryModel, WishlistModel
+    from app.infrastructure.database.sqlite.repositories.wishlist_repository import WishlistRepositorySQLite
+    from app.infrastructure.database.sqlite.session import Base
+    from app.infrastructure.notifications.digest_notifier import DigestWishlistNotifier
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(CategoryModel(id=1, name="Phones"))
+    db.add(ProductModel(id=1, name="P", model="M", serial_number="S1", price=10.0, stock=0, category_id=1))
+    db.add(UserModel(id="u1", first_name="U", last_name="One", email="u1@example.com", password_hash="x"))
+    db.add(WishlistModel(user_id="u1", product_id=1))
+    db.commit()
+
+    def restock():
+        return catalog_use_cases.update_product(
+            db, 1, {"stock": 5}, wishlist_repo=WishlistRepositorySQLite(db), notifier=DigestWishlistNotifier(db)
+        )
+
+    def failing_commit():
+        raise RuntimeError("commit failed")
+
+    monkeypatch.setattr(db, "commit", failing_commit)
+    with pytest.raises(RuntimeError):
+        restock()
+    # The entry was written in the product's transaction and goes away with it
+    assert db.query(WishlistDigestEntryModel).count() == 1
+    db.rollback()
+    assert db.query(WishlistDigestEntryModel).count() == 0
+    assert db.get(ProductModel, 1).stock == 0
+
+    monkeypatch.undo()
+    assert restock().stock == 5
+    other = sessionmaker(bind=engine)()
+    (entry,) = other.query(WishlistDigestEntryModel).all()
+    assert (entry.user_id, entry.event_type) == ("u1", WishlistEventType.BACK_IN_STOCK.value)
+
+
+def test_sqlite_broadcast_ids_not_reused_after_prune():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    SupportBroadcastModel.__table__.create(engine)
+    session_factory = sessionmaker(bind=engine)
+    worker_a = SQLiteBroadcast(session_factory, poll_seconds=60, retention_seconds=0)
+    worker_b = SQLiteBroadcast(session_factory, poll_seconds=60)
+    received = []
+
+    async def run():
+        async def deliver_a(channel, message):
+            pass
+
+        async def deliver_b(channel, message):
+            received.append(message["body"])
+
+        await worker_a.start(deliver_a)
+        await worker_b.start(deliver_b)
+        await worker_a.publish("conv-1", {"body": "first"})
+        await worker_a.publish("conv-1", {"body": "second"})
+        assert await worker_b.poll_once() == 2
+        # Prune every row, including the newest one worker_b has seen
+        await asyncio.sleep(0.01)
+        worker_a._prune()
+        await worker_a.publish("conv-1", {"body": "third"})
+        assert await worker_b.poll_once() == 1
+        await worker_a.stop()
+        await worker_b.stop()
+
+    asyncio.run(run())
+    assert received == ["first", "second", "third"]
@@ -116,8 +116,10 @@ export const ordersAPI = {
     );
     return response.data;
   },
-  fetchAllOrders: async () => {
-    const response = await apiClient.get(`${API_ENDPOINTS.ORDERS}/all`);
+  fetchAllOrders: async ({ includeArchived = false } = {}) => {
+    const response = await apiClient.get(`${API_ENDPOINTS.ORDERS}/all`, {
+      params: includeArchived ? { include_archived: true } : undefined,
+    });
     return response.data;
   },
 };
@@ -347,6 +349,12 @@ export const supportAPI = {
     }
     return url;
   },
+
+  // Agent queue feed: a snapshot, then deltas as conversations change
+  getQueueWebSocketUrl: () => {
+    const wsBase = API_URL.replace(/^http/, "ws");
+    return `${wsBase}${API_ENDPOINTS.SUPPORT}/queue/ws`;
+  },
 };
 
 // Export the configured axios instance for custom requests
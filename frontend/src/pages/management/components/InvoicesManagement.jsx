@@ -14,7 +14,8 @@ const InvoicesManagement = () => {
   const [searchTerm, setSearchTerm] = useState("");
 
   useEffect(() => {
-    dispatch(fetchAllOrders());
+    // Revenue and invoices cover delivered orders that have since been archived
+    dispatch(fetchAllOrders({ includeArchived: true }));
   }, [dispatch]);
 
   // Filter orders by date range and search
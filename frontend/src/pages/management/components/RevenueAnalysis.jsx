@@ -26,7 +26,8 @@ const RevenueAnalysis = () => {
   const [endDate, setEndDate] = useState("");
 
   useEffect(() => {
-    dispatch(fetchAllOrders());
+    // Revenue and invoices cover delivered orders that have since been archived
+    dispatch(fetchAllOrders({ includeArchived: true }));
     dispatch(fetchProducts());
   }, [dispatch]);
 
@@ -1,5 +1,6 @@
 import { useState, useEffect, useRef, useCallback } from "react";
 import { supportAPI } from "../../../api";
+import { mergeSupportMessages } from "../../../utils/supportMessages";
 
 const SupportAgentView = () => {
   const [conversations, setConversations] = useState([]);
@@ -36,9 +37,39 @@ const SupportAgentView = () => {
   }, []);
 
   useEffect(() => {
-    loadQueue();
-    const interval = setInterval(loadQueue, 30000);
-    return () => clearInterval(interval);
+    let queueWs;
+    let retryTimer;
+    let unmounted = false;
+
+    const connectQueue = () => {
+      queueWs = new WebSocket(supportAPI.getQueueWebSocketUrl());
+      queueWs.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.type === "queue_snapshot") {
+          setConversations(data.conversations || []);
+          setError(null);
+        } else if (data.type === "queue_delta") {
+          const conv = data.conversation;
+          setConversations((prev) => {
+            if (data.op === "closed") return prev.filter((c) => c.id !== conv.id);
+            return prev.some((c) => c.id === conv.id)
+              ? prev.map((c) => (c.id === conv.id ? conv : c))
+              : [...prev, conv];
+          });
+        }
+      };
+      // Reconnect after a drop; the new snapshot resyncs the list
+      queueWs.onclose = () => {
+        if (!unmounted) retryTimer = setTimeout(connectQueue, 5000);
+      };
+    };
+
+    connectQueue();
+    return () => {
+      unmounted = true;
+      clearTimeout(retryTimer);
+      queueWs?.close();
+    };
   }, []);
 
   useEffect(() => {
@@ -86,8 +117,13 @@ const SupportAgentView = () => {
             context_snapshot: data.context_snapshot,
           }));
         }
+      } else if (data.type === "history_delta" || data.type === "history_page") {
+        // Partial history: merge instead of replacing what is shown
+        setMessages((prev) =>
+          mergeSupportMessages(prev, data.messages || [], Boolean(data.before))
+        );
       } else if (data.type === "message") {
-        setMessages((prev) => [...prev, data.payload]);
+        setMessages((prev) => mergeSupportMessages(prev, [data.payload]));
         setIsTyping(false);
       } else if (data.type === "typing" && data.from === "customer") {
         setIsTyping(true);
@@ -125,7 +161,6 @@ const SupportAgentView = () => {
       if (!conv.assigned_agent_id) {
         const claimed = await supportAPI.claimConversation(conv.id);
         setActiveConversation(claimed);
-        loadQueue();
       }
       connectWebSocket(conv.id);
     } catch (err) {
@@ -171,7 +206,6 @@ const SupportAgentView = () => {
       setActiveConversation(null);
       setMessages([]);
       wsRef.current?.close();
-      loadQueue();
     } catch {
       setError("Failed to close conversation");
     }
@@ -506,7 +540,7 @@ const SupportAgentView = () => {
                                   <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M9 5H7a2 2 0 00-2 2v12a2 2 0 002 2h10a2 2 0 002-2V7a2 2 0 00-2-2h-2M9 5a2 2 0 002 2h2a2 2 0 002-2M9 5a2 2 0 012-2h2a2 2 0 012 2" />
                                 </svg>
                                 <span className="text-xs font-semibold text-gray-700 uppercase">
-                                  Orders ({activeConversation.context_snapshot.orders_summary.length})
+                                  Orders ({activeConversation.context_snapshot.order_count ?? activeConversation.context_snapshot.orders_summary.length})
                                 </span>
                               </div>
                               <svg className={`w-4 h-4 text-gray-400 transition-transform ${expandedSections.orders ? 'rotate-180' : ''}`} fill="none" stroke="currentColor" viewBox="0 0 24 24">
@@ -515,6 +549,13 @@ const SupportAgentView = () => {
                             </button>
                             {expandedSections.orders && (
                               <div className="px-3 pb-3 space-y-2">
+                                {activeConversation.context_snapshot.order_count != null && (
+                                  <p className="text-xs text-gray-500">
+                                    Latest {activeConversation.context_snapshot.orders_summary.length} of {activeConversation.context_snapshot.order_count}
+                                    {activeConversation.context_snapshot.lifetime_spend != null &&
+                                      ` · Lifetime spend $${activeConversation.context_snapshot.lifetime_spend.toFixed(2)}`}
+                                  </p>
+                                )}
                                 {activeConversation.context_snapshot.orders_summary.map((order, i) => (
                                   <div key={i} className="bg-gray-50 rounded-lg p-2.5 border border-gray-100">
                                     <div className="flex justify-between items-center mb-2">
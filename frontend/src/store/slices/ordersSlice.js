@@ -157,9 +157,9 @@ export const approveRefund = createAsyncThunk(
 
 export const fetchAllOrders = createAsyncThunk(
   "orders/fetchAllOrders",
-  async (_, { rejectWithValue }) => {
+  async (options, { rejectWithValue }) => {
     try {
-      const response = await ordersAPI.fetchAllOrders();
+      const response = await ordersAPI.fetchAllOrders(options);
       return response;
     } catch (error) {
       return rejectWithValue(
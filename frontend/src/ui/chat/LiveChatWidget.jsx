@@ -1,6 +1,7 @@
 import { useState, useEffect, useRef, useCallback } from "react";
 import { useSelector } from "react-redux";
 import { supportAPI } from "../../api";
+import { mergeSupportMessages } from "../../utils/supportMessages";
 
 const LiveChatWidget = () => {
   const [isOpen, setIsOpen] = useState(false);
@@ -99,8 +100,13 @@ const LiveChatWidget = () => {
 
       if (data.type === "history") {
         setMessages(data.messages || []);
+      } else if (data.type === "history_delta" || data.type === "history_page") {
+        // Partial history: merge instead of replacing what is shown
+        setMessages((prev) =>
+          mergeSupportMessages(prev, data.messages || [], Boolean(data.before))
+        );
       } else if (data.type === "message") {
-        setMessages((prev) => [...prev, data.payload]);
+        setMessages((prev) => mergeSupportMessages(prev, [data.payload]));
         setIsTyping(false);
         // Show unread indicator if minimized or closed
         if (isMinimized || !isOpen) {
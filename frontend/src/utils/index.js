@@ -1 +1,2 @@
 export * from "./pdfGenerator";
+export * from "./supportMessages";
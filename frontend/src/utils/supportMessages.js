@@ -0,0 +1,15 @@
+/**
+ * Add support chat messages to the current list, skipping any already shown.
+ * A resent message comes back with the id of the one already shown, so it is
+ * never added twice.
+ * @param {Array} current - Messages already shown
+ * @param {Array} incoming - Messages from a history_delta, history_page or message frame
+ * @param {boolean} prepend - Put the new messages first (older history pages)
+ * @returns {Array} The merged message list
+ */
+export const mergeSupportMessages = (current, incoming, prepend = false) => {
+  const seen = new Set(current.map((message) => message.id));
+  const added = incoming.filter((message) => !seen.has(message.id));
+  if (!added.length) return current;
+  return prepend ? [...added, ...current] : [...current, ...added];
+};